@@ -0,0 +1,117 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class AnalysisJob:
+    """Zadanie analizy wykonywane w tle.
+
+    Funkcja zadania dostaje obiekt AnalysisJob jako pierwszy argument i może
+    wywoływać report(postęp, wynik_częściowy) – to jednocześnie punkt,
+    w którym przerywane jest anulowane zadanie (wyjątek JobCancelled).
+    """
+
+    def __init__(self, executor, on_progress=None, on_done=None, on_error=None):
+        self.executor = executor
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.on_error = on_error
+        self.cancel_event = threading.Event()
+        self.future = None
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def check(self):
+        if self.cancel_event.is_set():
+            raise JobCancelled()
+
+    def report(self, fraction, partial=None):
+        self.check()
+        self.executor.events.put((self, "progress", (fraction, partial)))
+
+
+class AnalysisExecutor:
+    """Wykonuje analizę poza wątkiem Tk i przekazuje wyniki przez master.after.
+
+    Wątki robocze tylko wkładają zdarzenia do kolejki; wszystkie callbacki
+    (on_progress, on_done, on_error) są wywoływane w wątku GUI podczas
+    okresowego odpytywania kolejki. Callbacki anulowanych zadań są pomijane.
+    NumPy zwalnia GIL w ciężkich operacjach, więc wątki wystarczają.
+    """
+
+    POLL_MS = 50
+
+    def __init__(self, master, max_workers=2):
+        self.master = master
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analysis")
+        self.events = queue.Queue()
+        self.jobs = set()
+        self.poll_after = None
+
+    def submit(self, func, *args, on_progress=None, on_done=None, on_error=None, **kwargs):
+        """Uruchamia func(job, *args, **kwargs) w tle; wywoływać z wątku GUI."""
+        job = AnalysisJob(self, on_progress, on_done, on_error)
+        self.jobs.add(job)
+        job.future = self.pool.submit(self.run, job, func, args, kwargs)
+        self.schedule_poll()
+        return job
+
+    def run(self, job, func, args, kwargs):
+        try:
+            job.check()
+            result = func(job, *args, **kwargs)
+        except JobCancelled:
+            self.events.put((job, "cancelled", None))
+        except Exception as e:
+            self.events.put((job, "error", e))
+        else:
+            self.events.put((job, "done", result))
+
+    def schedule_poll(self):
+        if self.poll_after is None:
+            self.poll_after = self.master.after(self.POLL_MS, self.poll)
+
+    def poll(self):
+        self.poll_after = None
+        try:
+            while True:
+                try:
+                    job, kind, payload = self.events.get_nowait()
+                except queue.Empty:
+                    break
+                if kind != "progress":
+                    self.jobs.discard(job)
+                if job.cancelled:
+                    continue
+                if kind == "progress" and job.on_progress:
+                    job.on_progress(*payload)
+                elif kind == "done" and job.on_done:
+                    job.on_done(payload)
+                elif kind == "error":
+                    if job.on_error:
+                        job.on_error(payload)
+                    else:
+                        raise payload
+        finally:
+            if self.jobs or not self.events.empty():
+                self.schedule_poll()
+
+    def cancel_all(self):
+        for job in list(self.jobs):
+            job.cancel()
+
+    def shutdown(self):
+        self.cancel_all()
+        if self.poll_after is not None:
+            self.master.after_cancel(self.poll_after)
+            self.poll_after = None
+        self.pool.shutdown(wait=False, cancel_futures=True)
@@ -6,22 +6,47 @@ import matplotlib
 matplotlib.use("TkAgg")
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.collections import PolyCollection
 from matplotlib.patches import Patch
-from scipy.io import wavfile
 import sys
+import time
 import warnings
 from scipy.io.wavfile import WavFileWarning
 import os
 
 from design import ColorScheme, configure_style
-from audio_processing import VoicedAudioProcessor
+from audio_processing import VoicedAudioProcessor, rescale_regions, silence_regions, voiced_unvoiced_regions
+from features import analysis_frames
 from features_window import FeaturesWindow
+from audio_io import WavSource
+from audio_signal import AudioSignal
+from feature_cache import FeatureCache, content_hash
+from waveform import WaveformPyramid, region_classes, span_vertices, visible_spans
+from analysis_worker import AnalysisExecutor
+from live_meters import LiveFeatureExtractor
+from playback_stats import PlaybackStats
+from segment_export import export_segments, export_trimmed, keep_regions
+import profiling
 
 warnings.simplefilter("ignore", WavFileWarning)
 
+# Klasa przedziałów -> (kolor, przezroczystość, etykieta legendy)
+REGION_STYLES = {
+    "silence": (ColorScheme.SILENCE_COLOR, 0.6, "Cisza"),
+    "voiced": (ColorScheme.VOICED_COLOR, 0.3, "Dźwięczne"),
+    "unvoiced": (ColorScheme.UNVOICED_COLOR, 0.3, "Bezdźwięczne"),
+}
+
+# Suwaki progów segmentacji: atrybut -> (etykieta, minimum, maksimum, skala logarytmiczna)
+THRESHOLD_SLIDERS = {
+    "silence_threshold": ("Próg ciszy (RMS)", 1e-4, 0.1, True),
+    "vol_threshold": ("Próg dźwięczności (RMS)", 1e-3, 0.3, True),
+    "zcr_threshold": ("Próg ZCR", 0.01, 1.0, False),
+}
+
 
 class AudioApp:
-    def __init__(self, master):
+    def __init__(self, master, analysis_rate=None, hop_size=None):
         self.master = master
 
         # --- Konfigurujemy styl ---
@@ -31,14 +56,36 @@ class AudioApp:
         # Klasa do przetwarzania audio (analizy ciszy, dźwięczności itd.)
         self.processor = VoicedAudioProcessor()
 
+        # Analiza w tle (poza wątkiem Tk) i bieżące zadania
+        self.executor = AnalysisExecutor(self.master)
+        self.segment_job = None
+        self.params_job = None
+        self.export_job = None
+        # Otwarte okna cech – pokazują sygnał bieżącego pliku, więc zamykamy je przy wczytaniu nowego
+        self.features_windows = []
+
         self.master.title("Aplikacja Audio")
         self.master.geometry("900x700")
 
         # Zmienne audio
         self.fs = None
+        # Wczytany sygnał (wszystkie kanały, float32, czas liczony z fs) oraz
+        # wyświetlany i analizowany sygnał data – miks albo widok wybranego kanału
+        self.signal = None
         self.data = None
+        # RMS i ZCR ramek sygnału analizy: "mix" -> (rms, zcr) dla miksu,
+        # "channels" -> tablice (ramki, kanały) wszystkich kanałów liczone jednym
+        # przejściem. Liczone raz na plik – zmiana progu, trybu lub kanału tylko
+        # progi je i koduje serie (segment_regions)
+        self.frame_stats = {}
+        # Narysowane przedziały: klasa -> (starty, końce) w sekundach oraz
+        # klasa -> PolyCollection z przedziałami widocznymi w bieżącym widoku
+        self.region_spans = {}
+        self.region_collections = {}
         self.total_samples = 0
-        self.time_array = None
+        # Piramida obwiedni min/max do rysowania przebiegu i aktualny widok (t0, t1)
+        self.pyramid = None
+        self.view = None
         self.current_index = 0
         self.filename = ""
 
@@ -48,10 +95,38 @@ class AudioApp:
 
         # Strumień audio w sounddevice
         self.stream = None
+        self.blocksize = 1024
+
+        # Sygnał jako ciągła tablica (N, kanały) – callback kopiuje z niej wprost do outdata
+        self.play_buffer = None
+
+        # Statystyki callbacku (xruny, czasy, opóźnienie); zapis do JSON przy
+        # zamknięciu, jeśli ustawiono AUDIO_APP_PLAYBACK_STATS=ścieżka
+        self.playback_stats = PlaybackStats(blocksize=self.blocksize)
+
+        # Cechy liczone na bieżąco z odtwarzanych bloków (zasilane z audio_callback)
+        self.live = None
 
         # Parametry analizy
         self.silence_threshold = 0.001
+        self.vol_threshold = 0.02
+        self.zcr_threshold = 0.3
+        self.threshold_after = None
+        self.frame_params = None
         self.frame_size = 256
+        # Krok ramek – domyślnie równy ramce (bez nakładania); mniejszy (np. --hop-size 128)
+        # daje dokładniejsze granice segmentów
+        self.hop_size = hop_size or self.frame_size
+        # Przenikanie na cięciach przy eksporcie WAV (narastanie/wyciszenie segmentów)
+        self.export_crossfade_ms = 10
+        # Docelowa częstotliwość analizy F0 i segmentacji (None – natywna fs pliku);
+        # sygnał jest decymowany całkowitym krokiem, więc fs analizy >= analysis_rate
+        self.analysis_rate = analysis_rate
+        self.analysis_signal = None
+
+        # Cache cech na dysku + skrót zawartości bieżącego pliku (liczony przy pierwszym użyciu)
+        self.feature_cache = FeatureCache()
+        self.data_hash = None
 
         # Zmienna do wyboru trybu podświetlania
         self.highlight_mode = tk.StringVar(value="silence")  # domyślnie "silence"
@@ -59,6 +134,10 @@ class AudioApp:
         # Referencja do pionowej linii
         self.line = None
 
+        # Linia przebiegu (dane podmieniane przy zoomie/przesuwaniu) i stan przeciągania
+        self.wave_line = None
+        self.pan_start = None
+
         # Bliting – statyczne tło wykresu
         self.background = None
 
@@ -118,12 +197,30 @@ class AudioApp:
         )
         self.features_button.grid(row=0, column=4, padx=5, pady=5)
 
+        # Nagranie bez ciszy albo segmenty dźwięczne/bezdźwięczne do plików WAV
+        self.export_button = ttk.Button(
+            self.top_frame,
+            text="Eksport WAV",
+            command=self.export_wav,
+            state="disabled"
+        )
+        self.export_button.grid(row=0, column=5, padx=5, pady=5)
+
         self.close_button = ttk.Button(
             self.top_frame,
             text="Zamknij",
             command=self.on_close
         )
-        self.close_button.grid(row=0, column=5, padx=5, pady=5)
+        self.close_button.grid(row=0, column=6, padx=5, pady=5)
+
+        # Panel z pomiarami etapów (tylko przy włączonym profilowaniu)
+        if profiling.ENABLED:
+            self.profile_button = ttk.Button(
+                self.top_frame,
+                text="Profil",
+                command=self.show_profile
+            )
+            self.profile_button.grid(row=0, column=7, padx=5, pady=5)
 
         # --- Sekcja info: nazwa pliku, czas, tryb ---
         info_frame = ttk.Frame(self.main_frame, style="App.TFrame")
@@ -161,6 +258,29 @@ class AudioApp:
         )
         self.params_label.pack(side="top", anchor="w", pady=5)
 
+        # Postęp analizy wykonywanej w tle
+        progress_frame = ttk.Frame(info_frame, style="App.TFrame")
+        progress_frame.pack(side="top", anchor="w", pady=(0, 5))
+        self.progress_text = tk.StringVar()
+        ttk.Label(progress_frame, textvariable=self.progress_text).pack(side="left")
+        self.progress_bar = ttk.Progressbar(progress_frame, mode="determinate", maximum=1.0, length=200)
+        self.progress_bar.pack(side="left", padx=10)
+
+        # Wskaźniki cech odtwarzanego fragmentu (odświeżane w update_ui)
+        meters_frame = ttk.Frame(info_frame, style="App.TFrame")
+        meters_frame.pack(side="top", anchor="w", pady=(0, 5))
+        ttk.Label(meters_frame, text="Na żywo – RMS:").pack(side="left")
+        self.rms_meter = ttk.Progressbar(meters_frame, mode="determinate", maximum=1.0, length=120)
+        self.rms_meter.pack(side="left", padx=(5, 15))
+        ttk.Label(meters_frame, text="ZCR:").pack(side="left")
+        self.zcr_meter = ttk.Progressbar(meters_frame, mode="determinate", maximum=0.5, length=120)
+        self.zcr_meter.pack(side="left", padx=(5, 15))
+        self.f0_text = tk.StringVar(value="F0: –")
+        ttk.Label(meters_frame, textvariable=self.f0_text).pack(side="left")
+
+        self.playback_stats_text = tk.StringVar()
+        ttk.Label(info_frame, textvariable=self.playback_stats_text).pack(side="top", anchor="w")
+
         # --- Opcje wyboru trybu podświetlania ---
         mode_frame = ttk.Frame(self.main_frame, style="Controls.TFrame")
         mode_frame.pack(side="top", fill="x", padx=10, pady=5)
@@ -189,6 +309,40 @@ class AudioApp:
         )
         rb_voiced.pack(side="left", padx=5)
 
+        # Wybór wyświetlanego i analizowanego sygnału: miks lub jeden z kanałów
+        ttk.Label(
+            mode_frame,
+            text="Kanał:",
+            style="TitleLabel.TLabel"
+        ).pack(side="left", padx=(20, 10))
+
+        self.channel_box = ttk.Combobox(mode_frame, values=["Miks"], state="disabled", width=12)
+        self.channel_box.current(0)
+        self.channel_box.bind("<<ComboboxSelected>>", self.on_channel_change)
+        self.channel_box.pack(side="left", padx=5)
+
+        # --- Progi segmentacji – przerysowanie bez ponownego liczenia cech ramek ---
+        threshold_frame = ttk.Frame(self.main_frame, style="Controls.TFrame")
+        threshold_frame.pack(side="top", fill="x", padx=10, pady=5)
+        self.threshold_texts = {}
+        for column, (name, (label, low, high, log)) in enumerate(THRESHOLD_SLIDERS.items()):
+            value = getattr(self, name)
+            self.threshold_texts[name] = tk.StringVar(value=f"{value:.4g}")
+            ttk.Label(threshold_frame, text=label + ":").grid(row=0, column=3 * column, padx=(5, 5))
+            slider = ttk.Scale(
+                threshold_frame,
+                from_=np.log10(low) if log else low,
+                to=np.log10(high) if log else high,
+                orient="horizontal",
+                length=140,
+                command=lambda position, name=name, log=log: self.on_threshold_move(name, log, position)
+            )
+            slider.set(np.log10(value) if log else value)
+            slider.grid(row=0, column=3 * column + 1)
+            ttk.Label(threshold_frame, textvariable=self.threshold_texts[name], width=7).grid(
+                row=0, column=3 * column + 2, padx=(5, 15)
+            )
+
         # --- Ramka z wykresem audio ---
         plot_frame = ttk.LabelFrame(
             self.main_frame,
@@ -204,12 +358,79 @@ class AudioApp:
         # Podpięcie obsługi zdarzenia zmiany rozmiaru wykresu
         self.canvas.mpl_connect('resize_event', self.on_resize)
 
+        # Zoom kółkiem myszy, przesuwanie przeciąganiem, podwójne kliknięcie – cały sygnał
+        self.canvas.mpl_connect('scroll_event', self.on_scroll)
+        self.canvas.mpl_connect('button_press_event', self.on_press)
+        self.canvas.mpl_connect('motion_notify_event', self.on_motion)
+        self.canvas.mpl_connect('button_release_event', self.on_release)
+
     def on_resize(self, event):
         self.background = None
+        # Nowa szerokość w pikselach może wymagać innego poziomu piramidy
+        self.update_waveform()
+        self.update_regions()
         if self.line is not None:
             self.canvas.draw()
             self.background = self.canvas.copy_from_bbox(self.ax.bbox)
 
+    def update_waveform(self):
+        if self.wave_line is None or self.pyramid is None:
+            return
+        t_start, t_end = self.ax.get_xlim()
+        x, y = self.pyramid.envelope(t_start, t_end, self.ax.bbox.width)
+        self.wave_line.set_data(x, y)
+
+    def update_regions(self):
+        # Do kolekcji trafiają tylko przedziały z widoku; bliższe niż piksel są łączone
+        if not self.region_collections:
+            return
+        t_start, t_end = self.ax.get_xlim()
+        pixel = (t_end - t_start) / max(self.ax.bbox.width, 1)
+        for name, collection in self.region_collections.items():
+            starts, ends = self.region_spans[name]
+            collection.set_verts(span_vertices(*visible_spans(starts, ends, t_start, t_end, pixel)))
+
+    def set_view(self, t_start, t_end):
+        duration = self.total_samples / self.fs
+        width = min(max(t_end - t_start, 100 / self.fs), duration)
+        t_start = float(np.clip(t_start, 0, duration - width))
+        self.view = (t_start, t_start + width)
+        self.ax.set_xlim(*self.view)
+        self.update_waveform()
+        self.update_regions()
+        with profiling.stage("render.canvas_draw"):
+            self.canvas.draw()
+        self.background = None
+        if self.line is not None:
+            self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+
+    def on_scroll(self, event):
+        if self.data is None or event.inaxes != self.ax or event.xdata is None:
+            return
+        t_start, t_end = self.ax.get_xlim()
+        scale = 0.8 if event.button == "up" else 1.25
+        # Punkt pod kursorem pozostaje w miejscu
+        new_start = event.xdata - (event.xdata - t_start) * scale
+        self.set_view(new_start, new_start + (t_end - t_start) * scale)
+
+    def on_press(self, event):
+        if self.data is None or event.inaxes != self.ax or event.button != 1:
+            return
+        if event.dblclick:
+            self.set_view(0, self.total_samples / self.fs)
+            return
+        self.pan_start = (event.x, self.ax.get_xlim())
+
+    def on_motion(self, event):
+        if self.pan_start is None or event.x is None:
+            return
+        start_x, (t_start, t_end) = self.pan_start
+        shift = (event.x - start_x) * (t_end - t_start) / self.ax.bbox.width
+        self.set_view(t_start - shift, t_end - shift)
+
+    def on_release(self, event):
+        self.pan_start = None
+
     def update_highlight_mode(self):
         mode = self.highlight_mode.get()
         if mode == "silence":
@@ -220,6 +441,30 @@ class AudioApp:
         if self.data is not None:
             self.draw_main_plot()
 
+    def selected_channel(self):
+        # None – miks kanałów (lub jedyny kanał), inaczej indeks kanału
+        index = self.channel_box.current()
+        return index - 1 if index > 0 else None
+
+    def select_signal(self):
+        """Ustawia data na miks lub wybrany kanał i buduje dla niego piramidę."""
+        # Kanał to widok bez kopii (co channels próbek) – tak samo trafia do analizy i piramidy
+        self.data = self.signal.view(self.selected_channel())
+        self.data_hash = None
+        data = self.data
+        self.executor.submit(lambda job: content_hash(data),
+                             on_done=lambda data_hash: self.on_hash_ready(data, data_hash))
+        self.total_samples = len(self.data)
+        with profiling.stage("load.pyramid"):
+            self.pyramid = WaveformPyramid(self.data, self.fs)
+
+    def on_channel_change(self, event=None):
+        if self.signal is None:
+            return
+        self.select_signal()
+        self.draw_main_plot()
+        self.calculate_and_display_frame_params()
+
     def load_file(self):
         filepath = filedialog.askopenfilename(
             filetypes=[("WAV files", "*.wav"), ("All files", "*.*")]
@@ -227,28 +472,59 @@ class AudioApp:
         if not filepath:
             return
 
+        # Wyniki analizy poprzedniego pliku nie są już potrzebne
+        self.close_features_windows()
+        self.executor.cancel_all()
+        self.segment_job = None
+        self.params_job = None
+        self.export_job = None
+        # Callback strumienia czyta z play_buffer – zatrzymujemy go, zanim
+        # zwolnimy poprzedni sygnał (dekodowanie i rysowanie trwają dłużej niż blok)
+        self.stop_audio()
+
         self.filename = filepath
         base_name = os.path.basename(filepath)
         self.file_label.config(text=f"Plik: {base_name}")
 
         try:
-            self.fs, raw_data = wavfile.read(filepath)
+            # Plik jest mapowany w pamięci; szczyt liczony strumieniowo, a sygnał
+            # float32 budowany porcjami – bez pełnych kopii int -> float
+            with profiling.stage("load.open_wav"):
+                source = WavSource(filepath, channel=None)
         except Exception as e:
             messagebox.showerror("Błąd", f"Nie udało się wczytać pliku WAV:\n{e}")
             return
 
-        if len(raw_data.shape) > 1:
-            raw_data = raw_data[:, 0]
-
-        raw_data = raw_data.astype(np.float32)
-        peak = np.max(np.abs(raw_data))
-        if peak > 1e-9:
-            raw_data /= peak
-
-        self.data = raw_data
-        self.total_samples = len(self.data)
-        duration = self.total_samples / self.fs if self.fs else 0.001
-        self.time_array = np.linspace(0, duration, self.total_samples)
+        # Zwalniamy poprzedni sygnał, zanim zaalokujemy nowy
+        self.data = None
+        self.pyramid = None
+        self.play_buffer = None
+        self.signal = None
+        self.analysis_signal = None
+        with profiling.stage("load.normalize"):
+            self.signal = AudioSignal(source.to_float32(), source.fs)
+        # Plik (mapa lub – np. dla 24 bitów – cała tablica int) nie jest dalej potrzebny
+        del source
+
+        self.fs = self.signal.fs
+        with profiling.stage("load.mixdown"):
+            self.signal.mix()
+        # Sygnał o obniżonej częstotliwości do F0 i segmentacji – budowany raz na plik
+        with profiling.stage("load.decimate"):
+            self.analysis_signal = self.signal.decimated(self.analysis_rate)
+        self.frame_stats = {}
+
+        channels = self.signal.channels
+        if channels > 1:
+            self.channel_box.config(values=["Miks"] + [f"Kanał {c + 1}" for c in range(channels)],
+                                    state="readonly")
+        else:
+            self.channel_box.config(values=["Mono"], state="disabled")
+        self.channel_box.current(0)
+        self.select_signal()
+        duration = self.signal.duration or 0.001
+        self.live = LiveFeatureExtractor(self.fs, block_size=self.blocksize)
+        self.view = (0, duration)
         self.current_index = 0
 
         # Rysujemy główny wykres
@@ -274,68 +550,235 @@ class AudioApp:
         self.play_button.state(["!disabled"])
         self.pause_button.state(["!disabled"])
         self.features_button.state(["!disabled"])
+        self.export_button.state(["!disabled"])
         self.play_from_start_button.state(["!disabled"])
 
-        # Zatrzymujemy poprzedni strumień (jeśli był)
-        self.stop_audio()
+        # Poprzedni strumień został zatrzymany na początku wczytywania
+        if self.stream:
+            self.stream.close()
 
         # Tworzymy nowy strumień audio
-        self.stream = sd.OutputStream(
+        self.playback_stats = PlaybackStats(fs=self.fs, blocksize=self.blocksize)
+        self.play_buffer = self.signal.samples
+        try:
+            self.stream = self.open_stream(channels)
+        except sd.PortAudioError:
+            # Urządzenie nie obsługuje tylu kanałów – odtwarzamy miks
+            self.play_buffer = self.signal.mix().reshape(-1, 1)
+            self.stream = self.open_stream(1)
+
+    def open_stream(self, channels):
+        return sd.OutputStream(
             samplerate=self.fs,
-            blocksize=1024,
-            channels=1,
+            blocksize=self.blocksize,
+            channels=channels,
             dtype='float32',
             callback=self.audio_callback
         )
 
+    @profiling.timed("render.main_plot")
     def draw_main_plot(self):
         self.ax.clear()
+        self.region_spans = {}
+        self.region_collections = {}
         self.ax.set_title("Przebieg czasowy sygnału", fontsize=11, color=ColorScheme.ACCENT)
         self.ax.set_xlabel("Czas [s]", fontsize=9)
         self.ax.set_ylabel("Amplituda", fontsize=9)
-        self.ax.plot(self.time_array, self.data, linewidth=0.8, color=ColorScheme.WAVEFORM_COLOR)
+        # Rysujemy tylko obwiednię z piramidy dopasowaną do widoku i szerokości wykresu
+        self.wave_line, = self.ax.plot([], [], linewidth=0.8, color=ColorScheme.WAVEFORM_COLOR)
+        low, high = self.pyramid.amplitude_range
+        margin = 0.05 * max(high - low, 1e-3)
+        self.ax.set_ylim(low - margin, high + margin)
+        self.ax.set_xlim(*self.view)
+        self.update_waveform()
+
+        with profiling.stage("render.canvas_draw"):
+            self.canvas.draw()
+        self.background = None
 
-        legend_patches = []
-        mode = self.highlight_mode.get()
+        # Segmentacja liczona w tle; regiony dorysujemy po jej zakończeniu
+        self.start_segmentation()
 
-        if mode == "silence":
-            silence_regions = self.processor.detect_silence(
-                self.data, self.fs, self.frame_size, self.silence_threshold
-            )
-            for (start_idx, end_idx) in silence_regions:
-                start_t = start_idx / self.fs
-                end_t = end_idx / self.fs
-                self.ax.axvspan(start_t, end_t, color=ColorScheme.SILENCE_COLOR, alpha=0.6)
-            silence_patch = Patch(facecolor=ColorScheme.SILENCE_COLOR, alpha=0.6, label="Cisza")
-            legend_patches.append(silence_patch)
+    def start_segmentation(self):
+        if self.segment_job is not None:
+            self.segment_job.cancel()
+            self.segment_job = None
+        key = "mix" if self.selected_channel() is None else "channels"
+        if key in self.frame_stats:
+            self.draw_regions(self.highlight_mode.get(), self.segment_regions())
+            return
+        # Kanały analizujemy wszystkie naraz (jedno przejście po tablicy
+        # (próbki, kanały)), żeby przełączanie kanałów nie wymagało obliczeń.
+        # Segmentacja działa na sygnale analizy (ew. zdecymowanym) – ramka i krok
+        # mają ten sam czas trwania, a przedziały wracają do próbek oryginału
+        signal = self.analysis_signal
+        factor = self.signal.decimation(signal)
+        frame_size, hop_size = analysis_frames(self.frame_size, self.hop_size, factor)
+        data = signal.mix() if key == "mix" else signal.samples
+        self.set_progress("Segmentacja", 0.0)
+        self.segment_job = self.executor.submit(
+            self.frame_stats_job, data, frame_size, hop_size,
+            on_done=lambda stats: self.on_frame_stats_ready(key, stats),
+            on_error=self.on_analysis_error
+        )
+
+    def on_frame_stats_ready(self, key, stats):
+        self.frame_stats[key] = stats
+        self.draw_regions(self.highlight_mode.get(), self.segment_regions())
+
+    def frame_stats_job(self, job, data, frame_size, hop_size):
+        return self.processor.frame_stats(data, frame_size, hop_size)
+
+    def segment_regions(self):
+        """Przedziały bieżącego trybu i kanału z zapamiętanych RMS/ZCR ramek.
+
+        Tylko progowanie i kodowanie serii (bez liczenia cech), więc można
+        wywoływać przy każdym ruchu suwaka progu.
+        """
+        channel = self.selected_channel()
+        rms, zcr = self.frame_stats["mix" if channel is None else "channels"]
+        if channel is not None:
+            rms, zcr = rms[:, channel], zcr[:, channel]
+        factor = self.signal.decimation(self.analysis_signal)
+        _, hop_size = analysis_frames(self.frame_size, self.hop_size, factor)
+        total = len(self.analysis_signal)
+        if self.highlight_mode.get() == "silence":
+            regions = silence_regions(rms, hop_size, total, self.silence_threshold)
         else:
-            vu_regions = self.processor.detect_voiced_unvoiced(
-                self.data, self.fs, self.frame_size
-            )
-            for (start_idx, end_idx, is_voiced) in vu_regions:
-                start_t = start_idx / self.fs
-                end_t = end_idx / self.fs
-                if is_voiced:
-                    self.ax.axvspan(start_t, end_t, color=ColorScheme.VOICED_COLOR, alpha=0.3)
-                else:
-                    self.ax.axvspan(start_t, end_t, color=ColorScheme.UNVOICED_COLOR, alpha=0.3)
-            voiced_patch = Patch(facecolor=ColorScheme.VOICED_COLOR, alpha=0.3, label="Dźwięczne")
-            unvoiced_patch = Patch(facecolor=ColorScheme.UNVOICED_COLOR, alpha=0.3, label="Bezdźwięczne")
-            legend_patches.extend([voiced_patch, unvoiced_patch])
+            regions = voiced_unvoiced_regions(rms, zcr, hop_size, total, self.vol_threshold,
+                                              self.zcr_threshold, self.silence_threshold)
+        return rescale_regions(regions, factor, self.total_samples)
+
+    def on_threshold_move(self, name, log, position):
+        value = 10 ** float(position) if log else float(position)
+        setattr(self, name, value)
+        self.threshold_texts[name].set(f"{value:.4g}")
+        # Suwak zgłasza wiele zdarzeń – przedziały przerysowujemy co najwyżej co 50 ms
+        if self.threshold_after is None and self.signal is not None:
+            self.threshold_after = self.master.after(50, self.apply_thresholds)
+
+    def apply_thresholds(self):
+        self.threshold_after = None
+        self.show_frame_params()
+        # Cechy ramek jeszcze się liczą – po zakończeniu użyją już nowych progów
+        if ("mix" if self.selected_channel() is None else "channels") not in self.frame_stats:
+            return
+        with profiling.stage("analysis.rethreshold"):
+            regions = self.segment_regions()
+        self.clear_regions()
+        self.draw_regions(self.highlight_mode.get(), regions)
+
+    def clear_regions(self):
+        for collection in self.region_collections.values():
+            collection.remove()
+        self.region_spans = {}
+        self.region_collections = {}
+        legend = self.ax.get_legend()
+        if legend is not None:
+            legend.remove()
+
+    def draw_regions(self, mode, regions):
+        self.segment_job = None
+        self.clear_progress()
+        legend_patches = []
+
+        with profiling.stage("render.regions"):
+            self.add_region_artists(mode, regions, legend_patches)
 
         if legend_patches:
             self.ax.legend(handles=legend_patches, loc="upper right", fontsize=8)
 
-        self.canvas.draw()
+        with profiling.stage("render.canvas_draw"):
+            self.canvas.draw()
 
-        # Po narysowaniu wykresu usuwamy background,
-        # który zostanie zaktualizowany przy starcie odtwarzania
+        # Tło do blitowania musi zawierać nowe regiony
         self.background = None
+        if self.line is not None:
+            self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+
+    def add_region_artists(self, mode, regions, legend_patches):
+        # Jedna PolyCollection na klasę przedziałów zamiast osobnego axvspan
+        # dla każdego przedziału; wierzchołki ustawia update_regions
+        for name, class_rows in region_classes(mode, regions).items():
+            color, alpha, label = REGION_STYLES[name]
+            self.region_spans[name] = (class_rows[:, 0] / self.fs, class_rows[:, 1] / self.fs)
+            # Krawędź w kolorze wypełnienia (jak axvspan(color=...)) – wąskie
+            # przedziały mają co najmniej piksel szerokości
+            collection = PolyCollection([], color=color, alpha=alpha,
+                                        transform=self.ax.get_xaxis_transform())
+            self.ax.add_collection(collection, autolim=False)
+            self.region_collections[name] = collection
+            legend_patches.append(Patch(facecolor=color, alpha=alpha, label=label))
+        self.update_regions()
+
+    def export_wav(self):
+        """Zapisuje przedziały bieżącego trybu: nagranie bez ciszy albo osobne segmenty.
+
+        Próbki kopiowane są strumieniowo z pliku źródłowego (wszystkie kanały,
+        oryginalny format), więc eksport nie zależy od sygnału w pamięci.
+        """
+        if ("mix" if self.selected_channel() is None else "channels") not in self.frame_stats:
+            messagebox.showwarning("Eksport", "Segmentacja jeszcze trwa – spróbuj za chwilę.")
+            return
+        if self.export_job is not None:
+            return
+        regions = self.segment_regions()
+        stem = os.path.splitext(os.path.basename(self.filename))[0]
+        crossfade = int(self.export_crossfade_ms * self.fs / 1000)
+        if self.highlight_mode.get() == "silence":
+            path = filedialog.asksaveasfilename(defaultextension=".wav", initialfile=f"{stem}_bez_ciszy.wav",
+                                                filetypes=[("WAV files", "*.wav")])
+            if not path:
+                return
+            regions = keep_regions(regions, self.total_samples)
+            export = lambda source, progress: export_trimmed(source, regions, path, crossfade, progress=progress)
+        else:
+            out_dir = filedialog.askdirectory(title="Folder na segmenty")
+            if not out_dir:
+                return
+            export = lambda source, progress: export_segments(source, regions, out_dir, stem, crossfade,
+                                                              progress=progress)
+        self.set_progress("Eksport", 0.0)
+        self.export_job = self.executor.submit(
+            self.export_job_run, self.filename, export,
+            on_progress=lambda fraction, partial: self.set_progress("Eksport", fraction),
+            on_done=self.on_export_done,
+            on_error=self.on_analysis_error
+        )
+
+    def export_job_run(self, job, filename, export):
+        with profiling.stage("export.wav"):
+            return export(WavSource(filename, channel=None), job.report)
+
+    def on_export_done(self, stats):
+        self.export_job = None
+        self.clear_progress()
+        messagebox.showinfo("Eksport", stats.summary())
+
+    def set_progress(self, text, fraction):
+        self.progress_text.set(f"{text}: {fraction:.0%}")
+        self.progress_bar["value"] = fraction
+
+    def clear_progress(self):
+        if self.segment_job is None and self.params_job is None and self.export_job is None:
+            self.progress_text.set("")
+            self.progress_bar["value"] = 0
+
+    def on_analysis_error(self, error):
+        self.segment_job = None
+        self.params_job = None
+        self.export_job = None
+        self.clear_progress()
+        messagebox.showerror("Błąd", f"Analiza nie powiodła się:\n{error}")
+
+    def on_hash_ready(self, data, data_hash):
+        # Skrót mógł zostać policzony dla sygnału, który już nie jest wyświetlany
+        if data is self.data:
+            self.data_hash = data_hash
 
     def on_slider_move(self, value):
         if self.data is not None:
-            new_index = int(float(value) * self.fs) if self.fs else 0
-            self.current_index = np.clip(new_index, 0, self.total_samples)
+            self.current_index = self.signal.index_at(float(value))
             self.update_time_label(float(value))
 
             # Jeżeli linia istnieje, przesuwamy ją
@@ -351,53 +794,76 @@ class AudioApp:
         self.time_label.config(text=f"Czas: {minutes:02d}:{seconds:02d}")
 
     def calculate_and_display_frame_params(self):
-        frame_step = self.frame_size
-        rms_values = []
-        zcr_values = []
-        for i in range(0, self.total_samples, frame_step):
-            frame = self.data[i:i+frame_step]
-            if len(frame) == 0:
-                continue
-            rms = np.sqrt(np.mean(frame**2))
-            rms_values.append(rms)
-            zero_crosses = np.count_nonzero(np.diff(np.sign(frame)))
-            zcr = zero_crosses / len(frame) if len(frame) != 0 else 0
-            zcr_values.append(zcr)
-        avg_rms = np.mean(rms_values) if rms_values else 0
-        avg_zcr = np.mean(zcr_values) if zcr_values else 0
+        if self.params_job is not None:
+            self.params_job.cancel()
+        self.frame_params = None
+        self.frame_params_text.set("Parametry nagrania (ramkowe): obliczanie...")
+        self.params_job = self.executor.submit(
+            self.frame_params_job, self.data, self.frame_size, self.hop_size,
+            on_done=self.display_frame_params,
+            on_error=self.on_analysis_error
+        )
+
+    def frame_params_job(self, job, data, frame_size, hop_size):
+        rms_values = self.processor.frame_volume(data, frame_size, hop_size)
+        job.report(0.5)
+        zcr_values = self.processor.frame_zcr(data, frame_size, hop_size)
+        avg_rms = np.mean(rms_values) if len(rms_values) else 0
+        avg_zcr = np.mean(zcr_values) if len(zcr_values) else 0
+        return avg_rms, avg_zcr
+
+    def display_frame_params(self, params):
+        self.params_job = None
+        self.clear_progress()
+        self.frame_params = params
+        self.show_frame_params()
+
+    def show_frame_params(self):
+        # Wywoływane też po ruchu suwaków – tekst pokazuje aktualny próg ciszy
+        if self.frame_params is None:
+            return
+        avg_rms, avg_zcr = self.frame_params
         text = (
             f"Parametry nagrania (ramkowe):\n"
             f"  • Średni RMS (Volume): {avg_rms:.6f}\n"
             f"  • Średnie ZCR: {avg_zcr:.6f}\n"
-            f"(Próg ciszy: {self.silence_threshold})"
+            f"(Próg ciszy: {self.silence_threshold:.4g})"
         )
         self.frame_params_text.set(text)
 
     def audio_callback(self, outdata, frames, time_info, status):
-        """Funkcja wywoływana przez sounddevice przy każdej porcji danych."""
+        """Funkcja wywoływana przez sounddevice przy każdej porcji danych.
+
+        Ścieżka bez alokacji tablic: kopiujemy fragment play_buffer wprost do
+        outdata i aktualizujemy tylko liczniki statystyk.
+        """
+        started = time.perf_counter()
         if status:
-            #print("Status audio_callback:", status, flush=True)
-            pass
+            self.playback_stats.record_status(status)
 
         if (self.data is None) or (not self.playing) or (self.paused):
             outdata.fill(0)
+            self.playback_stats.record_callback(started, time_info)
             return
 
         end_index = self.current_index + frames
         if end_index > self.total_samples:
             end_index = self.total_samples
 
-        chunk = self.data[self.current_index:end_index]
-        out_len = len(chunk)
+        out_len = end_index - self.current_index
+        np.copyto(outdata[:out_len], self.play_buffer[self.current_index:end_index])
+        # Tylko kopia do bufora cyklicznego – obliczenia robi pętla GUI; wskaźniki
+        # pokazują wyświetlany sygnał (miks lub wybrany kanał)
+        self.live.ring.write(self.data[self.current_index:end_index])
         if out_len < frames:
-            outdata[:out_len, 0] = chunk
-            outdata[out_len:, 0] = 0
+            outdata[out_len:].fill(0)
             self.playing = False
             self.current_index = self.total_samples
         else:
-            outdata[:, 0] = chunk
             self.current_index = end_index
 
+        self.playback_stats.record_callback(started, time_info)
+
     def play_audio(self):
         if self.data is None or not self.stream:
             return
@@ -447,6 +913,10 @@ class AudioApp:
         if self.stream and self.stream.active:
             self.stream.stop()
 
+        if self.live is not None:
+            self.live.reset()
+            self.update_meters()
+
         # Usuwamy linię z osi, jeśli istnieje
         if self.line:
             self.line.remove()
@@ -475,7 +945,7 @@ class AudioApp:
     def update_ui(self):
         """Okresowo aktualizuje elementy interfejsu (czas, slider, linia)."""
         if self.data is not None and self.playing and not self.paused:
-            current_time = self.current_index / self.fs if self.fs else 0
+            current_time = self.signal.time_at(self.current_index)
 
             # Ustawiamy suwak
             if self.slider:
@@ -491,20 +961,68 @@ class AudioApp:
                 self.ax.draw_artist(self.line)
                 self.canvas.blit(self.ax.bbox)
 
+            # Wskaźniki cech ostatnio odtworzonego bloku
+            if self.live.update():
+                self.update_meters()
+            self.playback_stats_text.set(self.playback_stats.summary())
+
         # Wywołanie za 50 ms ponownie
         self.ui_after = self.master.after(50, self.update_ui)
 
+    def update_meters(self):
+        self.rms_meter["value"] = min(self.live.rms, 1.0)
+        self.zcr_meter["value"] = min(self.live.zcr, 0.5)
+        self.f0_text.set(f"F0: {self.live.f0:.0f} Hz" if self.live.f0 > 0 else "F0: –")
+
     def open_features_window(self):
         if self.data is None:
             messagebox.showwarning("Brak danych", "Najpierw wczytaj plik WAV!")
             return
-        FeaturesWindow(self.master, self.data, self.fs, self.frame_size, self.silence_threshold)
+        analysis = self.analysis_signal
+        channel = self.selected_channel()
+        # Bramkowanie F0 tymi samymi progami i RMS/ZCR ramek co segmentacja (jeśli już policzone)
+        frame_stats = self.frame_stats.get("mix" if channel is None else "channels")
+        if frame_stats is not None and channel is not None:
+            frame_stats = (frame_stats[0][:, channel], frame_stats[1][:, channel])
+        window = FeaturesWindow(self.master, self.data, self.fs, self.frame_size, self.silence_threshold,
+                                cache=self.feature_cache, data_hash=self.data_hash, executor=self.executor,
+                                hop_size=self.hop_size, analysis_data=analysis.view(channel),
+                                analysis_fs=analysis.fs, vol_threshold=self.vol_threshold,
+                                zcr_threshold=self.zcr_threshold, frame_stats=frame_stats)
+        self.features_windows = [w for w in self.features_windows if w.top.winfo_exists()] + [window]
+
+    def close_features_windows(self):
+        for window in self.features_windows:
+            if window.top.winfo_exists():
+                window.on_close()
+        self.features_windows = []
+
+    def show_profile(self):
+        top = tk.Toplevel(self.master)
+        top.title("Profil etapów")
+        text = tk.Text(top, width=100, height=25, font=("Courier", 9))
+        text.pack(fill="both", expand=True)
+
+        def refresh():
+            text.delete("1.0", tk.END)
+            text.insert(tk.END, profiling.report())
+
+        ttk.Button(top, text="Odśwież", command=refresh).pack(pady=5)
+        refresh()
 
     def on_close(self):
+        profiling.dump()
+        self.executor.shutdown()
         self.stop_audio()
+        stats_path = os.environ.get("AUDIO_APP_PLAYBACK_STATS")
+        if stats_path:
+            self.playback_stats.dump(stats_path)
         if self.ui_after is not None:
             self.master.after_cancel(self.ui_after)
             self.ui_after = None
+        if self.threshold_after is not None:
+            self.master.after_cancel(self.threshold_after)
+            self.threshold_after = None
         if self.stream:
             self.stream.close()
             self.stream = None
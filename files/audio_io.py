@@ -0,0 +1,201 @@
+import struct
+
+import numpy as np
+from scipy.io import wavfile
+from scipy.signal import resample_poly
+
+# Rozmiar porcji (w próbkach) przy strumieniowym przetwarzaniu pliku
+CHUNK_SAMPLES = 1 << 20
+# Największy rozmiar pliku RIFF/WAV (pole 32-bitowe); większe zapisujemy jako RF64
+RIFF_MAX_BYTES = 0xFFFFFFFF
+
+
+class WavSource:
+    """Plik WAV zmapowany w pamięci (np.memmap) zamiast wczytanego w całości.
+
+    Próbki wybranego kanału są normalizowane do [-1, 1] leniwie – dopiero
+    przy odczycie fragmentu (read/iter_chunks) lub przy budowie tablicy
+    float32 (to_float32), zawsze porcjami po CHUNK_SAMPLES.
+    channel=None wybiera wszystkie kanały: próbki mają wtedy kształt
+    (próbki, kanały) także dla plików mono, a szczyt jest wspólny dla
+    wszystkich kanałów (zachowane są proporcje głośności między kanałami).
+    Szczyt liczony jest przy pierwszym odczycie znormalizowanym – kopiowanie
+    surowych próbek (np. eksport fragmentów) nie wymaga przejścia po pliku.
+    Plików PCM 24-bit scipy nie mapuje – są wczytywane w całości (jako int32)
+    i mają mapped=False; eksport fragmentów ich nie obsługuje.
+    """
+
+    def __init__(self, path, channel=0):
+        self.path = path
+        try:
+            self.fs, self.raw = wavfile.read(path, mmap=True)
+        except ValueError:
+            # np. 24-bitowe pliki nie dają się zmapować – czytamy je zwyczajnie
+            self.fs, self.raw = wavfile.read(path)
+        self.mapped = isinstance(self.raw, np.memmap)
+
+        self.channels = self.raw.shape[1] if self.raw.ndim > 1 else 1
+        self.channel = channel
+        if channel is None:
+            self.samples = self.raw if self.raw.ndim > 1 else self.raw[:, np.newaxis]
+        else:
+            self.samples = self.raw[:, channel] if self.raw.ndim > 1 else self.raw
+        self.peak_value = None
+
+    def __len__(self):
+        return len(self.samples)
+
+    @property
+    def duration(self):
+        return len(self) / self.fs if self.fs else 0.0
+
+    @property
+    def peak(self):
+        if self.peak_value is None:
+            self.peak_value = self.compute_peak()
+        return self.peak_value
+
+    def iter_raw_chunks(self, chunk_size=CHUNK_SAMPLES):
+        for start in range(0, len(self.samples), chunk_size):
+            yield start, self.samples[start:start + chunk_size]
+
+    def compute_peak(self):
+        # Jedno strumieniowe przejście; rzutowanie na float32 porcjami
+        # (np.abs na int16 przepełnia się dla -32768)
+        peak = 0.0
+        for _, chunk in self.iter_raw_chunks():
+            peak = max(peak, float(np.max(np.abs(chunk.astype(np.float32)))))
+        return peak
+
+    def read(self, start, stop):
+        chunk = self.samples[start:stop].astype(np.float32)
+        if self.peak > 1e-9:
+            chunk /= np.float32(self.peak)
+        return chunk
+
+    def iter_chunks(self, chunk_size=CHUNK_SAMPLES):
+        """Zwraca kolejne pary (start, znormalizowana porcja float32)."""
+        for start in range(0, len(self.samples), chunk_size):
+            yield start, self.read(start, start + chunk_size)
+
+    def to_float32(self, out=None):
+        """Buduje znormalizowany sygnał float32, wypełniając go porcjami.
+
+        Szczytowe zużycie pamięci to jedna tablica float32 i jedna porcja.
+        """
+        if out is None:
+            out = np.empty(self.samples.shape, dtype=np.float32)
+        for start, chunk in self.iter_chunks():
+            out[start:start + len(chunk)] = chunk
+        return out
+
+
+class WavWriter:
+    """Strumieniowy zapis WAV: nagłówek od razu, próbki porcjami przez write().
+
+    Format (PCM 8/16/32 bit lub float) wynika z dtype próbek. Rozmiary w
+    nagłówku uzupełnia close(); miejsce na blok ds64 rezerwuje blok JUNK, więc
+    plik większy niż 4 GB zamieniany jest wtedy na RF64 bez przepisywania danych.
+    """
+
+    def __init__(self, path, fs, channels, dtype):
+        self.path = path
+        self.dtype = np.dtype(dtype).newbyteorder("<")
+        self.channels = channels
+        self.frames = 0
+        is_float = self.dtype.kind == "f"
+        width = self.dtype.itemsize
+        fmt = struct.pack("<HHIIHH", 3 if is_float else 1, channels, int(fs), int(fs) * width * channels,
+                          width * channels, 8 * width)
+        if is_float:
+            fmt += b"\x00\x00"
+        header = b"RIFF\x00\x00\x00\x00WAVE" + b"JUNK" + struct.pack("<I", 28) + bytes(28)
+        header += b"fmt " + struct.pack("<I", len(fmt)) + fmt
+        # Próbki float wymagają bloku fact z liczbą ramek
+        self.fact_offset = None
+        if is_float:
+            self.fact_offset = len(header) + 8
+            header += b"fact" + struct.pack("<I", 4) + bytes(4)
+        header += b"data\x00\x00\x00\x00"
+        self.data_offset = len(header)
+        self.file = open(path, "wb")
+        self.file.write(header)
+
+    @property
+    def nbytes(self):
+        return self.frames * self.channels * self.dtype.itemsize
+
+    def write(self, samples):
+        samples = np.asarray(samples, dtype=self.dtype)
+        self.file.write(samples.tobytes())
+        self.frames += len(samples)
+
+    def close(self):
+        if self.file.closed:
+            return
+        data_bytes = self.nbytes
+        if data_bytes % 2:
+            self.file.write(b"\x00")
+        riff_bytes = self.file.tell() - 8
+        if riff_bytes > RIFF_MAX_BYTES:
+            self.file.seek(0)
+            self.file.write(b"RF64" + struct.pack("<I", RIFF_MAX_BYTES) + b"WAVE")
+            self.file.write(b"ds64" + struct.pack("<IQQQI", 28, riff_bytes, data_bytes, self.frames, 0))
+            sizes = (RIFF_MAX_BYTES, min(self.frames, RIFF_MAX_BYTES))
+        else:
+            self.file.seek(4)
+            self.file.write(struct.pack("<I", riff_bytes))
+            sizes = (data_bytes, self.frames)
+        self.file.seek(self.data_offset - 4)
+        self.file.write(struct.pack("<I", sizes[0]))
+        if self.fact_offset is not None:
+            self.file.seek(self.fact_offset)
+            self.file.write(struct.pack("<I", sizes[1]))
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def mixdown(data):
+    """Średnia kanałów sygnału (próbki, kanały) jako sygnał mono float32.
+
+    Dla jednego kanału zwraca widok bez kopiowania.
+    """
+    if data.ndim == 1:
+        return data
+    if data.shape[1] == 1:
+        return data[:, 0]
+    out = np.empty(len(data), dtype=np.float32)
+    if data.dtype == np.float32 and data.shape[1] < 8:
+        # Suma kolumn daje bit w bit to samo co np.mean (poniżej 8 składników
+        # NumPy sumuje po kolei), a jest kilka razy szybsza niż redukcja po osi 1
+        np.copyto(out, data[:, 0])
+        for channel in range(1, data.shape[1]):
+            out += data[:, channel]
+        out /= np.float32(data.shape[1])
+        return out
+    for start in range(0, len(data), CHUNK_SAMPLES):
+        np.mean(data[start:start + CHUNK_SAMPLES], axis=1, out=out[start:start + CHUNK_SAMPLES])
+    return out
+
+
+def decimation_factor(fs, rate):
+    # Całkowity krok decymacji q, przy którym fs / q >= rate (1 – bez decymacji)
+    if not rate or rate >= fs:
+        return 1
+    return max(1, int(fs // rate))
+
+
+def decimate(data, factor):
+    """Co factor-ta próbka sygnału (próbki[, kanały]) po filtrze antyaliasingowym.
+
+    Filtr i decymacja wykonywane są naraz metodą wielofazową (resample_poly),
+    więc próbka i wyniku odpowiada dokładnie próbce i * factor oryginału.
+    """
+    if factor == 1:
+        return data
+    return resample_poly(data, 1, factor, axis=0).astype(np.float32, copy=False)
@@ -1,71 +1,140 @@
 import numpy as np
-from features import compute_volume, compute_zcr
+from features import classify_frames, sliding_volume, sliding_zcr
+import profiling
+
+
+def mask_to_runs(mask):
+    """Zamienia maskę ramek na przedziały [start, koniec) kolejnych wartości True."""
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.astype(np.int8), [0]))))
+    return edges[0::2], edges[1::2]
+
+
+def mask_to_channel_runs(mask):
+    """Jak mask_to_runs dla maski (ramki, kanały) – wszystkie kanały naraz.
+
+    Zwraca (kanały, starty, końce) przedziałów posortowanych wg kanału.
+    """
+    padded = np.zeros((mask.shape[1], mask.shape[0] + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask.T
+    channel, edges = np.nonzero(np.diff(padded, axis=1))
+    return channel[0::2], edges[0::2], edges[1::2]
+
+
+def split_by_channel(channel, rows, channels):
+    # Lista wierszy -> lista list wierszy dla kolejnych kanałów
+    counts = np.bincount(channel, minlength=channels)
+    bounds = np.concatenate(([0], np.cumsum(counts)))
+    return [rows[bounds[c]:bounds[c + 1]] for c in range(channels)]
+
+
+def frames_to_samples(frame_idx, hop_size, total_samples):
+    # Indeks ramki -> indeks próbki (początek ramki); koniec ostatniej ramki to koniec sygnału
+    return np.minimum(frame_idx * hop_size, total_samples)
+
+
+def rescale_regions(regions, factor, total_samples):
+    """Przedziały z sygnału zdecymowanego factor razy -> indeksy próbek oryginału.
+
+    Przyjmuje wynik detect_silence / detect_voiced_unvoiced (także listę
+    list dla kanałów); dodatkowe pola (np. dźwięczność) są zachowane.
+    """
+    if factor == 1:
+        return regions
+    if regions and isinstance(regions[0], list):
+        return [rescale_regions(channel, factor, total_samples) for channel in regions]
+    return [
+        (min(start * factor, total_samples), min(end * factor, total_samples)) + tuple(rest)
+        for start, end, *rest in regions
+    ]
+
+
+def silence_regions(rms, hop_size, total_samples, silence_threshold):
+    """Przedziały ciszy [(start, koniec), ...] w próbkach z RMS ramek co hop_size.
+
+    Samo progowanie i kodowanie długości serii – przy zmianie progu nie trzeba
+    ponownie liczyć cech ramek. rms (ramki, kanały) daje listę dla każdego kanału.
+    """
+    # Przy nakładaniu ramek granica przedziału to początek ramki, więc
+    # rozdzielczość granic wynosi hop_size próbek
+    if rms.ndim == 1:
+        starts, ends = mask_to_runs(rms < silence_threshold)
+        channel = np.zeros(len(starts), dtype=int)
+    else:
+        channel, starts, ends = mask_to_channel_runs(rms < silence_threshold)
+    starts = frames_to_samples(starts, hop_size, total_samples)
+    ends = frames_to_samples(ends, hop_size, total_samples)
+    regions = [(int(s), int(e)) for s, e in zip(starts, ends)]
+    if rms.ndim == 1:
+        return regions
+    return split_by_channel(channel, regions, rms.shape[1])
+
+
+def voiced_unvoiced_regions(rms, zcr_val, hop_size, total_samples, vol_threshold=0.02, zcr_threshold=0.3,
+                            silence_threshold=0.001):
+    """Segmenty [(start, koniec, dźwięczny), ...] z RMS i ZCR ramek co hop_size (bez ciszy)."""
+    mono = rms.ndim == 1
+    if mono:
+        rms, zcr_val = rms[:, np.newaxis], zcr_val[:, np.newaxis]
+    channels = rms.shape[1]
+    if len(rms) == 0:
+        return [] if mono else [[] for _ in range(channels)]
+
+    state = classify_frames(rms, zcr_val, vol_threshold, zcr_threshold, silence_threshold)
+
+    # Segment to ciąg ramek o tym samym stanie (osobno w każdym kanale);
+    # granice wszystkich kanałów wyznaczamy naraz, odrzucamy segmenty ciszy
+    bounds = np.ones((channels, len(state) + 1), dtype=bool)
+    bounds[:, 1:-1] = (state[1:] != state[:-1]).T
+    channel, edges = np.nonzero(bounds)
+    same = channel[1:] == channel[:-1]
+    channel, seg_starts, seg_ends = channel[:-1][same], edges[:-1][same], edges[1:][same]
+    seg_state = state[seg_starts, channel]
+    keep = seg_state != -1
+    channel, seg_starts, seg_ends = channel[keep], seg_starts[keep], seg_ends[keep]
+    is_voiced = seg_state[keep] == 1
+
+    seg_starts = frames_to_samples(seg_starts, hop_size, total_samples)
+    seg_ends = frames_to_samples(seg_ends, hop_size, total_samples)
+    segments = [(int(s), int(e), bool(v)) for s, e, v in zip(seg_starts, seg_ends, is_voiced)]
+    if mono:
+        return segments
+    return split_by_channel(channel, segments, channels)
 
 
 class BaseAudioProcessor:
 
-    def detect_silence(self, data, fs, frame_size, silence_threshold):
-        total_samples = len(data)
-        frame_step = frame_size
-        silence_regions = []
-        in_silence = False
-        start_silence = 0
-        for i in range(0, total_samples, frame_step):
-            frame = data[i:i + frame_size]
-            if len(frame) == 0:
-                continue
-            # Używamy compute_volume do obliczenia RMS
-            rms = compute_volume(frame)
-            if rms < silence_threshold:
-                if not in_silence:
-                    in_silence = True
-                    start_silence = i
-            else:
-                if in_silence:
-                    silence_regions.append((start_silence, i))
-                    in_silence = False
-        if in_silence:
-            silence_regions.append((start_silence, total_samples))
-        return silence_regions
+    def frame_volume(self, data, frame_size, hop_size=None):
+        # RMS ramek co hop_size próbek (domyślnie bez nakładania); ramki
+        # na końcu sygnału są krótsze – nie są dopełniane zerami
+        return sliding_volume(data, frame_size, hop_size, pad=False)
+
+    @profiling.timed("analysis.detect_silence")
+    def detect_silence(self, data, fs, frame_size, silence_threshold, hop_size=None):
+        """Przedziały ciszy [(start, koniec), ...] w próbkach.
+
+        Dla sygnału (próbki, kanały) cechy wszystkich kanałów liczone są
+        w jednym przejściu, a wynikiem jest lista przedziałów dla każdego kanału.
+        """
+        hop_size = hop_size or frame_size
+        rms = self.frame_volume(data, frame_size, hop_size)
+        return silence_regions(rms, hop_size, len(data), silence_threshold)
 
 
 class VoicedAudioProcessor(BaseAudioProcessor):
 
+    def frame_zcr(self, data, frame_size, hop_size=None):
+        return sliding_zcr(data, frame_size, hop_size, pad=False)
+
+    @profiling.timed("analysis.frame_stats")
+    def frame_stats(self, data, frame_size, hop_size=None):
+        """RMS i ZCR ramek – wszystko, czego potrzebuje segmentacja przy dowolnych progach."""
+        return self.frame_volume(data, frame_size, hop_size), self.frame_zcr(data, frame_size, hop_size)
+
+    @profiling.timed("analysis.detect_voiced_unvoiced")
     def detect_voiced_unvoiced(self, data, fs, frame_size, vol_threshold=0.02, zcr_threshold=0.3,
-                               silence_threshold=0.001):
-
-        total_samples = len(data)
-        frame_step = frame_size
-        results = []
-        current_state = None
-        start_idx = 0
-
-        for i in range(0, total_samples, frame_step):
-            frame = data[i:i + frame_size]
-            if len(frame) == 0:
-                continue
-
-            # Obliczamy RMS ramki za pomocą compute_volume
-            rms = compute_volume(frame)
-            # Jeśli ramka jest cicha, kończymy bieżący segment (jeśli istnieje)
-            if rms < silence_threshold:
-                if current_state is not None:
-                    results.append((start_idx, i, current_state))
-                    current_state = None
-                continue
-
-            # Obliczamy ZCR dla niecichych ramek
-            zcr_val = compute_zcr(frame)
-            # Klasyfikacja: dźwięczny, gdy RMS > vol_threshold i ZCR < zcr_threshold
-            is_voiced = (rms > vol_threshold and zcr_val < zcr_threshold)
-            if current_state is None:
-                current_state = is_voiced
-                start_idx = i
-            elif is_voiced != current_state:
-                results.append((start_idx, i, current_state))
-                current_state = is_voiced
-                start_idx = i
-
-        if current_state is not None:
-            results.append((start_idx, total_samples, current_state))
-        return results
+                               silence_threshold=0.001, hop_size=None):
+
+        hop_size = hop_size or frame_size
+        rms, zcr_val = self.frame_stats(data, frame_size, hop_size)
+        return voiced_unvoiced_regions(rms, zcr_val, hop_size, len(data), vol_threshold, zcr_threshold,
+                                       silence_threshold)
@@ -0,0 +1,88 @@
+import numpy as np
+
+from audio_io import WavSource, decimate, decimation_factor, mixdown
+
+
+class AudioSignal:
+    """Znormalizowany sygnał float32 (próbki, kanały) z częstotliwością fs.
+
+    Oś czasu nie jest przechowywana: czasy liczone są z fs tylko dla
+    potrzebnych indeksów (times, time_at). Pojedyncze kanały to widoki bez
+    kopiowania, a miks powstaje dopiero przy pierwszym użyciu (dla jednego
+    kanału jest widokiem).
+    """
+
+    def __init__(self, samples, fs):
+        samples = np.asarray(samples, dtype=np.float32)
+        self.samples = samples if samples.ndim > 1 else samples[:, np.newaxis]
+        self.fs = fs
+        self.mix_samples = None
+        # Krok decymacji -> sygnał o niższej częstotliwości do analizy
+        self.decimated_signals = {}
+
+    @classmethod
+    def from_wav(cls, path):
+        # Plik (także niezmapowany, np. 24-bitowy) jest zwalniany od razu po
+        # zbudowaniu tablicy float32 – trzymamy tylko próbki znormalizowane
+        source = WavSource(path, channel=None)
+        return cls(source.to_float32(), source.fs)
+
+    def __len__(self):
+        return len(self.samples)
+
+    @property
+    def channels(self):
+        return self.samples.shape[1]
+
+    @property
+    def duration(self):
+        return len(self) / self.fs if self.fs else 0.0
+
+    @property
+    def nbytes(self):
+        # Pamięć próbek i miksu (jeśli jest osobną tablicą)
+        extra = self.mix_samples.nbytes if self.mix_samples is not None and self.channels > 1 else 0
+        extra += sum(signal.nbytes for signal in self.decimated_signals.values())
+        return self.samples.nbytes + extra
+
+    def time_at(self, index):
+        return index / self.fs if self.fs else 0.0
+
+    def index_at(self, t):
+        return min(max(int(t * self.fs), 0), len(self)) if self.fs else 0
+
+    def times(self, start=0, stop=None, step=1):
+        """Czasy [s] próbek start, start + step, ... < stop – liczone na żądanie."""
+        stop = len(self) if stop is None else min(stop, len(self))
+        return np.arange(start, stop, step) / self.fs
+
+    def channel(self, index):
+        return self.samples[:, index]
+
+    def mix(self):
+        if self.mix_samples is None:
+            self.mix_samples = mixdown(self.samples)
+        return self.mix_samples
+
+    def view(self, channel=None):
+        """Sygnał 1-D do wyświetlania i analizy: miks (None) albo wybrany kanał."""
+        return self.mix() if channel is None else self.channel(channel)
+
+    def decimated(self, rate):
+        """Sygnał do analizy F0 i segmentacji o częstotliwości fs / q >= rate.
+
+        q jest całkowite, więc próbka i sygnału zdecymowanego to próbka
+        i * q oryginału. Wynik budowany jest raz i zapamiętywany; bez
+        decymacji (rate brak lub >= fs) zwracany jest ten sam sygnał.
+        """
+        factor = decimation_factor(self.fs, rate)
+        if factor == 1:
+            return self
+        if factor not in self.decimated_signals:
+            fs = self.fs // factor if self.fs % factor == 0 else self.fs / factor
+            self.decimated_signals[factor] = AudioSignal(decimate(self.samples, factor), fs)
+        return self.decimated_signals[factor]
+
+    def decimation(self, signal):
+        # Krok decymacji sygnału zwróconego przez decimated()
+        return int(round(self.fs / signal.fs))
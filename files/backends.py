@@ -0,0 +1,415 @@
+"""Rejestr implementacji (backendów) jąder cech z wyborem najszybszej poprawnej.
+
+Każde jądro (volume, zcr, f0_autocorr, f0_amdf) może mieć kilka
+implementacji o tym samym interfejsie co funkcje wsadowe z features.py
+(macierz ramek -> wartość na ramkę):
+    python  – funkcje referencyjne wywoływane dla każdej ramki,
+    numpy   – wersje wsadowe z features.py (domyślne),
+    scipy   – scipy.signal.fftconvolve / scipy.fft z wieloma wątkami,
+    numba   – pętle kompilowane JIT (tylko gdy numba jest zainstalowana).
+
+Wybrany backend trafia do features.FEATURE_KERNELS, więc używają go
+map_frames/compute_feature (okno cech, analiza wsadowa) i wskaźniki na żywo.
+Przy domyślnym backendzie RMS i ZCR liczone są oknem przesuwnym.
+
+Wybór:
+    AUDIO_APP_BACKENDS=auto python main.py               # kalibracja (raz na maszynę)
+    AUDIO_APP_BACKENDS=f0_amdf=scipy,volume=numba python main.py
+    python backends.py [--force]                         # tabela kalibracji
+Kalibracja sprawdza każdy backend względem implementacji referencyjnej
+na sygnale syntetycznym i wybiera najszybszy zgodny; wynik zapisywany jest
+w CALIBRATION_FILE razem z opisem maszyny i wersji bibliotek.
+"""
+import argparse
+import functools
+import json
+import os
+import platform
+import sys
+import time
+import types
+
+import numpy as np
+import scipy
+import scipy.fft
+import scipy.signal
+
+import features
+from features import (
+    compute_volume, compute_zcr, compute_autocorr_f0, compute_amdf_f0, amdf_lag_range,
+    autocorr_f0_from_corr
+)
+from feature_cache import DEFAULT_CACHE_DIR
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+CALIBRATION_VERSION = 1
+CALIBRATION_FILE = os.path.join(DEFAULT_CACHE_DIR, "backends.json")
+
+# Jądro -> czy wymaga fs
+KERNELS = {
+    "volume": False,
+    "zcr": False,
+    "f0_autocorr": True,
+    "f0_amdf": True,
+}
+
+# Zgodność z referencją: (tolerancja względna, minimalny odsetek zgodnych ramek).
+# Dla F0 porównujemy tylko ramki o RMS > F0_MIN_RMS; AMDF w wersji NumPy
+# szuka minimum średniej kwadratów różnic, więc dopuszczamy część rozbieżnych
+# ramek (na sygnale kalibracyjnym zgodnych jest ok. 85–90%).
+TOLERANCES = {
+    "volume": (1e-4, 1.0),
+    "zcr": (1e-6, 1.0),
+    "f0_autocorr": (0.01, 0.98),
+    "f0_amdf": (0.05, 0.8),
+}
+F0_MIN_RMS = 0.02
+
+BACKENDS = {kernel: {} for kernel in KERNELS}
+ACTIVE = {kernel: "numpy" for kernel in KERNELS}
+
+
+def register(kernel, backend, func):
+    BACKENDS[kernel][backend] = func
+
+
+def available(kernel):
+    return list(BACKENDS[kernel])
+
+
+def select(kernel, backend):
+    """Ustawia implementację jądra używaną przez features.compute_feature."""
+    if backend not in BACKENDS[kernel]:
+        raise ValueError(f"Brak backendu {backend!r} dla {kernel!r} (dostępne: {', '.join(available(kernel))})")
+    if backend == "numpy":
+        features.FEATURE_KERNELS[kernel] = features.DEFAULT_KERNELS[kernel]
+    else:
+        features.FEATURE_KERNELS[kernel] = (BACKENDS[kernel][backend], KERNELS[kernel])
+    ACTIVE[kernel] = backend
+
+
+def active():
+    return dict(ACTIVE)
+
+
+# --- python: implementacje referencyjne, ramka po ramce ---
+
+def per_frame(func):
+    @functools.wraps(func)
+    def run(frames, *args, **kwargs):
+        return np.array([func(frame, *args, **kwargs) for frame in frames], dtype=np.float64)
+    return run
+
+
+# --- scipy ---
+
+def autocorr_f0_scipy(frames, fs, fmin=50, fmax=500):
+    frames = np.asarray(frames, dtype=np.float64)
+    if frames.shape[0] == 0 or frames.shape[1] == 0:
+        return np.zeros(len(frames))
+    frames = frames - np.mean(frames, axis=1, keepdims=True)
+    corr = scipy.signal.fftconvolve(frames, frames[:, ::-1], mode="full", axes=1)[:, frames.shape[1] - 1:]
+    corr[np.abs(corr) <= 1e-10 * corr[:, :1]] = 0.0
+    return autocorr_f0_from_corr(corr, fs, fmin, fmax)
+
+
+# scipy.fft liczy wiele ramek naraz w kilku wątkach
+SCIPY_FFT = types.SimpleNamespace(
+    rfft=functools.partial(scipy.fft.rfft, workers=-1),
+    irfft=functools.partial(scipy.fft.irfft, workers=-1),
+)
+
+
+def amdf_f0_scipy(frames, fs, fmin=50, fmax=500):
+    return features.compute_amdf_f0_batch(frames, fs, fmin, fmax, fft=SCIPY_FFT)
+
+
+# --- pętle dla numba (bez numby są zwykłym, wolnym Pythonem) ---
+
+def volume_loops(frames):
+    rows, length = frames.shape
+    out = np.zeros(rows)
+    if length == 0:
+        return out
+    for i in range(rows):
+        acc = 0.0
+        for j in range(length):
+            x = float(frames[i, j])
+            acc += x * x
+        out[i] = np.sqrt(acc / length)
+    return out
+
+
+def zcr_loops(frames):
+    rows, length = frames.shape
+    out = np.zeros(rows)
+    if length == 0:
+        return out
+    for i in range(rows):
+        count = 0
+        x = frames[i, 0]
+        prev = 1 if x > 0 else (-1 if x < 0 else 0)
+        for j in range(1, length):
+            x = frames[i, j]
+            sign = 1 if x > 0 else (-1 if x < 0 else 0)
+            if sign != prev:
+                count += 1
+            prev = sign
+        out[i] = count / length
+    return out
+
+
+def autocorr_f0_loops(frames, fs, fmin, fmax):
+    # Autokorelacja liczona opóźnienie po opóźnieniu aż do pierwszego wzrostu;
+    # opóźnienia dające F0 < fmin i tak dają 0, więc dalej nie liczymy
+    rows, length = frames.shape
+    out = np.zeros(rows)
+    for i in range(rows):
+        mean = 0.0
+        for j in range(length):
+            mean += frames[i, j]
+        mean /= max(length, 1)
+        x = np.empty(length)
+        for j in range(length):
+            x[j] = frames[i, j] - mean
+        prev = 0.0
+        for j in range(length):
+            prev += x[j] * x[j]
+        for k in range(1, length):
+            lag = k - 1
+            if lag > 0 and fs / lag < fmin:
+                break
+            corr = 0.0
+            for j in range(length - k):
+                corr += x[j] * x[j + k]
+            if corr > prev:
+                if lag > 0 and fs / lag <= fmax:
+                    out[i] = fs / lag
+                break
+            prev = corr
+    return out
+
+
+def amdf_f0_loops(frames, fs, fmin, fmax, min_lag, max_lag):
+    rows, length = frames.shape
+    out = np.zeros(rows)
+    for i in range(rows):
+        best_lag = min_lag
+        best = np.inf
+        for tau in range(min_lag, max_lag):
+            acc = 0.0
+            for j in range(length - tau):
+                # Odjęcie średniej (jak w compute_amdf_f0) nie zmienia różnic
+                acc += abs(frames[i, j] - frames[i, j + tau])
+            value = acc / (length - tau)
+            if value < best:
+                best = value
+                best_lag = tau
+        f0 = fs / best_lag
+        if fmin <= f0 <= fmax:
+            out[i] = f0
+    return out
+
+
+def numba_kernels():
+    jit = numba.njit(cache=True)
+    volume, zcr = jit(volume_loops), jit(zcr_loops)
+    autocorr, amdf = jit(autocorr_f0_loops), jit(amdf_f0_loops)
+
+    def autocorr_f0_numba(frames, fs, fmin=50, fmax=500):
+        return autocorr(np.ascontiguousarray(frames, dtype=np.float64), float(fs), float(fmin), float(fmax))
+
+    def amdf_f0_numba(frames, fs, fmin=50, fmax=500):
+        frames = np.ascontiguousarray(frames, dtype=np.float64)
+        min_lag, max_lag = amdf_lag_range(frames.shape[1], fs, fmin, fmax)
+        if frames.shape[1] == 0 or min_lag < 1 or min_lag >= max_lag:
+            return np.zeros(len(frames))
+        return amdf(frames, float(fs), float(fmin), float(fmax), min_lag, max_lag)
+
+    return {
+        "volume": lambda frames: volume(np.ascontiguousarray(frames)),
+        "zcr": lambda frames: zcr(np.ascontiguousarray(frames)),
+        "f0_autocorr": autocorr_f0_numba,
+        "f0_amdf": amdf_f0_numba,
+    }
+
+
+register("volume", "python", per_frame(compute_volume))
+register("zcr", "python", per_frame(compute_zcr))
+register("f0_autocorr", "python", per_frame(compute_autocorr_f0))
+register("f0_amdf", "python", per_frame(compute_amdf_f0))
+for _kernel in KERNELS:
+    register(_kernel, "numpy", features.DEFAULT_KERNELS[_kernel][0])
+register("f0_autocorr", "scipy", autocorr_f0_scipy)
+register("f0_amdf", "scipy", amdf_f0_scipy)
+if numba is not None:
+    for _kernel, _func in numba_kernels().items():
+        register(_kernel, "numba", _func)
+
+
+# --- kalibracja ---
+
+def calibration_signal(fs=16000, seconds=4.0, seed=0):
+    """Sygnał do kalibracji: ton harmoniczny o zmiennym F0, szum i cisza."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * fs)) / fs
+    f0 = 100 + 150 * (0.5 + 0.5 * np.sin(2 * np.pi * 0.3 * t))
+    phase = 2 * np.pi * np.cumsum(f0) / fs
+    x = sum(0.3 / k * np.sin(k * phase) for k in range(1, 5))
+    quarter = len(t) // 4
+    x[quarter:2 * quarter] = 0.05 * rng.standard_normal(quarter)
+    x[3 * quarter:3 * quarter + quarter // 2] = 0.0
+    return x.astype(np.float32), fs
+
+
+def agreement(kernel, values, reference, rms):
+    """Odsetek ramek zgodnych z referencją w granicach tolerancji jądra."""
+    rtol, _ = TOLERANCES[kernel]
+    values, reference = np.asarray(values, dtype=np.float64), np.asarray(reference, dtype=np.float64)
+    if values.shape != reference.shape:
+        return 0.0
+    if kernel.startswith("f0"):
+        values, reference = values[rms > F0_MIN_RMS], reference[rms > F0_MIN_RMS]
+    if len(values) == 0:
+        return 1.0
+    return float(np.mean(np.isclose(values, reference, rtol=rtol, atol=1e-9)))
+
+
+def time_kernel(func, args, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def calibrate(frame_size=1024, repeat=3, kernels=None, apply=True):
+    """Mierzy zgodne z referencją backendy i (apply=True) wybiera najszybsze.
+
+    Zwraca {jądro: {backend: {"agreement", "ok", "time_s"}}} oraz wybór
+    pod kluczem "selected".
+    """
+    data, fs = calibration_signal()
+    frames, _ = features.frame_signal(data, frame_size)
+    frames = np.ascontiguousarray(frames)
+    rms = features.compute_volume_batch(frames)
+    report = {"selected": {}}
+    for kernel in kernels or KERNELS:
+        args = (frames, fs) if KERNELS[kernel] else (frames,)
+        reference = BACKENDS[kernel]["python"](*args)
+        results = {}
+        for backend, func in BACKENDS[kernel].items():
+            try:
+                func(*args)  # rozgrzewka (kompilacja JIT, plany FFT)
+                score = agreement(kernel, func(*args), reference, rms)
+            except Exception as e:
+                results[backend] = {"agreement": 0.0, "ok": False, "time_s": None, "error": str(e)}
+                continue
+            ok = score >= TOLERANCES[kernel][1]
+            results[backend] = {
+                "agreement": score,
+                "ok": ok,
+                # Referencja zawsze jest poprawna, ale nigdy najszybsza – mierzymy ją raz
+                "time_s": time_kernel(func, args, 1 if backend == "python" else repeat) if ok else None,
+            }
+        correct = {b: r["time_s"] for b, r in results.items() if r["ok"]}
+        report[kernel] = results
+        report["selected"][kernel] = min(correct, key=correct.get)
+        if apply:
+            select(kernel, report["selected"][kernel])
+    return report
+
+
+def host_fingerprint():
+    # Wynik kalibracji jest ważny tylko dla tej samej maszyny, bibliotek i rejestru
+    return {
+        "version": CALIBRATION_VERSION,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpus": os.cpu_count(),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "numba": numba.__version__ if numba is not None else None,
+        "backends": {kernel: sorted(impls) for kernel, impls in BACKENDS.items()},
+    }
+
+
+def load_or_calibrate(path=CALIBRATION_FILE, force=False):
+    """Stosuje zapisany wybór backendów albo kalibruje i zapisuje go do path."""
+    if not force:
+        try:
+            with open(path) as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            saved = None
+        if saved and saved.get("host") == host_fingerprint():
+            for kernel, backend in saved["selected"].items():
+                select(kernel, backend)
+            return saved
+    report = calibrate()
+    report["host"] = host_fingerprint()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(report, f, indent=2)
+    os.replace(tmp_path, path)
+    return report
+
+
+def configure(spec):
+    """Wybór z napisu: "auto", nazwa backendu dla wszystkich jąder lub "jądro=backend,..."."""
+    spec = (spec or "").strip()
+    if not spec:
+        return
+    if spec == "auto":
+        load_or_calibrate()
+        return
+    for item in spec.split(","):
+        kernel, sep, backend = item.strip().partition("=")
+        if not sep:
+            # Sama nazwa: wszędzie tam, gdzie dany backend istnieje
+            for name in KERNELS:
+                if kernel in BACKENDS[name]:
+                    select(name, kernel)
+        elif kernel not in KERNELS:
+            raise ValueError(f"Nieznane jądro: {kernel!r}")
+        else:
+            select(kernel, backend)
+
+
+def print_report(report, out=sys.stdout):
+    for kernel in KERNELS:
+        if kernel not in report:
+            continue
+        print(f"{kernel}:", file=out)
+        for backend, r in report[kernel].items():
+            mark = "*" if report["selected"].get(kernel) == backend else " "
+            timing = f"{r['time_s'] * 1e3:9.3f} ms" if r.get("time_s") is not None else "        –   "
+            status = "OK" if r["ok"] else "NIEZGODNY"
+            print(f"  {mark} {backend:<8}{timing}  zgodność {r['agreement']:.1%}  {status}", file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kalibracja backendów jąder cech.")
+    parser.add_argument("--force", action="store_true", help="Kalibruj ponownie mimo zapisanego wyniku")
+    parser.add_argument("--output", default=CALIBRATION_FILE, help="Plik z wynikiem kalibracji")
+    args = parser.parse_args(argv)
+    report = load_or_calibrate(args.output, force=args.force)
+    print_report(report)
+    print(f"Wynik zapisany w {args.output}")
+    return 0
+
+
+_env = os.environ.get("AUDIO_APP_BACKENDS")
+if _env:
+    configure(_env)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
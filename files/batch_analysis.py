@@ -0,0 +1,215 @@
+"""Wsadowa analiza plików WAV bez GUI.
+
+Uruchomienie (z folderu files):
+    python batch_analysis.py ../audio_files -o wyniki
+    python batch_analysis.py a.wav b.wav -o wyniki --format npz --workers 4
+
+Moduł nie importuje tkinter, matplotlib ani sounddevice, więc działa na
+serwerach bez ekranu i karty dźwiękowej.
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from scipy.io.wavfile import WavFileWarning
+
+from audio_signal import AudioSignal
+from audio_processing import VoicedAudioProcessor, rescale_regions
+import backends
+from features import FEATURE_NAMES, PITCH_FEATURES, analysis_frames, compute_frame_features, nearest_frames
+
+warnings.simplefilter("ignore", WavFileWarning)
+
+
+def collect_files(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith(".wav"):
+                    files.append(os.path.join(path, name))
+        else:
+            files.append(path)
+    return files
+
+
+def write_features_csv(path, features):
+    # Cechy wielokanałowe (ramki, kanały) zapisujemy jako kolumny cecha_ch1, cecha_ch2, ...
+    header = ["time"]
+    columns = [features["time"]]
+    for name in FEATURE_NAMES:
+        values = features[name]
+        if values.ndim == 1:
+            header.append(name)
+            columns.append(values)
+        else:
+            header += [f"{name}_ch{c + 1}" for c in range(values.shape[1])]
+            columns += list(values.T)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(zip(*columns))
+
+
+def write_segments_csv(path, fs, silence_regions, vu_regions):
+    """Zapisuje segmenty; silence_regions i vu_regions to listy przedziałów dla kolejnych kanałów."""
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["start_sample", "end_sample", "start_s", "end_s", "label", "channel"])
+        rows = []
+        for c, (silence, vu) in enumerate(zip(silence_regions, vu_regions)):
+            rows += [(s, e, "silence", c + 1) for s, e in silence]
+            rows += [(s, e, "voiced" if v else "unvoiced", c + 1) for s, e, v in vu]
+        for s, e, label, channel in sorted(rows, key=lambda row: (row[3], row[0], row[1], row[2])):
+            writer.writerow([s, e, f"{s / fs:.6f}", f"{e / fs:.6f}", label, channel])
+
+
+def analyse_file(path, out_dir, frame_size, silence_threshold, formats, hop_size=None, analysis_rate=None):
+    """Analizuje jeden plik i zapisuje wyniki; wywoływana w procesie roboczym.
+
+    Z analysis_rate segmentacja i cechy F0 liczone są na sygnale zdecymowanym
+    (ramka i krok o tym samym czasie trwania), a wyniki odnoszą się do
+    próbek i ramek oryginału.
+    """
+    start_time = time.perf_counter()
+    # Wszystkie kanały analizowane są naraz; plik mono daje tablice 1-D jak dotąd
+    signal = AudioSignal.from_wav(path)
+    data = signal.samples if signal.channels > 1 else signal.channel(0)
+    fs = signal.fs
+
+    hop_size = hop_size or frame_size
+    analysis = signal.decimated(analysis_rate)
+    factor = signal.decimation(analysis)
+    analysis_data = analysis.samples if analysis.channels > 1 else analysis.channel(0)
+    analysis_frame, analysis_hop = analysis_frames(frame_size, hop_size, factor)
+
+    processor = VoicedAudioProcessor()
+    silence_regions = processor.detect_silence(analysis_data, analysis.fs, analysis_frame, silence_threshold,
+                                               analysis_hop)
+    vu_regions = processor.detect_voiced_unvoiced(
+        analysis_data, analysis.fs, analysis_frame, silence_threshold=silence_threshold, hop_size=analysis_hop
+    )
+    silence_regions = rescale_regions(silence_regions, factor, len(signal))
+    vu_regions = rescale_regions(vu_regions, factor, len(signal))
+
+    if factor == 1:
+        features = compute_frame_features(data, fs, frame_size, hop_size=hop_size)
+    else:
+        pitch_names = [name for name in FEATURE_NAMES if name in PITCH_FEATURES]
+        features = compute_frame_features(data, fs, frame_size, hop_size=hop_size,
+                                          names=[name for name in FEATURE_NAMES if name not in PITCH_FEATURES])
+        pitch = compute_frame_features(analysis_data, analysis.fs, analysis_frame, names=pitch_names,
+                                       hop_size=analysis_hop)
+        index = nearest_frames(len(features["time"]), hop_size, len(pitch["time"]), analysis_hop, factor)
+        features.update({name: pitch[name][index] for name in pitch_names})
+    if data.ndim == 1:
+        silence_regions, vu_regions = [silence_regions], [vu_regions]
+
+    stem = os.path.join(out_dir, os.path.splitext(os.path.basename(path))[0])
+    if "csv" in formats:
+        write_features_csv(stem + "_features.csv", features)
+        write_segments_csv(stem + "_segments.csv", fs, silence_regions, vu_regions)
+    if "npz" in formats:
+        np.savez(
+            stem + "_analysis.npz",
+            fs=fs,
+            frame_size=frame_size,
+            hop_size=hop_size,
+            analysis_fs=analysis.fs,
+            channels=signal.channels,
+            # Wiersze: (start, koniec, kanał) i (start, koniec, dźwięczny, kanał); kanały od 0
+            silence=np.array(
+                [(s, e, c) for c, regions in enumerate(silence_regions) for s, e in regions],
+                dtype=np.int64
+            ).reshape(-1, 3),
+            voiced_unvoiced=np.array(
+                [(s, e, v, c) for c, regions in enumerate(vu_regions) for s, e, v in regions],
+                dtype=np.int64
+            ).reshape(-1, 4),
+            **features
+        )
+
+    elapsed = time.perf_counter() - start_time
+    return {
+        "path": path,
+        "duration": signal.duration,
+        "samples": len(signal),
+        "bytes": os.path.getsize(path),
+        "elapsed": elapsed,
+    }
+
+
+def print_summary(results, wall_time, out=sys.stdout):
+    total_audio = sum(r["duration"] for r in results)
+    total_bytes = sum(r["bytes"] for r in results)
+    for r in results:
+        rtf = r["elapsed"] / r["duration"] if r["duration"] else 0.0
+        print(f"{os.path.basename(r['path'])}: {r['duration']:.1f} s audio, "
+              f"{r['elapsed']:.2f} s, RTF {rtf:.4f}", file=out)
+    if wall_time > 0:
+        print(f"Razem: {len(results)} plików, {total_audio:.1f} s audio w {wall_time:.2f} s "
+              f"({total_audio / wall_time:.1f}x czasu rzeczywistego, "
+              f"{total_bytes / wall_time / 1e6:.1f} MB/s, RTF {wall_time / max(total_audio, 1e-9):.4f})",
+              file=out)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Wsadowa analiza plików WAV (cisza, dźwięczność, cechy ramkowe).")
+    parser.add_argument("paths", nargs="+", help="Pliki WAV lub foldery z plikami WAV")
+    parser.add_argument("-o", "--output", default="analysis_output", help="Folder na wyniki")
+    parser.add_argument("--frame-size", type=int, default=256, help="Rozmiar ramki w próbkach")
+    parser.add_argument("--hop-size", type=int, default=None,
+                        help="Krok ramek w próbkach (domyślnie równy ramce, bez nakładania)")
+    parser.add_argument("--silence-threshold", type=float, default=0.001, help="Próg RMS ciszy")
+    parser.add_argument("--analysis-rate", type=float, default=None, metavar="HZ",
+                        help="Częstotliwość analizy F0 i segmentacji, np. 16000 (decymacja całkowitym "
+                             "krokiem; domyślnie natywna częstotliwość pliku)")
+    parser.add_argument("--format", choices=["csv", "npz", "both"], default="both")
+    parser.add_argument("--backends", default=None,
+                        help='Backendy jąder cech, np. "auto" lub "f0_amdf=scipy" (zob. backends.py)')
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Liczba procesów (domyślnie liczba rdzeni)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    files = collect_files(args.paths)
+    if not files:
+        print("Nie znaleziono plików WAV.", file=sys.stderr)
+        return 1
+    os.makedirs(args.output, exist_ok=True)
+    formats = {"csv", "npz"} if args.format == "both" else {args.format}
+
+    results = []
+    failed = 0
+    # Kalibracja (dla "auto") odbywa się raz tutaj; procesy robocze czytają jej wynik z pliku
+    backends.configure(args.backends)
+    start_time = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=backends.configure,
+                             initargs=(args.backends,)) as executor:
+        futures = {
+            executor.submit(analyse_file, path, args.output, args.frame_size,
+                            args.silence_threshold, formats, args.hop_size, args.analysis_rate): path
+            for path in files
+        }
+        for future in as_completed(futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                failed += 1
+                print(f"Błąd analizy {futures[future]}: {e}", file=sys.stderr)
+    wall_time = time.perf_counter() - start_time
+
+    results.sort(key=lambda r: r["path"])
+    print_summary(results, wall_time)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
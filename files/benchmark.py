@@ -0,0 +1,234 @@
+"""Mikrobenchmarki funkcji z features.py i audio_processing.py.
+
+Uruchomienie (z folderu files):
+    python benchmark.py -o bench.json
+    python benchmark.py -o bench_new.json --compare bench.json --threshold 0.15
+
+Sygnały syntetyczne są generowane z ustalonym ziarnem, więc wyniki są
+powtarzalne między uruchomieniami; dodatkowo mierzone są pliki z audio_files.
+Tryb --compare oznacza jako regresję każdy przypadek, którego mediana czasu
+wzrosła o więcej niż --threshold (ułamek) względem pliku bazowego.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import warnings
+
+import numpy as np
+from scipy.io.wavfile import WavFileWarning
+
+from audio_io import WavSource
+from audio_processing import VoicedAudioProcessor
+import backends
+from features import (
+    compute_volume, compute_ste, compute_zcr, compute_sr, compute_autocorr_f0,
+    compute_amdf, compute_amdf_f0, DEFAULT_KERNELS, PITCH_FEATURES, frame_signal, map_frames,
+    voiced_frames
+)
+
+warnings.simplefilter("ignore", WavFileWarning)
+
+AUDIO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "audio_files")
+SYNTH_FS = 16000
+
+
+def make_signal(kind, seconds, fs=SYNTH_FS, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * fs)) / fs
+    if kind == "sine":
+        x = 0.5 * np.sin(2 * np.pi * 220 * t)
+    elif kind == "noise":
+        x = 0.3 * rng.standard_normal(len(t))
+    elif kind == "chirp":
+        # Częstotliwość rośnie liniowo od 80 Hz do 400 Hz
+        f0, f1 = 80, 400
+        x = 0.5 * np.sin(2 * np.pi * (f0 * t + (f1 - f0) * t**2 / (2 * max(seconds, 1e-9))))
+    elif kind == "silence_mix":
+        # Naprzemiennie: cisza, mowa-podobny ton, szum (po 0.25 s)
+        seg = int(0.25 * fs)
+        x = np.zeros(len(t))
+        for i in range(0, len(t), 3 * seg):
+            x[i + seg:i + 2 * seg] = 0.5 * np.sin(2 * np.pi * 150 * t[i + seg:i + 2 * seg])
+            x[i + 2 * seg:i + 3 * seg] = 0.05 * rng.standard_normal(len(x[i + 2 * seg:i + 3 * seg]))
+    else:
+        raise ValueError(f"Nieznany rodzaj sygnału: {kind}")
+    return x.astype(np.float32), fs
+
+
+def load_wav_signals():
+    signals = []
+    if not os.path.isdir(AUDIO_DIR):
+        return signals
+    for name in sorted(os.listdir(AUDIO_DIR)):
+        if name.lower().endswith(".wav"):
+            source = WavSource(os.path.join(AUDIO_DIR, name))
+            signals.append((os.path.splitext(name)[0], source.to_float32(), source.fs))
+    return signals
+
+
+def per_frame(func, needs_fs=False):
+    # Funkcja ramkowa wywoływana dla każdej ramki – tak jak robiło to GUI
+    def run(data, fs, frame_size):
+        frames, tail = frame_signal(data, frame_size)
+        rows = list(frames) + ([] if tail is None else list(tail))
+        args = (fs,) if needs_fs else ()
+        return [func(f, *args) for f in rows]
+    return run
+
+
+def batched(name):
+    func, needs_fs = DEFAULT_KERNELS[name]
+
+    def run(data, fs, frame_size):
+        framed = frame_signal(data, frame_size)
+        return map_frames(func, framed, *((fs,) if needs_fs else ()))
+    return run
+
+
+def gated(name):
+    # F0 tylko w ramkach dźwięcznych – tak liczy je okno cech (razem z kosztem maski)
+    func, needs_fs = DEFAULT_KERNELS[name]
+
+    def run(data, fs, frame_size):
+        framed = frame_signal(data, frame_size)
+        mask = voiced_frames(data, frame_size)
+        return map_frames(func, framed, *((fs,) if needs_fs else ()), mask=mask)
+    return run
+
+
+def backend_kernel(kernel, backend):
+    func = backends.BACKENDS[kernel][backend]
+
+    def run(data, fs, frame_size):
+        framed = frame_signal(data, frame_size)
+        return map_frames(func, framed, *((fs,) if backends.KERNELS[kernel] else ()))
+    return run
+
+
+def segmentation(method):
+    processor = VoicedAudioProcessor()
+
+    def run(data, fs, frame_size):
+        if method == "detect_silence":
+            return processor.detect_silence(data, fs, frame_size, 0.001)
+        return processor.detect_voiced_unvoiced(data, fs, frame_size)
+    return run
+
+
+# Nazwa przypadku -> (funkcja(data, fs, frame_size), czy kosztowna w O(N^2))
+BENCHMARKS = {
+    "compute_volume": (per_frame(compute_volume), False),
+    "compute_ste": (per_frame(compute_ste), False),
+    "compute_zcr": (per_frame(compute_zcr), False),
+    "compute_sr": (per_frame(compute_sr), False),
+    "compute_autocorr_f0": (per_frame(compute_autocorr_f0, needs_fs=True), False),
+    "compute_amdf": (per_frame(compute_amdf), True),
+    "compute_amdf_f0": (per_frame(compute_amdf_f0, needs_fs=True), True),
+    "detect_silence": (segmentation("detect_silence"), False),
+    "detect_voiced_unvoiced": (segmentation("detect_voiced_unvoiced"), False),
+}
+BENCHMARKS.update({f"{name}_batch": (batched(name), False) for name in DEFAULT_KERNELS})
+BENCHMARKS.update({f"{name}_gated": (gated(name), False) for name in sorted(PITCH_FEATURES)})
+# Backendy inne niż referencyjny (ten mierzą przypadki compute_*) i domyślny NumPy (*_batch)
+BENCHMARKS.update({
+    f"{kernel}_{backend}": (backend_kernel(kernel, backend), False)
+    for kernel in backends.KERNELS for backend in backends.available(kernel)
+    if backend not in ("python", "numpy")
+})
+
+
+def time_call(func, args, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+    return {"min": min(times), "median": float(np.median(times)), "repeat": repeat}
+
+
+def run_benchmarks(frame_sizes, lengths, repeat, include_wav=True, only=None, max_slow_samples=SYNTH_FS * 2):
+    signals = []
+    for kind in ["sine", "noise", "chirp", "silence_mix"]:
+        for seconds in lengths:
+            data, fs = make_signal(kind, seconds)
+            signals.append((f"{kind}_{seconds:g}s", data, fs))
+    if include_wav:
+        signals += load_wav_signals()
+
+    results = {}
+    for bench_name, (func, slow) in BENCHMARKS.items():
+        if only and bench_name not in only:
+            continue
+        for signal_name, data, fs in signals:
+            # Wersje O(N^2) mierzymy na krótszym fragmencie, żeby całość trwała rozsądnie
+            if slow:
+                data = data[:max_slow_samples]
+            for frame_size in frame_sizes:
+                case = f"{bench_name}/{signal_name}/frame{frame_size}"
+                results[case] = time_call(func, (data, fs, frame_size), repeat)
+                results[case]["samples"] = len(data)
+                print(f"{case}: {results[case]['median'] * 1e3:.3f} ms", flush=True)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Zwraca listę (przypadek, stara mediana, nowa mediana) dla regresji."""
+    regressions = []
+    for case, new in results.items():
+        old = baseline.get(case)
+        if old is None:
+            continue
+        if new["median"] > old["median"] * (1 + threshold):
+            regressions.append((case, old["median"], new["median"]))
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Mikrobenchmarki cech i segmentacji.")
+    parser.add_argument("-o", "--output", default="bench.json", help="Plik JSON z wynikami")
+    parser.add_argument("--frame-sizes", type=int, nargs="+", default=[256, 1024, 2048])
+    parser.add_argument("--lengths", type=float, nargs="+", default=[1.0, 10.0],
+                        help="Długości sygnałów syntetycznych w sekundach")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", nargs="+", help="Uruchom tylko wybrane benchmarki")
+    parser.add_argument("--no-wav", action="store_true", help="Pomiń pliki z audio_files")
+    parser.add_argument("--compare", help="Plik JSON z wynikami bazowymi")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Dopuszczalny względny wzrost mediany czasu (np. 0.1 = 10%%)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = run_benchmarks(args.frame_sizes, args.lengths, args.repeat,
+                             include_wav=not args.no_wav, only=args.only)
+    report = {
+        "meta": {
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Zapisano {len(results)} wyników do {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for case, old, new in regressions:
+            print(f"REGRESJA {case}: {old * 1e3:.3f} ms -> {new * 1e3:.3f} ms ({new / old - 1:+.0%})")
+        if regressions:
+            return 1
+        print("Brak regresji.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+# Zmiana sposobu liczenia cech wymaga podbicia wersji – stare wpisy
+# przestają wtedy pasować do klucza i zostaną z czasem usunięte (LRU).
+CACHE_VERSION = 1
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "AUDIO_APP_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "audio_app_features")
+)
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def content_hash(data, chunk_size=1 << 20):
+    """Skrót zawartości sygnału (bajty próbek + dtype + kształt).
+
+    Widoki nieciągłe (np. jeden kanał) są kopiowane porcjami, nie w całości.
+    """
+    data = np.asarray(data)
+    h = hashlib.sha1()
+    h.update(f"{data.dtype.str}{data.shape}".encode())
+    for start in range(0, len(data), chunk_size):
+        h.update(memoryview(np.ascontiguousarray(data[start:start + chunk_size])).cast("B"))
+    return h.hexdigest()
+
+
+class FeatureCache:
+    """Trwały cache cech ramkowych w plikach NPZ z usuwaniem LRU wg rozmiaru.
+
+    Klucz powstaje ze skrótu zawartości sygnału, parametrów analizy
+    (frame_size, fs, progi) oraz CACHE_VERSION. Czas modyfikacji pliku
+    służy jako znacznik ostatniego użycia.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def make_key(self, data_hash, **params):
+        payload = json.dumps(
+            {"version": CACHE_VERSION, "data": data_hash, "params": params},
+            sort_keys=True
+        )
+        return hashlib.sha1(payload.encode()).hexdigest()
+
+    def path_for(self, key):
+        return os.path.join(self.cache_dir, key + ".npz")
+
+    def load(self, key):
+        path = self.path_for(key)
+        try:
+            with np.load(path) as npz:
+                if int(npz["_version"]) != CACHE_VERSION:
+                    return None
+                arrays = {name: npz[name] for name in npz.files if name != "_version"}
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Uszkodzony wpis traktujemy jak brak i usuwamy
+            self.remove(path)
+            return None
+        os.utime(path)
+        return arrays
+
+    def save(self, key, arrays):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Unikalna nazwa – równoległe zapisy z wątków i procesów nie kolidują
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        except OSError:
+            # Cache jest tylko przyspieszeniem – błąd zapisu nie przerywa pracy
+            return
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, _version=CACHE_VERSION, **arrays)
+            os.replace(tmp_path, self.path_for(key))
+        except OSError:
+            self.remove(tmp_path)
+            return
+        except BaseException:
+            # Np. przerwanie w trakcie zapisu – nie zostawiamy pliku tymczasowego
+            self.remove(tmp_path)
+            raise
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".npz"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self.remove(path)
+            total -= size
+
+    def remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -39,12 +39,8 @@ def compute_amdf(frame):
     length = len(frame)
     if length == 0:
         return np.array([0])
-    amdf = []
-    for tau in range(length):
-        diff_sum = 0.0
-        for n in range(length - tau):
-            diff_sum += abs(frame[n] - frame[n + tau])
-        amdf.append(diff_sum / (length - tau))
+    # Pętla tylko po opóźnieniach – suma po próbkach liczona wektorowo
+    amdf = [np.mean(np.abs(frame[:length - tau] - frame[tau:])) for tau in range(length)]
     return np.array(amdf)
 
 def compute_amdf_f0(frame, fs, fmin=50, fmax=500):
@@ -69,3 +65,542 @@ def compute_amdf_f0(frame, fs, fmin=50, fmax=500):
     if f0 < fmin or f0 > fmax:
         return 0
     return f0
+
+
+# --- Wersje wsadowe: operują na całej macierzy ramek (n_ramek, frame_size) ---
+
+# Ile próbek przetwarzamy naraz w map_frames – ogranicza rozmiar tablic
+# tymczasowych (np.sign, np.diff) niezależnie od długości nagrania.
+BLOCK_SAMPLES = 1 << 20
+
+
+def strided_frames(data, count, frame_size, hop_size):
+    # Widok (count, [kanały,] frame_size) na ramki co hop_size próbek – bez kopii
+    step = data.strides[0]
+    return np.lib.stride_tricks.as_strided(
+        data, shape=(count,) + data.shape[1:] + (frame_size,),
+        strides=(step * hop_size,) + data.strides[1:] + (step,), writeable=False
+    )
+
+
+def frame_signal(data, frame_size, pad=True, hop_size=None):
+    """Dzieli sygnał na ramki bez kopiowania danych.
+
+    Ramki zaczynają się co hop_size próbek (domyślnie hop_size = frame_size,
+    czyli bez nakładania). Zwraca parę (ramki, ogon): `ramki` to widok 2-D
+    (n, frame_size) na ramki mieszczące się w sygnale, a `ogon` to jedyne
+    kopiowane ramki – wystające poza koniec sygnału, dopełnione zerami –
+    albo None, gdy takich nie ma. Przy pad=False (tylko bez nakładania) ogon
+    jest widokiem (1, reszta) na niedopełnioną końcówkę, tak jak
+    data[i:i + frame_size].
+    Sygnał wielokanałowy (próbki, kanały) daje ramki (n, kanały, frame_size).
+    """
+    data = np.asarray(data)
+    hop_size = hop_size or frame_size
+    total = len(data)
+    count = -(-total // hop_size)
+    n_full = (total - frame_size) // hop_size + 1 if total >= frame_size else 0
+    frames = strided_frames(data, n_full, frame_size, hop_size)
+    n_tail = count - n_full
+    if n_tail == 0:
+        return frames, None
+    first = n_full * hop_size
+    if not pad:
+        if hop_size != frame_size:
+            raise ValueError("pad=False wymaga ramek bez nakładania (hop_size == frame_size)")
+        return frames, np.moveaxis(data[first:], 0, -1)[np.newaxis]
+    buffer = np.zeros(((n_tail - 1) * hop_size + frame_size,) + data.shape[1:], dtype=data.dtype)
+    buffer[:total - first] = data[first:]
+    return frames, strided_frames(buffer, n_tail, frame_size, hop_size)
+
+
+def frame_starts(total_samples, hop_size):
+    # Indeksy początków kolejnych ramek (ostatnia może wystawać poza sygnał)
+    return np.arange(0, total_samples, hop_size)
+
+
+def analysis_frames(frame_size, hop_size, factor):
+    # Ramka i krok (te same w sekundach) w próbkach sygnału zdecymowanego factor razy
+    return max(1, round(frame_size / factor)), max(1, round(hop_size / factor))
+
+
+def nearest_frames(count, hop_size, analysis_count, analysis_hop, factor):
+    """Dla count ramek oryginału – indeksy ramek sygnału zdecymowanego factor razy.
+
+    Ramka k oryginału zaczyna się w próbce k * hop_size, a ramka j sygnału
+    zdecymowanego w próbce j * analysis_hop * factor oryginału; wybierana
+    jest ramka o najbliższym początku. Gdy hop_size dzieli się przez factor,
+    odwzorowanie jest dokładne (j = k).
+    """
+    index = np.rint(np.arange(count) * hop_size / (analysis_hop * factor)).astype(int)
+    return np.clip(index, 0, max(analysis_count - 1, 0))
+
+
+def window_sums(data, frame_size, hop_size, values, pairwise=False):
+    """Sumy wartości z values(fragment, out) w oknach [i*hop, i*hop + frame) w czasie liniowym.
+
+    Okna są przycinane do końca sygnału. Sumy liczone są z sum skumulowanych,
+    więc koszt nie zależy od nakładania ramek; sygnał przetwarzany jest
+    porcjami ok. BLOCK_SAMPLES próbek, żeby nie tworzyć tablic długości
+    całego pliku. values zapisuje wartości do podanej tablicy out (float64);
+    pairwise=True oznacza wartość dla każdej pary sąsiednich próbek
+    (np. przejście przez zero), a nie dla próbki.
+    Sygnał wielokanałowy (próbki, kanały) daje sumy (n, kanały) w tym samym
+    przejściu. Zwraca (sumy, długości okien – z wymiarem do rzutowania na sumy).
+    """
+    total = len(data)
+    starts = frame_starts(total, hop_size)
+    ends = np.minimum(starts + frame_size, total)
+    sums = np.empty((len(starts),) + data.shape[1:])
+    frames_per_block = max(1, BLOCK_SAMPLES // hop_size)
+    for b in range(0, len(starts), frames_per_block):
+        s = starts[b:b + frames_per_block]
+        e = ends[b:b + frames_per_block]
+        seg_start = s[0]
+        # Wartości liczone są w typie sygnału (float32) i od razu zapisywane do
+        # jedynej tablicy float64, w której powstają sumy skumulowane (różnice
+        # dużych sum w float32 traciłyby precyzję)
+        cumulative = np.zeros((e[-1] - seg_start + 1,) + data.shape[1:])
+        values(data[seg_start:e[-1]], cumulative[1:len(cumulative) - pairwise])
+        np.cumsum(cumulative, axis=0, out=cumulative)
+        sums[b:b + len(s)] = cumulative[e - seg_start - pairwise] - cumulative[s - seg_start]
+    return sums, (ends - starts).reshape((-1,) + (1,) * (data.ndim - 1))
+
+
+def sliding_ste(data, frame_size, hop_size=None, pad=True):
+    """STE ramek co hop_size próbek; pad=True dzieli przez frame_size (ramka dopełniona zerami)."""
+    hop_size = hop_size or frame_size
+    sums, lengths = window_sums(
+        data, frame_size, hop_size, lambda x, out: np.square(x, out=out)
+    )
+    sums = np.maximum(sums, 0.0)  # błędy zaokrągleń różnicy sum skumulowanych
+    return sums / (frame_size if pad else lengths)
+
+
+def sliding_volume(data, frame_size, hop_size=None, pad=True):
+    return np.sqrt(sliding_ste(data, frame_size, hop_size, pad))
+
+
+def sliding_zcr(data, frame_size, hop_size=None, pad=True):
+    """ZCR ramek co hop_size próbek, tak jak compute_zcr dla każdej ramki."""
+    hop_size = hop_size or frame_size
+    total = len(data)
+
+    def crossings(x, out):
+        signs = np.sign(x)
+        np.not_equal(signs[1:], signs[:-1], out=out)
+
+    counts, lengths = window_sums(data, frame_size, hop_size, crossings, pairwise=True)
+    if not pad:
+        return counts / np.maximum(lengths, 1)
+    # Ramki wystające poza sygnał mają dopisane zera – przejście do zera też się liczy
+    if total:
+        counts[frame_starts(total, hop_size) + frame_size > total] += np.sign(data[-1]) != 0
+    return counts / frame_size
+
+
+def sliding_sr(data, frame_size, hop_size=None, vol_threshold=0.01, zcr_threshold=0.1):
+    vol = sliding_volume(data, frame_size, hop_size)
+    zcr = sliding_zcr(data, frame_size, hop_size)
+    return ((vol < vol_threshold) & (zcr < zcr_threshold)).astype(int)
+
+
+def classify_frames(rms, zcr, vol_threshold=0.02, zcr_threshold=0.3, silence_threshold=0.001):
+    """Stan ramek: -1 cisza, 1 dźwięczna (RMS > vol_threshold i ZCR < zcr_threshold), 0 bezdźwięczna."""
+    state = np.where((rms > vol_threshold) & (zcr < zcr_threshold), 1, 0).astype(np.int8)
+    state[rms < silence_threshold] = -1
+    return state
+
+
+def voiced_frames(data, frame_size, hop_size=None, vol_threshold=0.02, zcr_threshold=0.3,
+                  silence_threshold=0.001):
+    """Maska ramek dźwięcznych – ta sama klasyfikacja RMS/ZCR co detect_voiced_unvoiced.
+
+    Kształt maski odpowiada wynikom map_frames dla frame_signal(data, frame_size,
+    hop_size=hop_size): (ramki,) albo (ramki, kanały).
+    """
+    rms = sliding_volume(data, frame_size, hop_size, pad=False)
+    zcr = sliding_zcr(data, frame_size, hop_size, pad=False)
+    return classify_frames(rms, zcr, vol_threshold, zcr_threshold, silence_threshold) == 1
+
+
+def num_frames(framed):
+    frames, tail = framed
+    return len(frames) + (0 if tail is None else len(tail))
+
+
+def map_frames(func, framed, *args, progress=None, mask=None, **kwargs):
+    """Wywołuje funkcję wsadową na ramkach z frame_signal i skleja wyniki.
+
+    Pełne ramki są przetwarzane blokami po ok. BLOCK_SAMPLES próbek, żeby
+    tablice pośrednie nie rosły razem z długością pliku. Opcjonalny
+    progress(ułamek) jest wywoływany po każdym bloku. Ramki wielokanałowe
+    (n, kanały, frame_size) trafiają do func jako jedna macierz
+    (n * kanały, frame_size); wynik ma kształt (n, kanały).
+    Z maską (kształt wyniku) func dostaje tylko zaznaczone ramki, a
+    pozostałe pozycje wyniku mają wartość 0.
+    """
+    frames, tail = framed
+    rows_per_frame = int(np.prod(frames.shape[1:-1]))
+    block_rows = max(1, BLOCK_SAMPLES // max(frames.shape[-1] * rows_per_frame, 1))
+
+    def apply(block, block_mask=None):
+        if block_mask is not None and not block_mask.all():
+            values = np.zeros(block.shape[:-1])
+            selected = block[block_mask]
+            if len(selected):
+                values[block_mask] = func(selected, *args, **kwargs)
+            return values
+        if block.ndim == 2:
+            return func(block, *args, **kwargs)
+        values = func(block.reshape(-1, block.shape[-1]), *args, **kwargs)
+        return values.reshape(block.shape[:-1])
+
+    parts = []
+    for i in range(0, len(frames), block_rows):
+        block = frames[i:i + block_rows]
+        parts.append(apply(block, None if mask is None else mask[i:i + len(block)]))
+        if progress is not None:
+            progress(min(i + block_rows, len(frames)) / len(frames))
+    if tail is not None:
+        parts.append(apply(tail, None if mask is None else mask[len(frames):]))
+    if not parts:
+        return np.zeros((0,) + frames.shape[1:-1])
+    return np.concatenate(parts)
+
+
+def compute_ste_batch(frames):
+    frames = np.asarray(frames)
+    if frames.shape[1] == 0:
+        return np.zeros(len(frames))
+    # einsum liczy sumę kwadratów bez tworzenia tablicy frames**2
+    return np.einsum('ij,ij->i', frames, frames) / frames.shape[1]
+
+
+def compute_volume_batch(frames):
+    return np.sqrt(compute_ste_batch(frames))
+
+
+def compute_zcr_batch(frames):
+    frames = np.asarray(frames)
+    if frames.shape[1] == 0:
+        return np.zeros(len(frames))
+    signs = np.sign(frames)
+    zero_crossings = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1)
+    return zero_crossings / frames.shape[1]
+
+
+def compute_sr_batch(frames, vol_threshold=0.01, zcr_threshold=0.1):
+    vol = compute_volume_batch(frames)
+    zcr = compute_zcr_batch(frames)
+    return ((vol < vol_threshold) & (zcr < zcr_threshold)).astype(int)
+
+
+def amdf_lag_range(frame_size, fs, fmin=50, fmax=500):
+    # Ten sam zakres opóźnień co w compute_amdf_f0: [fs//fmax, fs//fmin)
+    min_lag = int(fs // fmax)
+    max_lag = int(fs // fmin) if fmin != 0 else frame_size // 2
+    if max_lag > frame_size:
+        max_lag = frame_size - 1
+    return min_lag, max_lag
+
+
+def compute_amdf_batch(frames, min_lag, max_lag):
+    """Dokładne AMDF dla opóźnień [min_lag, max_lag) wszystkich ramek naraz.
+
+    Zwraca macierz (n_ramek, max_lag - min_lag). Pętla biegnie tylko po
+    opóźnieniach, różnice dla wszystkich ramek liczone są wektorowo w typie
+    ramek (float32 jak w compute_amdf), a średnia sumowana w float64 – przy
+    sumowaniu w float32 inna kolejność dodawania niż w compute_amdf potrafiła
+    zamienić miejscami dwa prawie równe minima.
+    """
+    frames = np.asarray(frames)
+    if not np.issubdtype(frames.dtype, np.floating):
+        frames = frames.astype(np.float64)
+    length = frames.shape[1]
+    amdf = np.empty((len(frames), max(max_lag - min_lag, 0)))
+    for k, tau in enumerate(range(min_lag, max_lag)):
+        amdf[:, k] = np.mean(np.abs(frames[:, :length - tau] - frames[:, tau:]), axis=1, dtype=np.float64)
+    return amdf
+
+
+def compute_sdf_batch(frames, min_lag, max_lag, fft=np.fft):
+    """Średnia kwadratów różnic d(tau) = mean((x[n] - x[n+tau])^2) przez FFT.
+
+    Dla opóźnień [min_lag, max_lag) wszystkich ramek naraz:
+    sum (x[n] - x[n+tau])^2 = E_pocz(tau) + E_kon(tau) - 2 r(tau), gdzie r to
+    autokorelacja liczona jednym rfft z dopełnieniem zerami (bez zawijania).
+    fft to moduł z funkcjami rfft/irfft (np. numpy.fft albo scipy.fft).
+    Obliczenia są w float64 (odejmowanie bliskich sum), ale tylko dla
+    jednego bloku ramek z map_frames naraz.
+    """
+    frames = np.asarray(frames, dtype=np.float64)
+    rows, length = frames.shape
+    nfft = 1 << (length + max_lag - 1).bit_length()
+    spec = fft.rfft(frames, n=nfft, axis=1)
+    corr = fft.irfft(spec.real**2 + spec.imag**2, n=nfft, axis=1)
+
+    lags = np.arange(min_lag, max_lag)
+    energy = np.zeros((rows, length + 1))
+    np.cumsum(frames**2, axis=1, out=energy[:, 1:])
+    head = energy[:, length - lags]
+    tail = energy[:, -1:] - energy[:, lags]
+    sdf = (head + tail - 2 * corr[:, lags]) / (length - lags)
+    # Szum numeryczny FFT zerujemy względem energii ramki, żeby dla ramek
+    # stałych/cichych argmin (jak w wersji pętlowej) wskazywał pierwsze opóźnienie.
+    eps = 1e-10 * (energy[:, -1:] / length)
+    sdf[sdf <= eps] = 0.0
+    return sdf
+
+
+def compute_amdf_f0_batch(frames, fs, fmin=50, fmax=500, exact=False, fft=np.fft):
+    """Wsadowy odpowiednik compute_amdf_f0 dla macierzy ramek.
+
+    Domyślnie minimum szukane jest w średniej kwadratów różnic (SDF) liczonej
+    przez FFT (O(N log N) na ramkę) zamiast w średniej modułów różnic, więc
+    wynik jest przybliżeniem AMDF. Odsetek ramek o RMS > 0.02, w których
+    różni się od compute_amdf_f0 o mniej niż 5% (całe pliki z audio_files):
+
+        plik                  ramka 256   512   1024   2048
+        chrzaszcz_kobieta          97%    75%    88%   100%
+        chrzaszcz_mezczyzna        89%    81%    93%    71%
+        radio_mowa                 87%    94%    89%    90%
+        radio_muzyka               91%    93%    94%    97%
+
+    Pozostałe to głównie ramki, w których minimum AMDF jest płaskie lub
+    wypada na wielokrotności okresu; w krótkich nagraniach chrzaszcz_* to
+    pojedyncze ramki. Parametr exact=True liczy dokładne AMDF
+    (compute_amdf_batch, sumowanie w float64), kosztem ok. 10–30x dłuższych
+    obliczeń; na tych plikach daje te same wartości co compute_amdf_f0.
+    """
+    frames = np.asarray(frames)
+    rows, length = frames.shape
+    f0 = np.zeros(rows)
+    if rows == 0 or length == 0:
+        return f0
+    min_lag, max_lag = amdf_lag_range(length, fs, fmin, fmax)
+    if min_lag < 1 or min_lag >= max_lag:
+        return f0
+
+    frames = frames - np.mean(frames, axis=1, keepdims=True)
+    if exact:
+        values = compute_amdf_batch(frames, min_lag, max_lag)
+    else:
+        values = compute_sdf_batch(frames, min_lag, max_lag, fft)
+    best_lag = min_lag + np.argmin(values, axis=1)
+    f0 = fs / best_lag
+    f0[(f0 < fmin) | (f0 > fmax)] = 0
+    return f0
+
+
+def compute_autocorr_batch(frames, max_lag=None):
+    """Autokorelacja dla opóźnień [0, max_lag) wszystkich ramek jednym rfft.
+
+    Dopełnienie zerami do nfft >= N + max_lag - 1 usuwa zawijanie kołowe,
+    a ujemna połowa autokorelacji w ogóle nie jest liczona.
+    """
+    frames = np.asarray(frames, dtype=np.float64)
+    length = frames.shape[1]
+    if max_lag is None:
+        max_lag = length
+    nfft = 1 << (length + max_lag - 2).bit_length()
+    spec = np.fft.rfft(frames, n=nfft, axis=1)
+    corr = np.fft.irfft(spec.real**2 + spec.imag**2, n=nfft, axis=1)[:, :max_lag]
+    # Szum numeryczny FFT zerujemy, żeby płaskie (zerowe) fragmenty
+    # autokorelacji nie dawały fałszywych zboczy rosnących.
+    corr[np.abs(corr) <= 1e-10 * corr[:, :1]] = 0.0
+    return corr
+
+
+def compute_autocorr_f0_batch(frames, fs, fmin=50, fmax=500):
+    """Wsadowy odpowiednik compute_autocorr_f0 dla macierzy ramek.
+
+    Ta sama reguła wyboru: opóźnienie to pierwszy indeks, od którego
+    autokorelacja zaczyna rosnąć.
+    """
+    frames = np.asarray(frames)
+    rows, length = frames.shape
+    f0 = np.zeros(rows)
+    if rows == 0 or length == 0:
+        return f0
+    frames = frames - np.mean(frames, axis=1, keepdims=True)
+    return autocorr_f0_from_corr(compute_autocorr_batch(frames), fs, fmin, fmax)
+
+
+def autocorr_f0_from_corr(corr, fs, fmin=50, fmax=500):
+    # Reguła z compute_autocorr_f0 dla macierzy autokorelacji (n_ramek, opóźnienia)
+    f0 = np.zeros(len(corr))
+    if corr.shape[1] == 0:
+        return f0
+    rising = np.diff(corr, axis=1) > 0
+    lag = np.argmax(rising, axis=1)
+    valid = np.any(rising, axis=1) & (lag > 0)
+    f0[valid] = fs / lag[valid]
+    f0[(f0 < fmin) | (f0 > fmax)] = 0
+    return f0
+
+
+def compute_yin_difference_batch(frames, max_lag, fft=np.fft):
+    """Funkcja różnicowa YIN d(tau) dla opóźnień [0, max_lag] wszystkich ramek.
+
+    Okno całkowania ma stałą długość W = N - max_lag, jak w oryginalnym YIN:
+    d(tau) = sum_{n<W} (x[n] - x[n+tau])^2 = E_okna + E(tau..tau+W) - 2 c(tau),
+    gdzie c to korelacja wzajemna okna z całą ramką. Dla n < W i tau <= max_lag
+    indeks n + tau nie przekracza N, więc korelację kołową liczy się przez FFT
+    o rozmiarze samej ramki – bez dopełnienia zerami do 2N, jak w
+    compute_sdf_batch.
+    """
+    frames = np.asarray(frames, dtype=np.float64)
+    rows, length = frames.shape
+    window = length - max_lag
+    spec = fft.rfft(frames, axis=1)
+    spec_window = fft.rfft(frames[:, :window], n=length, axis=1)
+    np.conjugate(spec_window, out=spec_window)
+    spec_window *= spec
+    corr = fft.irfft(spec_window, n=length, axis=1)[:, :max_lag + 1]
+
+    energy = np.zeros((rows, length + 1))
+    np.cumsum(np.square(frames), axis=1, out=energy[:, 1:])
+    lags = np.arange(max_lag + 1)
+    diff = energy[:, lags + window] - energy[:, lags]
+    diff += energy[:, window:window + 1]
+    diff -= 2 * corr
+    # Szum numeryczny FFT (także ujemne wartości) zerujemy względem energii ramki
+    diff[diff <= 1e-10 * energy[:, -1:]] = 0.0
+    return diff
+
+
+def compute_yin_f0_batch(frames, fs, fmin=50, fmax=500, threshold=0.1, fft=np.fft):
+    """F0 metodą YIN (de Cheveigné, Kawahara 2002) dla macierzy ramek.
+
+    Funkcja różnicowa wszystkich ramek liczona jest naraz przez FFT
+    (compute_yin_difference_batch) i normalizowana skumulowaną średnią:
+    d'(tau) = d(tau) * tau / sum_{j=1..tau} d(j). Okres to pierwsze minimum
+    lokalne d' poniżej progu threshold w zakresie [fs/fmax, fs/fmin],
+    doprecyzowane interpolacją paraboliczną. Ramki bez takiego minimum
+    (cisza, szum) dają 0. Okno całkowania zajmuje co najmniej pół ramki,
+    więc najniższe wykrywalne F0 to ok. 2 * fs / frame_size.
+    """
+    frames = np.asarray(frames)
+    rows, length = frames.shape
+    f0 = np.zeros(rows)
+    min_lag = max(int(fs // fmax), 1)
+    # Jedno opóźnienie zapasu na interpolację paraboliczną
+    max_lag = min(int(np.ceil(fs / fmin)) + 1, length // 2)
+    if rows == 0 or min_lag + 1 >= max_lag:
+        return f0
+
+    cmndf = compute_yin_difference_batch(frames, max_lag, fft)
+    cumulative = np.cumsum(cmndf[:, 1:], axis=1)
+    cmndf[:, 0] = 1.0
+    cmndf[:, 1:] *= np.arange(1, max_lag + 1)
+    # Tam, gdzie suma jest zerowa (cisza), d' = 1 – powyżej każdego progu
+    silent = cumulative <= 0
+    cumulative[silent] = 1.0
+    cmndf[:, 1:] /= cumulative
+    cmndf[:, 1:][silent] = 1.0
+
+    # Pierwsze opóźnienie poniżej progu, a od niego zejście do minimum lokalnego
+    region = cmndf[:, min_lag:max_lag]
+    below = region < threshold
+    voiced = below.any(axis=1)
+    first = np.argmax(below, axis=1)
+    rising = cmndf[:, min_lag + 1:max_lag + 1] >= region
+    rising &= np.arange(region.shape[1]) >= first[:, np.newaxis]
+    rising[:, -1] = True
+    tau = min_lag + np.argmax(rising, axis=1)
+
+    rows_idx = np.arange(rows)
+    a, b, c = cmndf[rows_idx, tau - 1], cmndf[rows_idx, tau], cmndf[rows_idx, tau + 1]
+    denom = a - 2 * b + c
+    with np.errstate(divide="ignore", invalid="ignore"):
+        shift = np.where(np.abs(denom) > 1e-12, 0.5 * (a - c) / denom, 0.0)
+    period = tau + np.clip(shift, -1.0, 1.0)
+    f0[voiced] = fs / period[voiced]
+    f0[(f0 < fmin) | (f0 > fmax)] = 0
+    return f0
+
+
+def yin_frame_size(fs, fmin=50):
+    # Najkrótsza ramka, w której YIN wykrywa fmin: okno całkowania i zakres opóźnień po jednym okresie
+    return 2 * (int(np.ceil(fs / fmin)) + 1)
+
+
+def compute_yin_f0(frame, fs, fmin=50, fmax=500, threshold=0.1):
+    # Wersja dla jednej ramki – ta sama implementacja co compute_yin_f0_batch
+    if len(frame) == 0:
+        return 0
+    return float(compute_yin_f0_batch(np.asarray(frame)[np.newaxis], fs, fmin, fmax, threshold)[0])
+
+
+# Nazwa cechy -> (funkcja wsadowa, czy wymaga fs); kolejność od najtańszych
+FEATURE_KERNELS = {
+    "volume": (compute_volume_batch, False),
+    "ste": (compute_ste_batch, False),
+    "zcr": (compute_zcr_batch, False),
+    "sr": (compute_sr_batch, False),
+    "f0_autocorr": (compute_autocorr_f0_batch, True),
+    "f0_amdf": (compute_amdf_f0_batch, True),
+    "f0_yin": (compute_yin_f0_batch, True),
+}
+
+FEATURE_NAMES = list(FEATURE_KERNELS)
+
+# Jądra NumPy; backends.select() może podmienić wpisy FEATURE_KERNELS na inne implementacje
+DEFAULT_KERNELS = dict(FEATURE_KERNELS)
+
+
+# Cechy liczone oknem przesuwnym z sum skumulowanych – koszt liniowy niezależnie od hop_size
+SLIDING_FEATURES = {
+    "volume": sliding_volume,
+    "ste": sliding_ste,
+    "zcr": sliding_zcr,
+    "sr": sliding_sr,
+}
+
+
+# Estymatory F0 – kosztowne, a dla ramek ciszy i bezdźwięcznych i tak bez sensu
+PITCH_FEATURES = {"f0_autocorr", "f0_amdf", "f0_yin"}
+
+
+def compute_feature(name, data, fs, frame_size, hop_size=None, framed=None, progress=None, voiced=None):
+    """Jedna cecha ramek długości frame_size zaczynających się co hop_size próbek.
+
+    framed (wynik frame_signal dla tych samych parametrów) można przekazać,
+    żeby nie dzielić sygnału na ramki przy każdej cesze. Maska voiced (np. z
+    voiced_frames) ogranicza cechy F0 do ramek dźwięcznych – pozostałe mają 0.
+    F0 (YIN) liczone jest na ramkach o długości co najmniej yin_frame_size(fs).
+    """
+    # Okno przesuwne zastępuje tylko domyślne jądra – wybrany backend ma pierwszeństwo
+    if name in SLIDING_FEATURES and FEATURE_KERNELS[name] == DEFAULT_KERNELS[name]:
+        values = SLIDING_FEATURES[name](data, frame_size, hop_size)
+        if progress is not None:
+            progress(1.0)
+        return values
+    func, needs_fs = FEATURE_KERNELS[name]
+    if name == "f0_yin" and frame_size < yin_frame_size(fs):
+        # Krótkie ramki (np. 256 próbek przy 44.1 kHz) widzą tylko F0 > 2 * fs / frame_size –
+        # YIN dostaje dłuższe ramki o tych samych początkach (ta sama liczba ramek i maska)
+        framed = frame_signal(data, yin_frame_size(fs), hop_size=hop_size or frame_size)
+    elif framed is None:
+        framed = frame_signal(data, frame_size, hop_size=hop_size)
+    args = (fs,) if needs_fs else ()
+    mask = voiced if name in PITCH_FEATURES else None
+    return map_frames(func, framed, *args, progress=progress, mask=mask)
+
+
+def compute_frame_features(data, fs, frame_size, names=FEATURE_NAMES, progress=None, hop_size=None):
+    """Wybrane cechy ramkowe sygnału; słownik nazwa -> tablica (plus "time").
+
+    Opcjonalny progress(ułamek, nazwa) jest wywoływany w trakcie obliczeń.
+    """
+    hop_size = hop_size or frame_size
+    framed = frame_signal(data, frame_size, hop_size=hop_size)
+    features = {"time": frame_starts(len(data), hop_size) / fs}
+    for k, name in enumerate(names):
+        step_progress = None
+        if progress is not None:
+            def step_progress(fraction, k=k, name=name):
+                progress((k + fraction) / len(names), name)
+        features[name] = compute_feature(name, data, fs, frame_size, hop_size, framed, step_progress)
+    return features
@@ -7,34 +7,223 @@ from tkinter import ttk
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
 from features import (
-    compute_volume, compute_ste, compute_zcr, compute_sr,
-    compute_autocorr_f0, compute_amdf_f0
+    PITCH_FEATURES, analysis_frames, classify_frames, compute_feature, frame_signal, frame_starts, nearest_frames,
+    num_frames, sliding_volume, sliding_zcr
 )
+from feature_cache import content_hash
+import backends
 from design import ColorScheme
+import profiling
 
 def auto_frame_size(total_samples, max_frames=2000):
 
     frame_size = max(256, int(np.ceil(total_samples / max_frames)))
     return frame_size
 
-def downsample_block(x, y, max_points=2000):
+def downsample_minmax(x, y, max_points=2000):
+    """Redukuje liczbę punktów, zachowując minimum i maksimum każdego kubełka.
 
+    Dla każdego kubełka zostają dwa punkty (min i max) w kolejności czasowej,
+    więc krótkie piki RMS/ZCR/F0 nie są uśredniane.
+    """
     n = len(x)
     if n <= max_points:
         return x, y
-    block_size = int(np.ceil(n / max_points))
-    # Podziel dane na bloki
-    x_blocks = [x[i*block_size : (i+1)*block_size] for i in range(int(np.ceil(n / block_size)))]
-    y_blocks = [y[i*block_size : (i+1)*block_size] for i in range(int(np.ceil(n / block_size)))]
-    x_ds = np.array([np.mean(block) for block in x_blocks])
-    y_ds = np.array([np.mean(block) for block in y_blocks])
-    return x_ds, y_ds
+    block_size = int(np.ceil(n / (max_points // 2)))
+    n_full = n // block_size
+    blocks = y[:n_full * block_size].reshape(n_full, block_size)
+    offsets = np.arange(n_full) * block_size
+    i_min = offsets + np.argmin(blocks, axis=1)
+    i_max = offsets + np.argmax(blocks, axis=1)
+    if n_full * block_size < n:
+        tail = y[n_full * block_size:]
+        i_min = np.append(i_min, n_full * block_size + np.argmin(tail))
+        i_max = np.append(i_max, n_full * block_size + np.argmax(tail))
+    idx = np.sort(np.column_stack((i_min, i_max)), axis=1).ravel()
+    return x[idx], y[idx]
+
+# Etykieta cechy -> (klucz w features.FEATURE_KERNELS, opis, kolor linii)
+FEATURE_INFO = {
+    "Volume (RMS)": (
+        "volume",
+        "Volume określa średnią głośność sygnału (RMS).",
+        "#4DB6AC"
+    ),
+    "STE": (
+        "ste",
+        "Short Time Energy – rozróżnianie fragmentów dźwięcznych/bezdźwięcznych.",
+        "#81C784"
+    ),
+    "ZCR": (
+        "zcr",
+        "Zero Crossing Rate – liczba przejść przez zero.",
+        "#FFF176"
+    ),
+    "SR (Silent Ratio)": (
+        "sr",
+        "1 oznacza ramkę sklasyfikowaną jako cisza.",
+        "#FFD54F"
+    ),
+    "F0 (Autocorr)": (
+        "f0_autocorr",
+        "Częstotliwość podstawowa - metoda autokorelacji.",
+        "#BA68C8"
+    ),
+    "F0 (AMDF/SDF)": (
+        "f0_amdf",
+        "Częstotliwość podstawowa - przybliżenie AMDF średnią kwadratów różnic (SDF).",
+        "#FF8A65"
+    ),
+    "F0 (YIN)": (
+        "f0_yin",
+        "Częstotliwość podstawowa - metoda YIN (0 dla ramek bezdźwięcznych).",
+        "#F06292"
+    ),
+}
+
+def calc_subplot_grid(n):
+    # Do 4 wykresów układ ręczny, dalej po 3 kolumny i tyle wierszy, ile trzeba
+    if n <= 3:
+        return (1, max(n, 1))
+    if n == 4:
+        return (2, 2)
+    return (int(np.ceil(n / 3)), 3)
+
+
+def draw_feature_axes(fig, selected_features, features, times, features_info=FEATURE_INFO):
+    """Wykres każdej wybranej cechy w osobnej osi figury fig.
+
+    features.get(klucz) zwraca wartości cechy albo None, gdy cecha jeszcze się liczy.
+    """
+    rows, cols = calc_subplot_grid(len(selected_features))
+
+    # Dla każdej cechy agregujemy dane, by rysować mniej punktów
+    for i, feat_name in enumerate(selected_features, start=1):
+        ax = fig.add_subplot(rows, cols, i)
+        key, description, color_line = features_info[feat_name]
+        data_array = features.get(key)
+        if data_array is None:
+            # Cecha jeszcze liczy się w tle
+            ax.text(0.5, 0.5, "Obliczanie...", ha="center", va="center",
+                    transform=ax.transAxes, color="#757575")
+        else:
+            # Redukujemy liczbę punktów, zachowując piki (min/max w kubełkach)
+            x_plot, y_plot = downsample_minmax(times, data_array, max_points=2000)
+            ax.plot(x_plot, y_plot, linewidth=1.0, color=color_line, rasterized=True)
+        ax.set_title(feat_name, fontsize=10, fontweight="bold", color="#2E7D32")
+        ax.set_xlabel("Czas [s]", fontsize=9)
+        ax.set_ylabel(feat_name, fontsize=9)
+        ax.grid(True)
+
+
+class LazyFeatures:
+    """Rejestr cech ramkowych liczonych dopiero wtedy, gdy są potrzebne.
+
+    Policzone cechy są zapamiętywane (i zapisywane w cache na dysku, jeśli
+    podano cache). compute() nie zmienia stanu rejestru (poza jednorazowo
+    liczoną maską ramek dźwięcznych), więc może działać w wątku roboczym;
+    wynik zapisuje się przez store() w wątku GUI. Cechy F0 liczone są tylko
+    w ramkach dźwięcznych (progi jak w segmentacji głównego okna), w pozostałych
+    mają wartość 0. frame_stats to gotowe (rms, zcr) ramek sygnału, na którym
+    liczone jest F0 (np. AudioApp.frame_stats) – bez nich liczone są tutaj.
+    Jeśli podano sygnał zdecymowany (analysis_data o częstotliwości
+    analysis_fs), cechy F0 i ich bramkowanie liczone są na nim, a wyniki
+    przypisywane ramkom oryginału o najbliższym początku.
+    """
+
+    def __init__(self, data, fs, frame_size, silence_threshold, cache=None, data_hash=None, hop_size=None,
+                 analysis_data=None, analysis_fs=None, vol_threshold=0.02, zcr_threshold=0.3, frame_stats=None):
+        self.data = data
+        self.fs = fs
+        self.frame_size = frame_size
+        self.hop_size = hop_size or frame_size
+        self.silence_threshold = silence_threshold
+        self.vol_threshold = vol_threshold
+        self.zcr_threshold = zcr_threshold
+        self.frame_stats = frame_stats
+        self.cache = cache
+        self.data_hash = data_hash
+        self.framed = frame_signal(data, frame_size, hop_size=self.hop_size)
+        self.times = frame_starts(len(data), self.hop_size) / fs
+        self.values = {}
+        self.voiced = None
+        self.analysis = None
+        if analysis_data is not None and analysis_fs != fs:
+            factor = int(round(fs / analysis_fs))
+            frame_low, hop_low = analysis_frames(frame_size, self.hop_size, factor)
+            self.analysis = LazyFeatures(analysis_data, analysis_fs, frame_low, silence_threshold,
+                                         hop_size=hop_low, vol_threshold=vol_threshold,
+                                         zcr_threshold=zcr_threshold, frame_stats=frame_stats)
+            self.analysis_index = nearest_frames(len(self.times), self.hop_size, len(self.analysis.times),
+                                                 hop_low, factor)
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def missing(self, keys):
+        return [key for key in keys if key not in self.values]
+
+    def store(self, key, values):
+        self.values[key] = values
+
+    def compute(self, key, progress=None):
+        if self.cache is None:
+            with profiling.stage(f"features.{key}"):
+                return self.compute_values(key, progress)
+        if self.data_hash is None:
+            with profiling.stage("features.content_hash"):
+                self.data_hash = content_hash(self.data)
+        params = dict(frame_size=self.frame_size, hop_size=self.hop_size, fs=self.fs,
+                      silence_threshold=self.silence_threshold)
+        if key in backends.KERNELS:
+            # Backendy jądra dają różne wartości (np. AMDF python/numpy) – osobne wpisy
+            params["backend"] = backends.active()[key]
+        if key in PITCH_FEATURES:
+            # F0 liczone tylko w ramkach dźwięcznych – inne wartości niż bez bramkowania
+            params.update(voiced_only=True, vol_threshold=self.vol_threshold, zcr_threshold=self.zcr_threshold)
+            if self.analysis is not None:
+                params["analysis_fs"] = self.analysis.fs
+        cache_key = self.cache.make_key(self.data_hash, feature=key, **params)
+        with profiling.stage("features.cache_load"):
+            cached = self.cache.load(cache_key)
+        if cached is not None:
+            return cached["values"]
+        with profiling.stage(f"features.{key}"):
+            values = self.compute_values(key, progress)
+        with profiling.stage("features.cache_save"):
+            self.cache.save(cache_key, {"values": values})
+        return values
+
+    def voiced_mask(self):
+        # Klasyfikacja RMS/ZCR jak w segment_regions, liczona raz przy pierwszej
+        # cesze F0 (z gotowych frame_stats, jeśli pasują do podziału na ramki);
+        # ponowne policzenie w innym wątku daje tę samą maskę, więc wyścig jest nieszkodliwy
+        if self.voiced is None:
+            with profiling.stage("features.voicing_gate"):
+                if self.frame_stats is not None and len(self.frame_stats[0]) == num_frames(self.framed):
+                    rms, zcr = self.frame_stats
+                else:
+                    rms = sliding_volume(self.data, self.frame_size, self.hop_size, pad=False)
+                    zcr = sliding_zcr(self.data, self.frame_size, self.hop_size, pad=False)
+                self.voiced = classify_frames(rms, zcr, self.vol_threshold, self.zcr_threshold,
+                                              self.silence_threshold) == 1
+        return self.voiced
+
+    def compute_values(self, key, progress=None):
+        if key in PITCH_FEATURES and self.analysis is not None:
+            return self.analysis.compute_values(key, progress)[self.analysis_index]
+        voiced = self.voiced_mask() if key in PITCH_FEATURES else None
+        return compute_feature(key, self.data, self.fs, self.frame_size, self.hop_size,
+                               framed=self.framed, progress=progress, voiced=voiced)
 
 class FeaturesWindow:
-    def __init__(self, master, data, fs, frame_size, silence_threshold):
+    def __init__(self, master, data, fs, frame_size, silence_threshold, cache=None, data_hash=None,
+                 executor=None, hop_size=None, analysis_data=None, analysis_fs=None, vol_threshold=0.02,
+                 zcr_threshold=0.3, frame_stats=None):
         self.top = tk.Toplevel(master)
         self.top.title("Wykresy cech sygnału")
         self.top.geometry("1000x800")
+        self.top.protocol("WM_DELETE_WINDOW", self.on_close)
 
         # Pastelowe tło
         self.main_bg_color = ColorScheme.MAIN_BG
@@ -50,50 +239,23 @@ class FeaturesWindow:
         # Automatyczne dobranie rozmiaru ramki – dla długich nagrań zwiększamy ją, aby liczba ramek nie była zbyt duża.
         candidate = auto_frame_size(len(data))
         self.frame_size = min(candidate, frame_size)  # wybieramy większą z tych wartości
+        # Krok ramek nie może przekraczać ramki (bez przerw między ramkami)
+        self.hop_size = min(hop_size or self.frame_size, self.frame_size)
         self.silence_threshold = silence_threshold
+        # RMS/ZCR ramek z okna głównego pasują tylko przy tym samym podziale na ramki
+        if (self.frame_size, self.hop_size) != (frame_size, hop_size or frame_size):
+            frame_stats = None
 
-        # Dzielimy sygnał na ramki i obliczamy cechy
-        self.frames, self.times = self.frame_signal(data, fs, self.frame_size)
-        self.volume = np.array([compute_volume(f) for f in self.frames])
-        self.ste = np.array([compute_ste(f) for f in self.frames])
-        self.zcr = np.array([compute_zcr(f) for f in self.frames])
-        self.sr = np.array([compute_sr(f) for f in self.frames])
-        self.f0_autocorr = np.array([compute_autocorr_f0(f, fs) for f in self.frames])
-        self.f0_amdf = np.array([compute_amdf_f0(f, fs) for f in self.frames])
-
-        # Przechowujemy cechy
-        self.features_info = {
-            "Volume (RMS)": (
-                self.volume,
-                "Volume określa średnią głośność sygnału (RMS).",
-                "#4DB6AC"
-            ),
-            "STE": (
-                self.ste,
-                "Short Time Energy – rozróżnianie fragmentów dźwięcznych/bezdźwięcznych.",
-                "#81C784"
-            ),
-            "ZCR": (
-                self.zcr,
-                "Zero Crossing Rate – liczba przejść przez zero.",
-                "#FFF176"
-            ),
-            "SR (Silent Ratio)": (
-                self.sr,
-                "1 oznacza ramkę sklasyfikowaną jako cisza.",
-                "#FFD54F"
-            ),
-            "F0 (Autocorr)": (
-                self.f0_autocorr,
-                "Częstotliwość podstawowa - metoda autokorelacji.",
-                "#BA68C8"
-            ),
-            "F0 (AMDF)": (
-                self.f0_amdf,
-                "Częstotliwość podstawowa - metoda AMDF.",
-                "#FF8A65"
-            ),
-        }
+        # Cechy liczone są na żądanie – w tle (executor) lub od razu, gdy executora brak
+        # F0 może być liczone na sygnale zdecymowanym (analysis_data, analysis_fs)
+        self.features = LazyFeatures(data, fs, self.frame_size, silence_threshold, cache, data_hash,
+                                     self.hop_size, analysis_data, analysis_fs, vol_threshold, zcr_threshold,
+                                     frame_stats)
+        self.times = self.features.times
+        self.features_info = FEATURE_INFO
+        self.executor = executor
+        self.job = None
+        self.pending = []
 
         # Panel wyboru cech
         self.select_frame = tk.Frame(self.main_frame, bg=self.main_bg_color)
@@ -132,31 +294,102 @@ class FeaturesWindow:
         )
         self.draw_button.pack(side="left", padx=10)
 
+        # Postęp obliczeń w tle
+        # (pokazywany tylko w trakcie obliczeń)
+        self.progress_frame = tk.Frame(self.main_frame, bg=self.main_bg_color)
+        self.progress_label = tk.Label(
+            self.progress_frame,
+            text="",
+            bg=self.main_bg_color,
+            font=("Helvetica", 9)
+        )
+        self.progress_label.pack(side="left")
+        self.progress = ttk.Progressbar(self.progress_frame, mode="determinate", maximum=1.0, length=300)
+        self.progress.pack(side="left", padx=10)
+
         self.plot_frame = tk.Frame(self.main_frame, bg=self.main_bg_color)
         self.plot_frame.pack(fill="both", expand=True, padx=10, pady=(0, 10))
 
         self.fig = None
         self.canvas = None
 
-        # Rysujemy wykresy przy starcie
+        # Rysujemy wykresy przy starcie (brakujące cechy zostaną policzone)
         self.draw_selected_features()
 
-    def frame_signal(self, data, fs, frame_size):
-        total_samples = len(data)
-        num_frames = int(np.ceil(total_samples / frame_size))
-        frames = []
-        times = []
-        for i in range(num_frames):
-            start = i * frame_size
-            end = start + frame_size
-            frame = data[start:end]
-            if len(frame) < frame_size:
-                frame = np.pad(frame, (0, frame_size - len(frame)), mode='constant')
-            frames.append(frame)
-            times.append(start / fs)
-        return frames, np.array(times)
+    def selected_keys(self):
+        return [self.features_info[name][0] for name, var in self.feature_vars.items() if var.get()]
+
+    def request_features(self, keys):
+        missing = self.features.missing(keys)
+        if not missing:
+            return
+        if self.executor is None:
+            for key in missing:
+                self.features.store(key, self.features.compute(key))
+            return
+        # Zadanie anulowane z zewnątrz (np. cancel_all przy wczytaniu pliku) nie
+        # wywoła już on_done ani on_error – traktujemy je jak zakończone
+        if self.job is not None and self.job.cancelled:
+            self.job = None
+            self.pending = []
+        if self.job is not None and set(missing) <= set(self.pending):
+            return
+        # Nowy wybór – liczymy od nowa wszystko, czego jeszcze brakuje
+        if self.job is not None:
+            self.job.cancel()
+        self.pending = missing
+        self.progress_frame.pack(side="top", fill="x", padx=10, before=self.plot_frame)
+        self.show_progress(0.0)
+        self.job = self.executor.submit(
+            self.compute_job, missing,
+            on_progress=self.on_feature_progress,
+            on_done=self.on_features_ready,
+            on_error=self.on_features_error
+        )
+
+    def compute_job(self, job, keys):
+        # Wykonywane w wątku roboczym – report() przerywa anulowane zadanie;
+        # każda gotowa cecha jest od razu odsyłana jako wynik częściowy
+        for k, key in enumerate(keys):
+            values = self.features.compute(
+                key, progress=lambda fraction, k=k: job.report((k + fraction) / len(keys))
+            )
+            job.report((k + 1) / len(keys), (key, values))
+
+    def on_feature_progress(self, fraction, partial=None):
+        self.show_progress(fraction)
+        if partial is not None:
+            self.features.store(*partial)
+            self.render_features()
+
+    def show_progress(self, fraction):
+        self.progress_label.config(text=f"Obliczanie cech: {fraction:.0%}")
+        self.progress["value"] = fraction
+
+    def on_features_ready(self, result):
+        self.job = None
+        self.pending = []
+        self.progress_frame.pack_forget()
+
+    def on_features_error(self, error):
+        self.job = None
+        self.pending = []
+        self.progress_label.config(text=f"Błąd obliczania cech: {error}", fg="#B71C1C")
+
+    def on_close(self):
+        if self.job is not None:
+            self.job.cancel()
+            self.job = None
+        if self.fig:
+            plt.close(self.fig)
+        self.top.destroy()
 
     def draw_selected_features(self):
+        self.request_features(self.selected_keys())
+        self.render_features()
+
+    @profiling.timed("features.render")
+    def render_features(self):
         selected_features = [name for name, var in self.feature_vars.items() if var.get()]
 
         if self.canvas:
@@ -180,35 +413,9 @@ class FeaturesWindow:
         self.fig = plt.Figure(figsize=(12, 6), dpi=100)
         self.fig.set_tight_layout(True)
 
-        n_feats = len(selected_features)
-        rows, cols = self.calc_subplot_grid(n_feats)
-
-        # Dla każdej cechy agregujemy dane, by rysować mniej punktów
-        for i, feat_name in enumerate(selected_features, start=1):
-            ax = self.fig.add_subplot(rows, cols, i)
-            data_array, description, color_line = self.features_info[feat_name]
-            # Używamy funkcji downsample_block, by zredukować liczbę punktów
-            x_plot, y_plot = downsample_block(self.times, data_array, max_points=2000)
-            ax.plot(x_plot, y_plot, linewidth=1.0, color=color_line, rasterized=True)
-            ax.set_title(feat_name, fontsize=10, fontweight="bold", color="#2E7D32")
-            ax.set_xlabel("Czas [s]", fontsize=9)
-            ax.set_ylabel(feat_name, fontsize=9)
-            ax.grid(True)
+        draw_feature_axes(self.fig, selected_features, self.features, self.times, self.features_info)
 
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.plot_frame)
-        self.canvas.draw()
+        with profiling.stage("features.canvas_draw"):
+            self.canvas.draw()
         self.canvas.get_tk_widget().pack(fill="both", expand=True)
-
-    def calc_subplot_grid(self, n):
-        if n == 1:
-            return (1, 1)
-        elif n == 2:
-            return (1, 2)
-        elif n == 3:
-            return (1, 3)
-        elif n == 4:
-            return (2, 2)
-        elif n <= 6:
-            return (2, 3)
-        else:
-            return (2, 3)
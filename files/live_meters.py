@@ -0,0 +1,84 @@
+import numpy as np
+
+import features
+from features import compute_volume, compute_zcr
+
+
+class RingBuffer:
+    """Bufor cykliczny bez blokad dla jednego pisarza i jednego czytelnika.
+
+    Pisarzem jest callback sounddevice, czytelnikiem pętla GUI. Pisarz
+    najpierw kopiuje próbki, a dopiero potem przesuwa licznik write_pos
+    (pojedyncze przypisanie), więc czytelnik nigdy nie widzi niezapisanych
+    danych. Jeśli w trakcie czytania pisarz nadpisze czytany fragment,
+    read_latest zwraca False zamiast niespójnych danych.
+    """
+
+    def __init__(self, capacity):
+        self.buffer = np.zeros(capacity, dtype=np.float32)
+        self.capacity = capacity
+        self.write_pos = 0  # łączna liczba zapisanych próbek
+
+    def reset(self):
+        self.write_pos = 0
+
+    def write(self, block):
+        n = min(len(block), self.capacity)
+        block = block[len(block) - n:]
+        start = self.write_pos % self.capacity
+        first = min(n, self.capacity - start)
+        self.buffer[start:start + first] = block[:first]
+        self.buffer[:n - first] = block[first:]
+        self.write_pos += n
+
+    def read_latest(self, out):
+        """Kopiuje ostatnie len(out) próbek do out; False, gdy danych brak lub zostały nadpisane."""
+        n = len(out)
+        end = self.write_pos
+        if end < n:
+            return False
+        start = (end - n) % self.capacity
+        first = min(n, self.capacity - start)
+        out[:first] = self.buffer[start:start + first]
+        out[first:] = self.buffer[:n - first]
+        # Pisarz mógł w międzyczasie nadpisać czytany fragment (z zapasem
+        # jednego bloku na zapis, który trwa, ale nie przesunął jeszcze licznika)
+        return self.write_pos - end <= self.capacity - 2 * n
+
+
+class LiveFeatureExtractor:
+    """Bieżące RMS, ZCR i F0 ostatniego bloku odtwarzanego dźwięku.
+
+    RMS i ZCR są wygładzane wykładniczo (smoothing to waga poprzedniej
+    wartości), F0 pochodzi z autokorelacji (FFT) ostatniego bloku.
+    """
+
+    def __init__(self, fs, block_size=1024, smoothing=0.6):
+        self.fs = fs
+        self.smoothing = smoothing
+        self.ring = RingBuffer(block_size * 8)
+        self.block = np.zeros(block_size, dtype=np.float32)
+        self.last_pos = 0
+        self.rms = 0.0
+        self.zcr = 0.0
+        self.f0 = 0.0
+
+    def reset(self):
+        self.ring.reset()
+        self.last_pos = 0
+        self.rms = 0.0
+        self.zcr = 0.0
+        self.f0 = 0.0
+
+    def update(self):
+        """Przelicza cechy, jeśli od ostatniego wywołania przyszły nowe próbki."""
+        pos = self.ring.write_pos
+        if pos == self.last_pos or not self.ring.read_latest(self.block):
+            return False
+        self.last_pos = pos
+        a = self.smoothing
+        self.rms = a * self.rms + (1 - a) * float(compute_volume(self.block))
+        self.zcr = a * self.zcr + (1 - a) * float(compute_zcr(self.block))
+        f0_kernel, _ = features.FEATURE_KERNELS["f0_autocorr"]  # backend wybrany w backends.py
+        self.f0 = float(f0_kernel(self.block[np.newaxis], self.fs)[0])
+        return True
@@ -1,12 +1,34 @@
 from tkinter import Tk
 from audio_app import AudioApp
+import argparse
 import sys
+import profiling
+import backends
 
 def main():
+    parser = argparse.ArgumentParser(description="Aplikacja do analizy plików WAV.")
+    parser.add_argument("--profile", nargs="?", const="", metavar="PLIK.json",
+                        help="Mierz czasy etapów; raport JSON do pliku lub tekstowy na stderr")
+    parser.add_argument("--backends", metavar="WYBÓR",
+                        help='Backendy jąder cech: "auto" (kalibracja), np. "numba" lub "f0_amdf=scipy,volume=numpy"')
+    parser.add_argument("--analysis-rate", type=float, metavar="HZ",
+                        help="Częstotliwość analizy F0 i segmentacji (np. 16000); sygnał jest decymowany "
+                             "całkowitym krokiem – domyślnie natywna częstotliwość pliku")
+    parser.add_argument("--hop-size", type=int, metavar="PRÓBKI",
+                        help="Krok ramek w próbkach (domyślnie równy ramce 256, bez nakładania); "
+                             "np. 128 to 50%% nakładania")
+    args = parser.parse_args()
+    if args.hop_size is not None and args.hop_size <= 0:
+        parser.error("--hop-size musi być dodatnie")
+    if args.profile is not None:
+        profiling.enable(args.profile or None)
+    if args.backends:
+        backends.configure(args.backends)
+
     root = Tk()
     root.title("AudioApp")
     root.geometry("900x700")
-    app = AudioApp(root)
+    app = AudioApp(root, analysis_rate=args.analysis_rate, hop_size=args.hop_size)
     root.protocol("WM_DELETE_WINDOW", app.on_close)
     root.mainloop()
     sys.exit(0)
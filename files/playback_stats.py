@@ -0,0 +1,98 @@
+import bisect
+import json
+import time
+
+# Górne granice przedziałów histogramu czasu wykonania callbacku [s]
+DURATION_BINS = [50e-6, 100e-6, 200e-6, 500e-6, 1e-3, 2e-3, 5e-3, 10e-3, 20e-3, 50e-3]
+
+
+class PlaybackStats:
+    """Statystyki callbacku odtwarzania: xruny, czasy wykonania, opóźnienie wyjścia.
+
+    record_* są wywoływane z wątku audio i tylko aktualizują liczniki
+    (bez alokacji tablic i bez blokad); snapshot()/summary() czyta je GUI.
+    """
+
+    def __init__(self, fs=None, blocksize=None):
+        self.fs = fs
+        self.blocksize = blocksize
+        self.reset()
+
+    def reset(self):
+        self.callbacks = 0
+        self.output_underflows = 0
+        self.output_overflows = 0
+        self.priming_outputs = 0
+        self.histogram = [0] * (len(DURATION_BINS) + 1)
+        self.max_duration = 0.0
+        self.total_duration = 0.0
+        self.overruns = 0
+        self.latency = 0.0
+        self.min_latency = float("inf")
+        self.max_latency = 0.0
+
+    @property
+    def xruns(self):
+        return self.output_underflows + self.output_overflows
+
+    @property
+    def budget(self):
+        # Czas trwania jednego bloku – callback musi zmieścić się w tym czasie
+        if not self.fs or not self.blocksize:
+            return 0.0
+        return self.blocksize / self.fs
+
+    def record_status(self, status):
+        if status.output_underflow:
+            self.output_underflows += 1
+        if status.output_overflow:
+            self.output_overflows += 1
+        if status.priming_output:
+            self.priming_outputs += 1
+
+    def record_callback(self, started, time_info=None):
+        duration = time.perf_counter() - started
+        self.callbacks += 1
+        self.total_duration += duration
+        self.histogram[bisect.bisect_left(DURATION_BINS, duration)] += 1
+        if duration > self.max_duration:
+            self.max_duration = duration
+        if self.budget and duration > self.budget:
+            self.overruns += 1
+
+        if time_info is not None:
+            latency = time_info.outputBufferDacTime - time_info.currentTime
+            if latency > 0:
+                self.latency = latency
+                self.min_latency = min(self.min_latency, latency)
+                self.max_latency = max(self.max_latency, latency)
+
+    def snapshot(self):
+        labels = [f"<={b * 1e3:g}ms" for b in DURATION_BINS] + [f">{DURATION_BINS[-1] * 1e3:g}ms"]
+        return {
+            "callbacks": self.callbacks,
+            "xruns": self.xruns,
+            "output_underflows": self.output_underflows,
+            "output_overflows": self.output_overflows,
+            "priming_outputs": self.priming_outputs,
+            "budget_ms": self.budget * 1e3,
+            "overruns": self.overruns,
+            "mean_duration_ms": self.total_duration / self.callbacks * 1e3 if self.callbacks else 0.0,
+            "max_duration_ms": self.max_duration * 1e3,
+            "duration_histogram": dict(zip(labels, self.histogram)),
+            "output_latency_ms": self.latency * 1e3,
+            "min_output_latency_ms": self.min_latency * 1e3 if self.max_latency else 0.0,
+            "max_output_latency_ms": self.max_latency * 1e3,
+        }
+
+    def summary(self):
+        s = self.snapshot()
+        return (
+            f"Odtwarzanie: xruny {s['xruns']}, callback śr. {s['mean_duration_ms']:.2f} ms / "
+            f"maks. {s['max_duration_ms']:.2f} ms (budżet {s['budget_ms']:.1f} ms), "
+            f"opóźnienie wyjścia {s['output_latency_ms']:.1f} ms"
+        )
+
+    def dump(self, path):
+        with open(path, "w") as f:
+            json.dump(self.snapshot(), f, indent=2)
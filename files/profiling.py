@@ -0,0 +1,131 @@
+"""Lekki pomiar czasu etapów: wczytywanie, analiza, rysowanie.
+
+Włączanie:
+    AUDIO_APP_PROFILE=1 python main.py            # raport tekstowy przy zamknięciu
+    AUDIO_APP_PROFILE=profil.json python main.py  # raport JSON przy zamknięciu
+    python main.py --profile [profil.json]
+
+Gdy pomiar jest wyłączony, stage() i timed() nie robią nic poza jednym
+sprawdzeniem flagi. Szczytowa pamięć etapu pochodzi z tracemalloc (także
+alokacje NumPy) i jest przybliżona, gdy etapy nakładają się w wątkach.
+"""
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+ENABLED = False
+OUTPUT = None
+
+_lock = threading.Lock()
+_local = threading.local()
+_stats = {}
+
+
+def enable(output=None):
+    global ENABLED, OUTPUT
+    ENABLED = True
+    OUTPUT = output
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+
+
+def _record(name, elapsed, peak_bytes):
+    with _lock:
+        entry = _stats.setdefault(
+            name, {"calls": 0, "total_s": 0.0, "min_s": float("inf"), "max_s": 0.0, "peak_mem_bytes": 0}
+        )
+        entry["calls"] += 1
+        entry["total_s"] += elapsed
+        entry["min_s"] = min(entry["min_s"], elapsed)
+        entry["max_s"] = max(entry["max_s"], elapsed)
+        entry["peak_mem_bytes"] = max(entry["peak_mem_bytes"], peak_bytes)
+
+
+@contextmanager
+def stage(name):
+    """Mierzy czas ścienny i szczytowy przyrost pamięci bloku kodu."""
+    if not ENABLED:
+        yield
+        return
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    # Szczyt rodzica sprzed resetu zapamiętujemy na jego pozycji stosu
+    if stack:
+        stack[-1][1] = max(stack[-1][1], tracemalloc.get_traced_memory()[1])
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    entry = [current, 0]
+    stack.append(entry)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        peak = max(entry[1], tracemalloc.get_traced_memory()[1])
+        stack.pop()
+        if stack:
+            stack[-1][1] = max(stack[-1][1], peak)
+        _record(name, elapsed, max(peak - entry[0], 0))
+
+
+def timed(name):
+    """Dekorator: całe wywołanie funkcji jest etapem o podanej nazwie."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def snapshot():
+    with _lock:
+        result = {}
+        for name, entry in _stats.items():
+            result[name] = dict(entry, mean_s=entry["total_s"] / entry["calls"])
+        return result
+
+
+def report():
+    rows = sorted(snapshot().items(), key=lambda item: -item[1]["total_s"])
+    lines = [f"{'Etap':<32}{'wywołania':>10}{'suma [s]':>11}{'śr. [ms]':>11}{'maks. [ms]':>12}{'pamięć [MB]':>13}"]
+    for name, e in rows:
+        lines.append(
+            f"{name:<32}{e['calls']:>10}{e['total_s']:>11.3f}{e['mean_s'] * 1e3:>11.2f}"
+            f"{e['max_s'] * 1e3:>12.2f}{e['peak_mem_bytes'] / 1e6:>13.1f}"
+        )
+    return "\n".join(lines)
+
+
+def export_json(path):
+    with open(path, "w") as f:
+        json.dump(snapshot(), f, indent=2)
+
+
+def dump():
+    """Zapisuje raport do pliku OUTPUT (JSON) lub wypisuje go na stderr."""
+    if not ENABLED:
+        return
+    if OUTPUT:
+        export_json(OUTPUT)
+    else:
+        print(report(), file=sys.stderr)
+
+
+_env = os.environ.get("AUDIO_APP_PROFILE")
+if _env and _env != "0":
+    enable(None if _env == "1" else _env)
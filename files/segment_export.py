@@ -0,0 +1,233 @@
+"""Eksport fragmentów pliku WAV: nagranie bez ciszy albo osobne pliki segmentów.
+
+Uruchomienie (z folderu files):
+    python segment_export.py nagranie.wav -o bez_ciszy.wav
+    python segment_export.py nagranie.wav -o segmenty --segments --crossfade-ms 10
+
+Próbki kopiowane są porcjami po CHUNK_SAMPLES wprost z pliku zmapowanego
+w pamięci (WavSource) do strumieniowo zapisywanego pliku (WavWriter)
+w formacie źródła, więc zużycie pamięci nie zależy od długości nagrania.
+Do float dekodowane są tylko próbki przenikań. Segmentacja także liczona
+jest porcjami (stream_frame_stats) – tymi samymi progami co w GUI.
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+from scipy.io.wavfile import WavFileWarning
+
+from audio_io import CHUNK_SAMPLES, WavSource, WavWriter, mixdown
+from audio_processing import silence_regions, voiced_unvoiced_regions
+from features import frame_starts, sliding_volume, sliding_zcr
+
+warnings.simplefilter("ignore", WavFileWarning)
+
+
+def stream_frame_stats(source, frame_size, hop_size=None, progress=None):
+    """RMS i ZCR ramek miksu kanałów liczone porcjami pliku (jak frame_stats dla całości).
+
+    Porcja obejmuje pełne ramki zaczynające się w niej, więc wynik nie zależy
+    od podziału na porcje; w pamięci jest jedna porcja i tablice cech.
+    """
+    hop_size = hop_size or frame_size
+    count = len(frame_starts(len(source), hop_size))
+    rms = np.empty(count)
+    zcr = np.empty(count)
+    step = max(1, CHUNK_SAMPLES // hop_size)
+    for first in range(0, count, step):
+        last = min(first + step, count)
+        chunk = mixdown(source.read(first * hop_size, (last - 1) * hop_size + frame_size))
+        rms[first:last] = sliding_volume(chunk, frame_size, hop_size, pad=False)[:last - first]
+        zcr[first:last] = sliding_zcr(chunk, frame_size, hop_size, pad=False)[:last - first]
+        if progress is not None:
+            progress(last / count)
+    return rms, zcr
+
+
+def keep_regions(silence, total_samples):
+    """Dopełnienie przedziałów ciszy: fragmenty [(start, koniec), ...] do zachowania."""
+    regions = []
+    position = 0
+    for start, end in silence:
+        if start > position:
+            regions.append((position, start))
+        position = max(position, end)
+    if position < total_samples:
+        regions.append((position, total_samples))
+    return regions
+
+
+def to_float(raw):
+    # Surowe próbki -> float64 (PCM 8-bit jest bez znaku, ze środkiem w 128)
+    values = raw.astype(np.float64)
+    if raw.dtype.kind == "u":
+        values -= 2 ** (8 * raw.dtype.itemsize - 1)
+    return values
+
+
+def from_float(values, dtype):
+    dtype = np.dtype(dtype)
+    if dtype.kind == "f":
+        return values.astype(dtype)
+    if dtype.kind == "u":
+        values = values + 2 ** (8 * dtype.itemsize - 1)
+    info = np.iinfo(dtype)
+    return np.clip(np.rint(values), info.min, info.max).astype(dtype)
+
+
+def require_mapped(source):
+    # Wczytany w całości plik 24-bit (int32 z scipy) zostałby zapisany jako PCM 32 bit
+    if not source.mapped:
+        raise ValueError(f"Eksport obsługuje pliki WAV PCM 8/16/32 bit lub float; {source.path} "
+                         f"(np. PCM 24 bit) nie daje się zmapować w pamięci – przekonwertuj go najpierw")
+
+
+def fade_curves(length):
+    # Liniowe wyciszenie i narastanie (suma = 1, więc przenikanie nie przesteruje)
+    fade_in = (np.arange(length) + 0.5) / length
+    return fade_in[:, np.newaxis], fade_in[::-1, np.newaxis]
+
+
+class ExportStats:
+    """Liczniki eksportu i przepustowość (próbki przeczytane ze źródła i zapisane)."""
+
+    def __init__(self, fs, frame_bytes):
+        self.fs = fs
+        self.frame_bytes = frame_bytes
+        self.files = []
+        self.frames_read = 0
+        self.frames_written = 0
+        self.start_time = time.perf_counter()
+        self.elapsed = 0.0
+
+    def finish(self):
+        self.elapsed = time.perf_counter() - self.start_time
+        return self
+
+    def summary(self):
+        duration = self.frames_written / self.fs
+        megabytes = self.frames_written * self.frame_bytes / 1e6
+        speed = megabytes / self.elapsed if self.elapsed > 0 else float("inf")
+        realtime = duration / self.elapsed if self.elapsed > 0 else float("inf")
+        return (f"Zapisano {len(self.files)} plików: {duration:.1f} s audio ({megabytes:.1f} MB) "
+                f"w {self.elapsed:.2f} s – {speed:.1f} MB/s, {realtime:.0f}x czasu rzeczywistego")
+
+
+def copy_range(raw, writer, start, stop, stats, chunk_size=CHUNK_SAMPLES, progress=None, total=None):
+    # Kopiowanie bez konwersji, porcjami – z mapy pamięci prosto do pliku
+    for position in range(start, stop, chunk_size):
+        writer.write(raw[position:min(position + chunk_size, stop)])
+        stats.frames_read += min(chunk_size, stop - position)
+        if progress is not None and total:
+            progress(min(stats.frames_read / total, 1.0))
+
+
+def export_trimmed(source, regions, path, crossfade=0, chunk_size=CHUNK_SAMPLES, progress=None):
+    """Zapisuje fragmenty regions (np. keep_regions) jeden za drugim do pliku path.
+
+    Przy crossfade > 0 sąsiednie fragmenty nakładają się na styku o
+    min(crossfade, połowa krótszego fragmentu) próbek z liniowym przenikaniem.
+    """
+    require_mapped(source)
+    raw = source.samples
+    lengths = [end - start for start, end in regions]
+    fades = [min(crossfade, a // 2, b // 2) for a, b in zip(lengths, lengths[1:])]
+    total = sum(lengths)
+    stats = ExportStats(source.fs, raw.shape[1] * raw.dtype.itemsize)
+    with WavWriter(path, source.fs, raw.shape[1], raw.dtype) as writer:
+        pending = None
+        for j, (start, stop) in enumerate(regions):
+            head = fades[j - 1] if j > 0 else 0
+            tail = fades[j] if j < len(fades) else 0
+            if head:
+                fade_in, fade_out = fade_curves(head)
+                mixed = pending * fade_out + to_float(raw[start:start + head]) * fade_in
+                writer.write(from_float(mixed, raw.dtype))
+                stats.frames_read += head
+            copy_range(raw, writer, start + head, stop - tail, stats, chunk_size, progress, total)
+            # Koniec fragmentu czeka na początek następnego
+            pending = to_float(raw[stop - tail:stop]) if tail else None
+            stats.frames_read += tail
+        stats.frames_written = writer.frames
+    stats.files.append(path)
+    return stats.finish()
+
+
+def export_segments(source, segments, out_dir, stem, crossfade=0, chunk_size=CHUNK_SAMPLES, progress=None):
+    """Każdy segment [(start, koniec[, dźwięczny]), ...] do osobnego pliku w out_dir.
+
+    Nazwy: stem_0001_dzwieczny.wav, stem_0002_bezdzwieczny.wav, ... Przy
+    crossfade > 0 początek i koniec segmentu są łagodnie narastające/wyciszane.
+    """
+    require_mapped(source)
+    raw = source.samples
+    total = sum(segment[1] - segment[0] for segment in segments)
+    stats = ExportStats(source.fs, raw.shape[1] * raw.dtype.itemsize)
+    os.makedirs(out_dir, exist_ok=True)
+    for i, segment in enumerate(segments):
+        start, stop = segment[0], segment[1]
+        kind = "" if len(segment) < 3 else ("_dzwieczny" if segment[2] else "_bezdzwieczny")
+        path = os.path.join(out_dir, f"{stem}_{i + 1:04d}{kind}.wav")
+        fade = min(crossfade, (stop - start) // 2)
+        with WavWriter(path, source.fs, raw.shape[1], raw.dtype) as writer:
+            if fade:
+                fade_in, fade_out = fade_curves(fade)
+                writer.write(from_float(to_float(raw[start:start + fade]) * fade_in, raw.dtype))
+            copy_range(raw, writer, start + fade, stop - fade, stats, chunk_size, progress, total)
+            if fade:
+                writer.write(from_float(to_float(raw[stop - fade:stop]) * fade_out, raw.dtype))
+            stats.frames_read += 2 * fade
+            stats.frames_written += writer.frames
+        stats.files.append(path)
+    return stats.finish()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Eksport nagrania bez ciszy lub segmentów do plików WAV.")
+    parser.add_argument("path", help="Plik WAV")
+    parser.add_argument("-o", "--output", required=True,
+                        help="Plik wynikowy (bez ciszy) lub folder na segmenty (--segments)")
+    parser.add_argument("--segments", action="store_true",
+                        help="Zapisz każdy segment dźwięczny/bezdźwięczny do osobnego pliku")
+    parser.add_argument("--frame-size", type=int, default=1024, help="Rozmiar ramki w próbkach")
+    parser.add_argument("--hop-size", type=int, default=None, help="Krok ramek (domyślnie równy ramce)")
+    parser.add_argument("--silence-threshold", type=float, default=0.001, help="Próg RMS ciszy")
+    parser.add_argument("--vol-threshold", type=float, default=0.02, help="Próg RMS dźwięczności")
+    parser.add_argument("--zcr-threshold", type=float, default=0.3, help="Próg ZCR dźwięczności")
+    parser.add_argument("--crossfade-ms", type=float, default=0.0,
+                        help="Przenikanie na cięciach (lub narastanie/wyciszenie segmentów) w ms")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    source = WavSource(args.path, channel=None)
+    try:
+        require_mapped(source)
+    except ValueError as error:
+        print(f"Błąd: {error}", file=sys.stderr)
+        return 1
+    hop_size = args.hop_size or args.frame_size
+
+    start_time = time.perf_counter()
+    rms, zcr = stream_frame_stats(source, args.frame_size, hop_size)
+    print(f"Segmentacja: {len(rms)} ramek w {time.perf_counter() - start_time:.2f} s")
+
+    crossfade = int(args.crossfade_ms * source.fs / 1000)
+    if args.segments:
+        segments = voiced_unvoiced_regions(rms, zcr, hop_size, len(source), args.vol_threshold,
+                                           args.zcr_threshold, args.silence_threshold)
+        stem = os.path.splitext(os.path.basename(args.path))[0]
+        stats = export_segments(source, segments, args.output, stem, crossfade)
+    else:
+        silence = silence_regions(rms, hop_size, len(source), args.silence_threshold)
+        stats = export_trimmed(source, keep_regions(silence, len(source)), args.output, crossfade)
+    print(stats.summary())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
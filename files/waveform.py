@@ -0,0 +1,122 @@
+import numpy as np
+
+
+def block_min_max(data, block_size):
+    """Minimum i maksimum w kolejnych blokach po block_size próbek (ostatni może być krótszy)."""
+    n_full = len(data) // block_size
+    blocks = data[:n_full * block_size].reshape(n_full, block_size)
+    mins = blocks.min(axis=1)
+    maxs = blocks.max(axis=1)
+    if n_full * block_size < len(data):
+        tail = data[n_full * block_size:]
+        mins = np.append(mins, tail.min())
+        maxs = np.append(maxs, tail.max())
+    return mins, maxs
+
+
+def interleave(x, mins, maxs):
+    # Linia przechodząca min -> max w każdym kubełku rysuje pełną obwiednię
+    return np.repeat(x, 2), np.column_stack((mins, maxs)).ravel()
+
+
+class WaveformPyramid:
+    """Piramida obwiedni min/max sygnału do szybkiego rysowania przebiegu.
+
+    Poziom 0 zawiera min/max bloków po base_block próbek, każdy kolejny jest
+    factor razy rzadszy. Do rysowania wybierany jest najrzadszy poziom, który
+    wciąż daje co najmniej jeden kubełek na piksel, więc liczba rysowanych
+    punktów zależy od szerokości wykresu, a nie od długości pliku.
+    """
+
+    def __init__(self, data, fs, base_block=64, factor=4, min_buckets=2048):
+        self.data = data
+        self.fs = fs
+        self.levels = []
+        block = base_block
+        mins, maxs = block_min_max(data, block)
+        self.levels.append((block, mins, maxs))
+        while len(mins) > min_buckets:
+            mins, _ = block_min_max(mins, factor)
+            _, maxs = block_min_max(maxs, factor)
+            block *= factor
+            self.levels.append((block, mins, maxs))
+
+    @property
+    def amplitude_range(self):
+        _, mins, maxs = self.levels[-1]
+        if len(mins) == 0:
+            return -1.0, 1.0
+        return float(mins.min()), float(maxs.max())
+
+    def envelope(self, t_start, t_end, width_px):
+        """Punkty (x, y) przebiegu w przedziale czasu dla wykresu o danej szerokości."""
+        total = len(self.data)
+        i0 = int(np.clip(np.floor(t_start * self.fs), 0, total))
+        i1 = int(np.clip(np.ceil(t_end * self.fs) + 1, i0, total))
+        n = i1 - i0
+        width_px = max(int(width_px), 1)
+
+        # Mało próbek – rysujemy je bezpośrednio
+        if n <= 2 * width_px:
+            return np.arange(i0, i1) / self.fs, self.data[i0:i1]
+
+        target = n / width_px
+        level = None
+        for block, mins, maxs in self.levels:
+            if block <= target:
+                level = (block, mins, maxs)
+
+        if level is None:
+            # Przybliżenie gęstsze niż poziom 0: obwiednia z surowych próbek
+            # (co najwyżej base_block * width_px próbek)
+            block = int(np.ceil(target))
+            mins, maxs = block_min_max(self.data[i0:i1], block)
+            x = (i0 + np.arange(len(mins)) * block + block / 2) / self.fs
+            return interleave(x, mins, maxs)
+
+        block, mins, maxs = level
+        b0 = i0 // block
+        b1 = -(-i1 // block)
+        x = (np.arange(b0, b1) * block + block / 2) / self.fs
+        return interleave(x, mins[b0:b1], maxs[b0:b1])
+
+
+def visible_spans(starts, ends, t_start, t_end, min_gap=0.0):
+    """Przedziały [start, koniec) przecinające widok [t_start, t_end].
+
+    starts/ends to posortowane, rozłączne przedziały jednej klasy, więc
+    widoczne wybiera searchsorted bez przeglądania wszystkich. Sąsiednie
+    przedziały oddalone o mniej niż min_gap (np. piksel) są łączone – liczba
+    zwracanych przedziałów jest ograniczona szerokością wykresu.
+    """
+    first = np.searchsorted(ends, t_start, side="right")
+    last = np.searchsorted(starts, t_end, side="left")
+    starts, ends = starts[first:last], ends[first:last]
+    if len(starts) > 1 and min_gap > 0:
+        breaks = np.flatnonzero(starts[1:] - ends[:-1] >= min_gap)
+        starts = starts[np.concatenate(([0], breaks + 1))]
+        ends = ends[np.concatenate((breaks, [len(ends) - 1]))]
+    return starts, ends
+
+
+def span_vertices(starts, ends, bottom=0.0, top=1.0):
+    # Prostokąty (n, 4, 2) dla PolyCollection – jak axvspan, w osi y wykresu od 0 do 1
+    verts = np.empty((len(starts), 4, 2))
+    verts[:, 0, 0] = verts[:, 1, 0] = starts
+    verts[:, 2, 0] = verts[:, 3, 0] = ends
+    verts[:, [0, 3], 1] = bottom
+    verts[:, [1, 2], 1] = top
+    return verts
+
+
+def region_classes(mode, regions):
+    """Wiersze przedziałów (start, koniec[, dźwięczny]) w próbkach rozdzielone na klasy rysowania.
+
+    Tryb "silence" daje jedną klasę; w pozostałych trzecia kolumna dzieli
+    przedziały na "voiced" i "unvoiced". Pusta lista daje puste klasy.
+    """
+    rows = np.asarray(regions, dtype=np.int64).reshape(-1, 2 if mode == "silence" else 3)
+    if mode == "silence":
+        return {"silence": rows}
+    is_voiced = rows[:, 2].astype(bool)
+    return {"voiced": rows[is_voiced], "unvoiced": rows[~is_voiced]}
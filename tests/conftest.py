@@ -0,0 +1,79 @@
+import os
+import sys
+import time
+import warnings
+
+import matplotlib
+import numpy as np
+import pytest
+from scipy.io import wavfile
+from scipy.io.wavfile import WavFileWarning
+
+# Moduły aplikacji leżą płasko w folderze files (import jak w main.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "files"))
+
+AUDIO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "audio_files")
+
+# Testy rysują do bufora (Agg) – bez okna Tk i wyświetlacza
+matplotlib.use("Agg", force=True)
+
+
+class FakeMaster:
+    """Zamiast okna Tk: after() zapamiętuje wywołania, run() wykonuje je, aż kolejka się opróżni."""
+
+    def __init__(self):
+        self.callbacks = {}
+        self.next_id = 0
+
+    def after(self, ms, callback):
+        self.next_id += 1
+        self.callbacks[self.next_id] = callback
+        return self.next_id
+
+    def after_cancel(self, after_id):
+        self.callbacks.pop(after_id, None)
+
+    def run(self, timeout=10.0):
+        deadline = time.monotonic() + timeout
+        while self.callbacks and time.monotonic() < deadline:
+            callbacks = list(self.callbacks.values())
+            self.callbacks.clear()
+            for callback in callbacks:
+                callback()
+            time.sleep(0.005)
+
+
+@pytest.fixture
+def master():
+    return FakeMaster()
+
+
+def read_recording(name):
+    # Nagranie z audio_files: pierwszy kanał, float32 znormalizowany do szczytu
+    with warnings.catch_warnings():
+        # chrzaszcz_* mają dodatkowe bloki nagłówka, które scipy pomija z ostrzeżeniem
+        warnings.simplefilter("ignore", WavFileWarning)
+        fs, samples = wavfile.read(os.path.join(AUDIO_DIR, name))
+    samples = (samples if samples.ndim == 1 else samples[:, 0]).astype(np.float32)
+    return samples / np.max(np.abs(samples)), fs
+
+
+@pytest.fixture
+def speech():
+    return read_recording("radio_mowa.wav")
+
+
+@pytest.fixture(params=sorted(name for name in os.listdir(AUDIO_DIR) if name.endswith(".wav")))
+def recording(request):
+    # Kolejno każde nagranie z audio_files
+    return read_recording(request.param)
+
+
+@pytest.fixture
+def restore_backends():
+    # Wybór backendów to stan globalny features.FEATURE_KERNELS – przywracany po teście
+    import backends
+    saved = backends.active()
+    yield
+    for kernel, backend in saved.items():
+        backends.select(kernel, backend)
@@ -0,0 +1,91 @@
+import threading
+
+import pytest
+
+from analysis_worker import AnalysisExecutor, JobCancelled
+
+
+@pytest.fixture
+def executor(master):
+    executor = AnalysisExecutor(master)
+    yield executor
+    executor.shutdown()
+
+
+def test_progress_and_result_arrive_through_master(master, executor):
+    events = []
+    threads = []
+
+    def work(job, n):
+        for i in range(n):
+            job.report((i + 1) / n, i)
+        return n * 10
+
+    def on_progress(fraction, partial):
+        threads.append(threading.current_thread())
+        events.append(("progress", fraction, partial))
+
+    def on_done(result):
+        threads.append(threading.current_thread())
+        events.append(("done", result))
+
+    executor.submit(work, 4, on_progress=on_progress, on_done=on_done)
+    master.run()
+    assert events == [("progress", 0.25, 0), ("progress", 0.5, 1), ("progress", 0.75, 2),
+                      ("progress", 1.0, 3), ("done", 40)]
+    # Callbacki wykonuje pętla master.after, nie wątek roboczy
+    assert all(t is threading.main_thread() for t in threads)
+    assert not executor.jobs and not master.callbacks
+
+
+def test_errors_go_to_on_error(master, executor):
+    errors = []
+
+    def work(job):
+        raise ValueError("zły plik")
+
+    executor.submit(work, on_error=errors.append)
+    master.run()
+    assert len(errors) == 1 and isinstance(errors[0], ValueError)
+
+
+def test_error_without_handler_is_raised_in_gui_thread(master, executor):
+    def work(job):
+        raise ValueError("zły plik")
+
+    executor.submit(work)
+    with pytest.raises(ValueError):
+        master.run()
+
+
+def test_cancelled_job_stops_at_report_and_skips_callbacks(master, executor):
+    started = threading.Event()
+    release = threading.Event()
+    reached = []
+    done = []
+
+    def work(job):
+        started.set()
+        release.wait(5)
+        job.report(0.5)
+        reached.append("po report")
+        return 1
+
+    job = executor.submit(work, on_progress=done.append, on_done=done.append)
+    started.wait(5)
+    executor.cancel_all()
+    release.set()
+    master.run()
+    assert job.cancelled
+    assert job.future.exception(timeout=5) is None
+    assert reached == [] and done == []
+    assert not executor.jobs
+
+
+def test_check_raises_after_cancel(executor):
+    job = executor.submit(lambda job: None)
+    job.cancel()
+    with pytest.raises(JobCancelled):
+        job.check()
+    with pytest.raises(JobCancelled):
+        job.report(0.1)
@@ -0,0 +1,113 @@
+import struct
+
+import numpy as np
+import pytest
+from scipy.io import wavfile
+
+import audio_io
+from audio_io import WavSource, WavWriter
+
+
+def write_wav(path, samples, fs=8000):
+    wavfile.write(path, fs, samples)
+    return str(path)
+
+
+def normalized(samples):
+    # Pierwotne wczytywanie: cały plik do float32 i dzielenie przez szczyt
+    samples = samples.astype(np.float32)
+    peak = np.max(np.abs(samples))
+    return samples / peak if peak > 1e-9 else samples
+
+
+@pytest.fixture
+def stereo_int16(tmp_path):
+    rng = np.random.default_rng(0)
+    samples = (rng.standard_normal((20000, 2)) * 4000).clip(-32768, 32767).astype(np.int16)
+    samples[123, 0] = -32768  # np.abs na int16 by się przepełniło
+    return write_wav(tmp_path / "stereo.wav", samples), samples
+
+
+def test_wav_source_matches_full_read(stereo_int16):
+    path, samples = stereo_int16
+    source = WavSource(path)
+    assert isinstance(source.raw, np.memmap)
+    expected = normalized(samples[:, 0])
+    np.testing.assert_array_equal(source.to_float32(), expected)
+    # Małe porcje – sprawdzamy też sklejanie porcji
+    chunks = [chunk for _, chunk in source.iter_chunks(chunk_size=1000)]
+    np.testing.assert_array_equal(np.concatenate(chunks), expected)
+    assert source.peak == 32768.0
+
+
+def test_wav_source_all_channels_share_peak(stereo_int16):
+    path, samples = stereo_int16
+    source = WavSource(path, channel=None)
+    assert source.samples.shape == samples.shape
+    np.testing.assert_array_equal(source.to_float32(), normalized(samples))
+    np.testing.assert_array_equal(source.read(100, 300), normalized(samples)[100:300])
+
+
+def test_wav_source_silent_file_is_not_divided(tmp_path):
+    path = write_wav(tmp_path / "silent.wav", np.zeros(500, dtype=np.int16))
+    np.testing.assert_array_equal(WavSource(path).to_float32(), np.zeros(500, dtype=np.float32))
+
+
+def written_samples(dtype, frames, channels):
+    rng = np.random.default_rng(10)
+    dtype = np.dtype(dtype)
+    if dtype.kind == "f":
+        return rng.uniform(-1, 1, (frames, channels)).astype(dtype)
+    info = np.iinfo(dtype)
+    return rng.integers(info.min, info.max, (frames, channels), endpoint=True).astype(dtype)
+
+
+def write_in_chunks(path, samples, fs=8000):
+    with WavWriter(path, fs, samples.shape[1], samples.dtype) as writer:
+        for start in range(0, len(samples), 333):
+            writer.write(samples[start:start + 333])
+    return writer
+
+
+@pytest.mark.parametrize("dtype", [np.int16, np.int32, np.uint8, np.float32, np.float64])
+@pytest.mark.parametrize("channels, frames", [(1, 1001), (2, 1000)])
+def test_wav_writer_round_trip(tmp_path, dtype, channels, frames):
+    samples = written_samples(dtype, frames, channels)
+    path = str(tmp_path / "out.wav")
+    writer = write_in_chunks(path, samples)
+    assert writer.frames == frames and writer.nbytes == samples.nbytes
+    fs, read = wavfile.read(path)
+    assert fs == 8000 and read.dtype == np.dtype(dtype)
+    np.testing.assert_array_equal(read.reshape(frames, channels), samples)
+
+
+def read_rf64(path):
+    # Minimalny czytnik RF64: rozmiary z bloku ds64, próbki z bloku data
+    with open(path, "rb") as f:
+        content = f.read()
+    assert content[:4] == b"RF64" and content[8:16] == b"WAVEds64"
+    riff_bytes, data_bytes, frames = struct.unpack("<QQQ", content[20:44])
+    data_offset = content.index(b"data") + 8
+    return riff_bytes, data_bytes, frames, content, data_offset
+
+
+def test_wav_writer_switches_to_rf64_past_riff_limit(tmp_path, monkeypatch):
+    monkeypatch.setattr(audio_io, "RIFF_MAX_BYTES", 4000)
+    samples = written_samples(np.int16, 3001, 1)  # 6002 B danych > 4000 B
+    path = str(tmp_path / "big.wav")
+    write_in_chunks(path, samples)
+    riff_bytes, data_bytes, frames, content, data_offset = read_rf64(path)
+    assert (riff_bytes, data_bytes, frames) == (len(content) - 8, samples.nbytes, 3001)
+    # Pola 32-bitowe mają wartość graniczną – prawdziwe rozmiary są w ds64
+    assert struct.unpack("<I", content[4:8])[0] == 4000
+    assert struct.unpack("<I", content[data_offset - 4:data_offset])[0] == 4000
+    np.testing.assert_array_equal(np.frombuffer(content[data_offset:data_offset + data_bytes], "<i2"), samples[:, 0])
+
+
+def test_wav_writer_below_limit_keeps_junk_chunk(tmp_path, monkeypatch):
+    monkeypatch.setattr(audio_io, "RIFF_MAX_BYTES", 1 << 20)
+    path = str(tmp_path / "small.wav")
+    write_in_chunks(path, written_samples(np.float32, 100, 2))
+    with open(path, "rb") as f:
+        header = f.read(16)
+    assert header[:4] == b"RIFF" and header[8:16] == b"WAVEJUNK"
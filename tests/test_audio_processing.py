@@ -0,0 +1,176 @@
+import numpy as np
+import pytest
+
+from audio_io import decimate
+from audio_processing import (
+    VoicedAudioProcessor, mask_to_channel_runs, mask_to_runs, rescale_regions, silence_regions, voiced_unvoiced_regions
+)
+from features import FEATURE_NAMES, analysis_frames, compute_feature, compute_volume, compute_zcr, nearest_frames
+
+
+def loop_silence(data, frame_size, silence_threshold):
+    # Pierwotna pętlowa detekcja ciszy (ramka po ramce) – wzorzec dla wersji wektorowej
+    regions = []
+    start = None
+    for i in range(0, len(data), frame_size):
+        if compute_volume(data[i:i + frame_size]) < silence_threshold:
+            start = i if start is None else start
+        elif start is not None:
+            regions.append((start, i))
+            start = None
+    if start is not None:
+        regions.append((start, len(data)))
+    return regions
+
+
+def loop_voiced_unvoiced(data, frame_size, vol_threshold=0.02, zcr_threshold=0.3, silence_threshold=0.001):
+    results = []
+    state = None
+    start = 0
+    for i in range(0, len(data), frame_size):
+        frame = data[i:i + frame_size]
+        rms = compute_volume(frame)
+        if rms < silence_threshold:
+            if state is not None:
+                results.append((start, i, state))
+                state = None
+            continue
+        voiced = bool(rms > vol_threshold and compute_zcr(frame) < zcr_threshold)
+        if state is None:
+            state, start = voiced, i
+        elif voiced != state:
+            results.append((start, i, state))
+            state, start = voiced, i
+    if state is not None:
+        results.append((start, len(data), state))
+    return results
+
+
+@pytest.mark.parametrize("frame_size", [256, 1024, 2048])
+@pytest.mark.parametrize("threshold", [0.001, 0.01, 0.05])
+def test_detect_silence_matches_loop(speech, frame_size, threshold):
+    data, fs = speech
+    regions = VoicedAudioProcessor().detect_silence(data, fs, frame_size, threshold)
+    assert regions == loop_silence(data, frame_size, threshold)
+
+
+@pytest.mark.parametrize("frame_size", [256, 1024])
+@pytest.mark.parametrize("thresholds", [(0.02, 0.3, 0.001), (0.05, 0.1, 0.01)])
+def test_detect_voiced_unvoiced_matches_loop(speech, frame_size, thresholds):
+    data, fs = speech
+    segments = VoicedAudioProcessor().detect_voiced_unvoiced(data, fs, frame_size, *thresholds)
+    assert segments == loop_voiced_unvoiced(data, frame_size, *thresholds)
+
+
+def test_mask_to_runs():
+    mask = np.array([1, 1, 0, 0, 1, 0, 1, 1, 1], dtype=bool)
+    starts, ends = mask_to_runs(mask)
+    assert list(zip(starts, ends)) == [(0, 2), (4, 5), (6, 9)]
+    starts, ends = mask_to_runs(np.zeros(0, dtype=bool))
+    assert len(starts) == len(ends) == 0
+
+
+def stereo(data):
+    # Drugi kanał to ten sam sygnał od tyłu i ciszej – inne przedziały niż w pierwszym
+    return np.column_stack((data, 0.3 * data[::-1]))
+
+
+def test_mask_to_channel_runs_matches_mask_to_runs():
+    mask = np.random.default_rng(5).random((200, 3)) < 0.4
+    mask[:, 2] = False
+    channel, starts, ends = mask_to_channel_runs(mask)
+    assert np.all(np.diff(channel) >= 0)
+    for c in range(mask.shape[1]):
+        expected_starts, expected_ends = mask_to_runs(mask[:, c])
+        np.testing.assert_array_equal(starts[channel == c], expected_starts)
+        np.testing.assert_array_equal(ends[channel == c], expected_ends)
+
+
+@pytest.mark.parametrize("frame_size, hop_size", [(1024, None), (1024, 256)])
+def test_multichannel_detection_matches_each_channel(speech, frame_size, hop_size):
+    data, fs = speech
+    data = stereo(data[:fs * 10])
+    processor = VoicedAudioProcessor()
+    silence = processor.detect_silence(data, fs, frame_size, 0.01, hop_size=hop_size)
+    segments = processor.detect_voiced_unvoiced(data, fs, frame_size, hop_size=hop_size)
+    for c in range(data.shape[1]):
+        channel = np.ascontiguousarray(data[:, c])
+        assert silence[c] == processor.detect_silence(channel, fs, frame_size, 0.01, hop_size=hop_size)
+        assert segments[c] == processor.detect_voiced_unvoiced(channel, fs, frame_size, hop_size=hop_size)
+
+
+@pytest.mark.parametrize("name", FEATURE_NAMES)
+def test_multichannel_features_match_each_channel(speech, name):
+    data, fs = speech
+    data = stereo(data[:fs])
+    values = compute_feature(name, data, fs, 1024, 512)
+    assert values.shape[1] == 2
+    for c in range(2):
+        expected = compute_feature(name, np.ascontiguousarray(data[:, c]), fs, 1024, 512)
+        np.testing.assert_allclose(values[:, c], expected, rtol=1e-5, atol=1e-7)
+
+
+def test_rescale_regions_maps_to_original_samples():
+    assert rescale_regions([(0, 10), (20, 34)], 1, 100) == [(0, 10), (20, 34)]
+    assert rescale_regions([(0, 10, True), (20, 34, False)], 3, 100) == [(0, 30, True), (60, 100, False)]
+    assert rescale_regions([[(1, 2)], []], 4, 100) == [[(4, 8)], []]
+    assert rescale_regions([], 4, 100) == []
+
+
+@pytest.mark.parametrize("hop_size, factor", [(512, 2), (512, 3), (300, 4), (1024, 6)])
+def test_nearest_frames_pick_closest_start(hop_size, factor):
+    _, hop_low = analysis_frames(1024, hop_size, factor)
+    count, analysis_count = 200, 200 * hop_size // (hop_low * factor)
+    index = nearest_frames(count, hop_size, analysis_count, hop_low, factor)
+    starts = np.arange(count) * hop_size
+    low_starts = np.arange(analysis_count) * hop_low * factor
+    expected = np.abs(starts[:, np.newaxis] - low_starts).argmin(axis=1)
+    # Przy remisie wybór może paść na którąkolwiek z dwóch ramek
+    np.testing.assert_array_equal(np.abs(low_starts[index] - starts), np.abs(low_starts[expected] - starts))
+    if hop_size % factor == 0:
+        np.testing.assert_array_equal(index, np.minimum(np.arange(count), analysis_count - 1))
+
+
+def test_decimated_segmentation_matches_original_at_frame_resolution(speech):
+    # Segmentacja na sygnale zdecymowanym – przedziały w próbkach oryginału, granice na ramkach
+    data, fs = speech
+    factor = 2
+    frame_low, hop_low = analysis_frames(1024, 1024, factor)
+    processor = VoicedAudioProcessor()
+    low = rescale_regions(processor.detect_silence(decimate(data, factor), fs / factor, frame_low, 0.05), factor,
+                          len(data))
+    full = processor.detect_silence(data, fs, 1024, 0.05)
+    assert all(start % 1024 == 0 for start, _ in low)
+
+    def coverage(regions):
+        mask = np.zeros(len(data), dtype=bool)
+        for start, end in regions:
+            mask[start:end] = True
+        return mask
+
+    assert coverage(full).mean() > 0.05
+    assert np.mean(coverage(low) == coverage(full)) > 0.95
+
+
+@pytest.mark.parametrize("channels", [1, 2])
+@pytest.mark.parametrize("hop_size", [None, 512])
+def test_regions_from_cached_stats_match_detection(speech, channels, hop_size):
+    # Suwaki progów: jedna para (RMS, ZCR) ramek, segmentacja przy każdym progu bez ponownych cech
+    data, fs = speech
+    data = data[:fs * 10] if channels == 1 else stereo(data[:fs * 10])
+    processor = VoicedAudioProcessor()
+    rms, zcr = processor.frame_stats(data, 1024, hop_size)
+    hop = hop_size or 1024
+    for silence_threshold in [0.001, 0.01, 0.05]:
+        assert silence_regions(rms, hop, len(data), silence_threshold) == processor.detect_silence(
+            data, fs, 1024, silence_threshold, hop_size=hop_size)
+        for vol_threshold, zcr_threshold in [(0.02, 0.3), (0.1, 0.1), (0.005, 0.5)]:
+            thresholds = (vol_threshold, zcr_threshold, silence_threshold)
+            assert voiced_unvoiced_regions(rms, zcr, hop, len(data), *thresholds) == \
+                processor.detect_voiced_unvoiced(data, fs, 1024, *thresholds, hop_size=hop_size)
+            if channels == 1 and hop_size is None:
+                assert voiced_unvoiced_regions(rms, zcr, hop, len(data), *thresholds) == \
+                    loop_voiced_unvoiced(data, 1024, *thresholds)
+        if channels == 1 and hop_size is None:
+            assert silence_regions(rms, hop, len(data), silence_threshold) == \
+                loop_silence(data, 1024, silence_threshold)
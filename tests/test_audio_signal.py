@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+from scipy.io import wavfile
+from scipy.signal import resample_poly
+
+from audio_io import decimate, decimation_factor, mixdown
+from audio_signal import AudioSignal
+
+
+@pytest.fixture
+def stereo():
+    samples = np.random.default_rng(6).standard_normal((10000, 2)).astype(np.float32)
+    return AudioSignal(samples, 8000), samples
+
+
+def test_times_match_explicit_time_axis(stereo):
+    signal, samples = stereo
+    time_axis = np.arange(len(samples)) / signal.fs
+    np.testing.assert_array_equal(signal.times(), time_axis)
+    np.testing.assert_array_equal(signal.times(100, 5000, 7), time_axis[100:5000:7])
+    np.testing.assert_array_equal(signal.times(9990, 20000), time_axis[9990:])
+    assert signal.time_at(4000) == time_axis[4000]
+    assert signal.duration == 1.25
+    assert signal.index_at(0.5) == 4000
+    assert signal.index_at(-1) == 0 and signal.index_at(99) == len(signal)
+
+
+def test_channels_are_views_and_mix_is_the_mean(stereo):
+    signal, samples = stereo
+    assert signal.channels == 2 and signal.samples.dtype == np.float32
+    assert np.shares_memory(signal.view(1), signal.samples)
+    np.testing.assert_array_equal(signal.view(1), samples[:, 1])
+    # Miks – bit w bit jak np.mean, liczony raz
+    np.testing.assert_array_equal(signal.view(), np.mean(samples, axis=1))
+    assert signal.view() is signal.mix()
+
+
+@pytest.mark.parametrize("channels", [3, 9])
+def test_mixdown_matches_mean(channels):
+    samples = np.random.default_rng(7).standard_normal((5000, channels)).astype(np.float32)
+    np.testing.assert_array_equal(mixdown(samples), np.mean(samples, axis=1))
+    np.testing.assert_allclose(mixdown(samples.astype(np.float64)), np.mean(samples, axis=1), rtol=1e-6, atol=1e-7)
+
+
+def test_mono_signal_mix_is_a_view():
+    samples = np.linspace(-1, 1, 1000)
+    signal = AudioSignal(samples, 1000)
+    assert signal.samples.shape == (1000, 1) and signal.samples.dtype == np.float32
+    assert np.shares_memory(signal.view(), signal.samples)
+    assert signal.nbytes == 4 * 1000
+
+
+def test_nbytes_counts_float32_samples_and_mix(stereo):
+    signal, samples = stereo
+    assert signal.nbytes == samples.size * 4
+    signal.mix()
+    assert signal.nbytes == samples.size * 4 + len(samples) * 4
+
+
+def test_from_wav_keeps_normalized_float32(tmp_path):
+    samples = (np.random.default_rng(8).standard_normal((3000, 2)) * 8000).astype(np.int16)
+    path = str(tmp_path / "stereo.wav")
+    wavfile.write(path, 8000, samples)
+    signal = AudioSignal.from_wav(path)
+    expected = samples.astype(np.float32) / np.abs(samples.astype(np.float32)).max()
+    assert signal.fs == 8000
+    np.testing.assert_array_equal(signal.samples, expected)
+
+
+@pytest.mark.parametrize("fs, rate, factor", [(48000, 16000, 3), (44100, 16000, 2), (96000, 16000, 6),
+                                              (16000, 16000, 1), (8000, 16000, 1), (48000, None, 1)])
+def test_decimation_factor_keeps_rate_above_target(fs, rate, factor):
+    assert decimation_factor(fs, rate) == factor
+    if rate:
+        assert fs / factor >= min(rate, fs)
+
+
+def test_decimate_keeps_sample_alignment_and_removes_aliases():
+    fs = 48000
+    t = np.arange(fs) / fs
+    low = np.sin(2 * np.pi * 200 * t).astype(np.float32)
+    high = np.sin(2 * np.pi * 11000 * t).astype(np.float32)  # powyżej 8 kHz po decymacji
+    decimated = decimate(low + high, 3)
+    assert decimated.dtype == np.float32 and len(decimated) == fs // 3
+    np.testing.assert_allclose(decimated, resample_poly(low + high, 1, 3).astype(np.float32), atol=1e-6)
+    # Próbka i wyniku to próbka 3 * i oryginału – bez przesunięcia, składowa 11 kHz wycięta
+    middle = slice(1000, -1000)
+    np.testing.assert_allclose(decimated[middle], low[::3][middle], atol=0.01)
+    assert decimate(low, 1) is low
+
+
+def test_decimated_signal_is_cached_and_counted(stereo):
+    signal = AudioSignal(np.tile(stereo[1], (6, 1)), 48000)
+    assert signal.decimated(None) is signal and signal.decimated(48000) is signal
+    low = signal.decimated(16000)
+    assert low.fs == 16000 and isinstance(low.fs, int)
+    assert signal.decimation(low) == 3
+    assert low.channels == 2 and len(low) == len(signal) // 3
+    np.testing.assert_array_equal(low.samples, decimate(signal.samples, 3))
+    assert signal.decimated(16000) is low
+    assert signal.nbytes == signal.samples.nbytes + low.nbytes
+    # Krok niebędący dzielnikiem fs daje ułamkową częstotliwość
+    assert AudioSignal(np.zeros(4410), 44100).decimated(5000).fs == 5512.5
@@ -0,0 +1,82 @@
+import json
+
+import numpy as np
+import pytest
+
+import backends
+import features
+from backends import BACKENDS, KERNELS, TOLERANCES, agreement, calibration_signal
+
+
+@pytest.fixture
+def calibration_frames():
+    data, fs = calibration_signal(seconds=2.0)
+    frames, _ = features.frame_signal(data, 1024)
+    frames = np.ascontiguousarray(frames)
+    return frames, fs, features.compute_volume_batch(frames)
+
+
+@pytest.mark.parametrize("kernel, backend", [(k, b) for k in KERNELS for b in BACKENDS[k] if b != "python"])
+def test_backends_agree_with_reference(calibration_frames, kernel, backend):
+    frames, fs, rms = calibration_frames
+    args = (frames, fs) if KERNELS[kernel] else (frames,)
+    reference = BACKENDS[kernel]["python"](*args)
+    score = agreement(kernel, BACKENDS[kernel][backend](*args), reference, rms)
+    assert score >= TOLERANCES[kernel][1]
+
+
+@pytest.mark.parametrize("loops, reference, needs_fs", [
+    (backends.volume_loops, features.compute_volume, False),
+    (backends.zcr_loops, features.compute_zcr, False),
+    (backends.autocorr_f0_loops, features.compute_autocorr_f0, True),
+])
+def test_numba_loops_match_reference(loops, reference, needs_fs):
+    # Pętle dla numby działają też jako zwykły Python – sprawdzamy je bez kompilacji
+    data, fs = calibration_signal(fs=8000, seconds=0.5)
+    frames = np.ascontiguousarray(features.frame_signal(data, 256)[0], dtype=np.float64)
+    args = (fs, 50.0, 500.0) if needs_fs else ()
+    expected = [reference(frame, *((fs,) if needs_fs else ())) for frame in frames]
+    np.testing.assert_allclose(loops(frames, *args), expected, rtol=1e-6, atol=1e-9)
+
+
+def test_amdf_loops_match_reference():
+    data, fs = calibration_signal(fs=8000, seconds=0.25)
+    frames = np.ascontiguousarray(features.frame_signal(data, 256)[0], dtype=np.float64)
+    min_lag, max_lag = features.amdf_lag_range(256, fs)
+    expected = [features.compute_amdf_f0(frame, fs) for frame in frames]
+    np.testing.assert_allclose(backends.amdf_f0_loops(frames, fs, 50.0, 500.0, min_lag, max_lag), expected)
+
+
+def test_select_replaces_feature_kernel(restore_backends):
+    backends.select("f0_amdf", "python")
+    assert features.FEATURE_KERNELS["f0_amdf"][0] is BACKENDS["f0_amdf"]["python"]
+    assert backends.active()["f0_amdf"] == "python"
+    backends.select("f0_amdf", "numpy")
+    assert features.FEATURE_KERNELS["f0_amdf"] == features.DEFAULT_KERNELS["f0_amdf"]
+    with pytest.raises(ValueError):
+        backends.select("f0_amdf", "fortran")
+
+
+def test_configure_parses_backend_spec(restore_backends):
+    before = backends.active()
+    backends.configure("")
+    assert backends.active() == before
+    backends.configure("numpy")
+    backends.configure("scipy")
+    assert backends.active() == {"volume": "numpy", "zcr": "numpy", "f0_autocorr": "scipy", "f0_amdf": "scipy"}
+    backends.configure(" volume=python, f0_amdf=numpy ")
+    assert backends.active() == {"volume": "python", "zcr": "numpy", "f0_autocorr": "scipy", "f0_amdf": "numpy"}
+    with pytest.raises(ValueError):
+        backends.configure("ste=python")
+
+
+def test_calibration_is_saved_and_reused(tmp_path, monkeypatch, restore_backends):
+    path = str(tmp_path / "backends.json")
+    monkeypatch.setattr(backends, "calibration_signal", lambda: calibration_signal(seconds=0.5))
+    report = backends.load_or_calibrate(path)
+    assert set(report["selected"]) == set(KERNELS)
+    assert backends.active() == report["selected"]
+    assert json.load(open(path))["host"] == backends.host_fingerprint()
+
+    monkeypatch.setattr(backends, "calibrate", lambda: pytest.fail("ponowna kalibracja"))
+    assert backends.load_or_calibrate(path)["selected"] == report["selected"]
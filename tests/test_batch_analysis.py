@@ -0,0 +1,60 @@
+import csv
+import io
+
+import numpy as np
+import pytest
+from scipy.io import wavfile
+
+import batch_analysis
+from audio_processing import VoicedAudioProcessor
+from audio_signal import AudioSignal
+from features import compute_frame_features
+
+
+@pytest.fixture
+def short_wav(tmp_path, speech):
+    data, fs = speech
+    path = tmp_path / "mowa.wav"
+    wavfile.write(path, fs, (data[:2 * fs] * 32000).astype(np.int16))
+    return str(path)
+
+
+def test_analyse_file_writes_gui_results(short_wav, tmp_path):
+    out_dir = tmp_path / "wyniki"
+    out_dir.mkdir()
+    result = batch_analysis.analyse_file(short_wav, str(out_dir), 256, 0.01, {"csv", "npz"}, hop_size=128)
+    signal = AudioSignal.from_wav(short_wav)
+    data = signal.channel(0)
+    processor = VoicedAudioProcessor()
+
+    with np.load(out_dir / "mowa_analysis.npz") as npz:
+        silence = [tuple(row[:2]) for row in npz["silence"]]
+        segments = [(s, e, bool(v)) for s, e, v, _ in npz["voiced_unvoiced"]]
+        assert silence == processor.detect_silence(data, signal.fs, 256, 0.01, 128)
+        assert segments == processor.detect_voiced_unvoiced(data, signal.fs, 256, silence_threshold=0.01,
+                                                             hop_size=128)
+        expected = compute_frame_features(data, signal.fs, 256, hop_size=128)
+        for name, values in expected.items():
+            np.testing.assert_array_equal(npz[name], values)
+
+    with open(out_dir / "mowa_segments.csv") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == len(silence) + len(segments)
+    with open(out_dir / "mowa_features.csv") as f:
+        assert sum(1 for _ in f) == len(expected["time"]) + 1
+    assert result["samples"] == len(signal)
+
+
+def test_main_analyses_folder_in_worker_processes(short_wav, tmp_path):
+    out_dir = tmp_path / "wyniki"
+    assert batch_analysis.main([str(tmp_path), "-o", str(out_dir), "--format", "npz", "--workers", "2"]) == 0
+    assert sorted(p.name for p in out_dir.iterdir()) == ["mowa_analysis.npz"]
+
+
+def test_print_summary_reports_real_time_factor():
+    out = io.StringIO()
+    results = [{"path": "a.wav", "duration": 10.0, "samples": 160000, "bytes": 320044, "elapsed": 0.5}]
+    batch_analysis.print_summary(results, 0.5, out=out)
+    lines = out.getvalue().splitlines()
+    assert lines[0] == "a.wav: 10.0 s audio, 0.50 s, RTF 0.0500"
+    assert lines[1].startswith("Razem: 1 plików, 10.0 s audio w 0.50 s (20.0x czasu rzeczywistego")
@@ -0,0 +1,60 @@
+import json
+
+import numpy as np
+import pytest
+
+import benchmark
+from benchmark import BENCHMARKS, compare, make_signal
+from features import DEFAULT_KERNELS
+
+
+def test_compare_reports_only_regressions_above_threshold():
+    baseline = {"a": {"median": 1.0}, "b": {"median": 1.0}, "c": {"median": 2.0}}
+    results = {"a": {"median": 1.05}, "b": {"median": 1.2}, "c": {"median": 1.0}, "nowy": {"median": 9.0}}
+    assert compare(results, baseline, 0.1) == [("b", 1.0, 1.2)]
+    assert compare(results, baseline, 0.01) == [("a", 1.0, 1.05), ("b", 1.0, 1.2)]
+
+
+@pytest.mark.parametrize("kind", ["sine", "noise", "chirp", "silence_mix"])
+def test_synthetic_signals_are_reproducible(kind):
+    first, fs = make_signal(kind, 0.5)
+    second, _ = make_signal(kind, 0.5)
+    assert first.dtype == np.float32 and len(first) == fs // 2
+    np.testing.assert_array_equal(first, second)
+
+
+# Przypadek *_batch -> przypadek z funkcją ramkową z bazowej wersji (YIN nie ma odpowiednika)
+PER_FRAME_CASES = {
+    "volume": "compute_volume", "ste": "compute_ste", "zcr": "compute_zcr", "sr": "compute_sr",
+    "f0_autocorr": "compute_autocorr_f0", "f0_amdf": "compute_amdf_f0",
+}
+
+
+@pytest.mark.parametrize("name", sorted(set(DEFAULT_KERNELS) & set(PER_FRAME_CASES)))
+def test_batched_cases_match_per_frame_cases(name):
+    data, fs = make_signal("silence_mix", 0.5)
+    reference = BENCHMARKS[PER_FRAME_CASES[name]][0](data, fs, 512)
+    values = BENCHMARKS[f"{name}_batch"][0](data, fs, 512)
+    if name == "f0_amdf":
+        # AMDF przez FFT jest przybliżeniem – okres może różnić się o jedną próbkę
+        assert np.all(np.abs(fs / np.asarray(values) - fs / np.asarray(reference)) <= 1 + 1e-9)
+    else:
+        np.testing.assert_allclose(values, reference, rtol=1e-4, atol=1e-6)
+
+
+def test_main_writes_results_and_flags_regressions(tmp_path, capsys):
+    baseline_path = tmp_path / "bench.json"
+    argv = ["-o", str(baseline_path), "--frame-sizes", "256", "--lengths", "0.1", "--repeat", "1",
+            "--no-wav", "--only", "compute_volume", "zcr_batch"]
+    assert benchmark.main(argv) == 0
+    report = json.loads(baseline_path.read_text())
+    assert set(report["results"]) == {f"{name}/{kind}_0.1s/frame256" for name in ["compute_volume", "zcr_batch"]
+                                      for kind in ["sine", "noise", "chirp", "silence_mix"]}
+
+    # Baza z pomijalnie krótkimi czasami – każdy przypadek jest regresją
+    for result in report["results"].values():
+        result["median"] = 1e-12
+    baseline_path.write_text(json.dumps(report))
+    argv[1] = str(tmp_path / "bench_new.json")
+    assert benchmark.main(argv + ["--compare", str(baseline_path)]) == 1
+    assert "REGRESJA" in capsys.readouterr().out
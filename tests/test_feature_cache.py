@@ -0,0 +1,75 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import feature_cache
+from feature_cache import FeatureCache, content_hash
+
+
+def test_round_trip(tmp_path):
+    cache = FeatureCache(str(tmp_path))
+    key = cache.make_key("abc", feature="volume", frame_size=256)
+    assert cache.load(key) is None
+    cache.save(key, {"values": np.arange(5.0)})
+    np.testing.assert_array_equal(cache.load(key)["values"], np.arange(5.0))
+
+
+def test_key_depends_on_data_and_params():
+    cache = FeatureCache("unused")
+    key = cache.make_key("abc", feature="volume", frame_size=256)
+    assert key == cache.make_key("abc", frame_size=256, feature="volume")
+    assert key != cache.make_key("abd", feature="volume", frame_size=256)
+    assert key != cache.make_key("abc", feature="volume", frame_size=512)
+
+
+def test_content_hash_of_strided_view_equals_copy():
+    data = np.random.default_rng(0).standard_normal((3000, 2)).astype(np.float32)
+    assert content_hash(data[:, 1]) == content_hash(data[:, 1].copy())
+    assert content_hash(data[:, 0]) != content_hash(data[:, 1])
+    assert content_hash(data[:, 0], chunk_size=100) == content_hash(data[:, 0])
+
+
+def test_old_version_and_corrupted_entries_are_ignored(tmp_path, monkeypatch):
+    cache = FeatureCache(str(tmp_path))
+    cache.save("old", {"values": np.ones(3)})
+    monkeypatch.setattr(feature_cache, "CACHE_VERSION", feature_cache.CACHE_VERSION + 1)
+    assert cache.load("old") is None
+    with open(cache.path_for("broken"), "wb") as f:
+        f.write(b"to nie jest npz")
+    assert cache.load("broken") is None
+    assert not os.path.exists(cache.path_for("broken"))
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    values = {"values": np.zeros(1000)}
+    cache = FeatureCache(str(tmp_path))
+    for i, key in enumerate(["a", "b", "c"]):
+        cache.save(key, values)
+        os.utime(cache.path_for(key), (1000 + i, 1000 + i))
+    entry_size = os.path.getsize(cache.path_for("a"))
+    # Odczyt odświeża czas użycia – "a" staje się najnowszy
+    assert cache.load("a") is not None
+    cache.max_bytes = 3 * entry_size
+    cache.save("d", values)
+    assert sorted(p.stem for p in tmp_path.glob("*.npz")) == ["a", "c", "d"]
+
+
+def test_concurrent_saves_use_separate_temporary_files(tmp_path):
+    cache = FeatureCache(str(tmp_path))
+    values = {"values": np.arange(100000.0)}
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: cache.save("wspolny", values), range(16)))
+    np.testing.assert_array_equal(cache.load("wspolny")["values"], values["values"])
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_failed_save_removes_temporary_file(tmp_path, monkeypatch):
+    cache = FeatureCache(str(tmp_path))
+
+    def replace_fails(src, dst):
+        raise OSError("dysk pełny")
+
+    monkeypatch.setattr(feature_cache.os, "replace", replace_fails)
+    cache.save("klucz", {"values": np.ones(3)})
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,233 @@
+import numpy as np
+import pytest
+
+import features
+from features import (
+    amdf_lag_range, compute_amdf, compute_amdf_batch, compute_amdf_f0, compute_amdf_f0_batch, compute_autocorr_batch,
+    compute_autocorr_f0, compute_autocorr_f0_batch, compute_feature, compute_ste, compute_ste_batch, compute_sr,
+    compute_sr_batch, compute_volume, compute_volume_batch, compute_yin_difference_batch, compute_yin_f0,
+    compute_yin_f0_batch, compute_zcr, compute_zcr_batch, frame_signal, map_frames, sliding_sr, sliding_ste,
+    sliding_volume, sliding_zcr, voiced_frames, yin_frame_size
+)
+
+
+def noisy_signal(samples=5000, seed=0):
+    # Ton z szumem i cichym fragmentem – ramki różnych klas
+    rng = np.random.default_rng(seed)
+    x = 0.4 * np.sin(2 * np.pi * 0.01 * np.arange(samples)) + 0.05 * rng.standard_normal(samples)
+    x[samples // 3:samples // 2] *= 1e-3
+    return x.astype(np.float32)
+
+
+def reference_frames(data, frame_size, hop_size):
+    # Ramki wycinane jak w pierwotnej pętli GUI, dopełnione zerami do frame_size
+    rows = []
+    for start in range(0, len(data), hop_size):
+        frame = np.zeros(frame_size, dtype=data.dtype)
+        chunk = data[start:start + frame_size]
+        frame[:len(chunk)] = chunk
+        rows.append(frame)
+    return np.array(rows)
+
+
+def tone(f0, fs, seconds=1.0, amplitude=0.5):
+    t = np.arange(int(fs * seconds)) / fs
+    return (amplitude * np.sin(2 * np.pi * f0 * t)).astype(np.float32)
+
+
+@pytest.mark.parametrize("frame_size, hop_size", [(256, 256), (256, 128), (1000, 300), (6000, 6000)])
+def test_frame_signal_matches_slicing(frame_size, hop_size):
+    x = noisy_signal()
+    frames, tail = frame_signal(x, frame_size, hop_size=hop_size)
+    rows = np.concatenate([part for part in (frames, tail) if part is not None])
+    np.testing.assert_array_equal(rows, reference_frames(x, frame_size, hop_size))
+    # Pełne ramki to widok na sygnał, nie kopia
+    assert len(frames) == 0 or np.shares_memory(frames, x)
+
+
+def test_frame_signal_without_padding_keeps_short_tail():
+    x = noisy_signal(1000)
+    frames, tail = frame_signal(x, 300, pad=False)
+    assert frames.shape == (3, 300)
+    np.testing.assert_array_equal(tail[0], x[900:])
+
+
+@pytest.mark.parametrize("batch, single", [
+    (compute_volume_batch, compute_volume),
+    (compute_ste_batch, compute_ste),
+    (compute_zcr_batch, compute_zcr),
+    (compute_sr_batch, compute_sr),
+])
+def test_batch_kernels_match_per_frame(batch, single):
+    frames = reference_frames(noisy_signal(), 256, 256)
+    expected = [single(frame) for frame in frames]
+    np.testing.assert_allclose(batch(frames), expected, rtol=1e-5, atol=1e-7)
+
+
+SLIDING_PAIRS = [(sliding_volume, compute_volume), (sliding_ste, compute_ste), (sliding_zcr, compute_zcr)]
+
+
+@pytest.mark.parametrize("sliding, single", SLIDING_PAIRS + [(sliding_sr, compute_sr)])
+@pytest.mark.parametrize("frame_size, hop_size", [(256, 256), (256, 64), (1000, 300), (512, 700)])
+def test_sliding_features_match_per_frame(monkeypatch, sliding, single, frame_size, hop_size):
+    # Małe bloki – sumy skumulowane przechodzą przez granice porcji sygnału
+    monkeypatch.setattr(features, "BLOCK_SAMPLES", 2000)
+    x = noisy_signal(20000)
+    expected = [single(frame) for frame in reference_frames(x, frame_size, hop_size)]
+    np.testing.assert_allclose(sliding(x, frame_size, hop_size), expected, rtol=1e-5, atol=1e-7)
+
+
+@pytest.mark.parametrize("sliding, single", SLIDING_PAIRS)
+def test_sliding_features_without_padding_use_trimmed_frames(sliding, single):
+    x = noisy_signal(5000)
+    expected = [single(x[start:start + 256]) for start in range(0, len(x), 100)]
+    np.testing.assert_allclose(sliding(x, 256, 100, pad=False), expected, rtol=1e-5, atol=1e-7)
+
+
+def test_map_frames_matches_per_frame_loop():
+    x = noisy_signal(50000)
+    framed = frame_signal(x, 256, hop_size=100)
+    reported = []
+    values = map_frames(compute_zcr_batch, framed, progress=reported.append)
+    np.testing.assert_allclose(values, [compute_zcr(f) for f in reference_frames(x, 256, 100)])
+    assert reported[-1] == 1.0
+
+
+@pytest.mark.parametrize("channels", [None, 2])
+def test_masked_map_frames_equals_unmasked_times_mask(monkeypatch, channels):
+    monkeypatch.setattr(features, "BLOCK_SAMPLES", 4096)
+    x = noisy_signal(30000)
+    if channels:
+        x = np.column_stack((x, x[::-1]))
+    framed = frame_signal(x, 512, hop_size=256)
+    mask = voiced_frames(x, 512, 256)
+    assert mask.any() and not mask.all()
+    seen = []
+
+    def kernel(frames, fs):
+        seen.append(len(frames))
+        return compute_autocorr_f0_batch(frames, fs)
+
+    values = map_frames(kernel, framed, 8000, mask=mask)
+    # Jądro liczy tylko ramki dźwięczne, reszta wyniku to 0
+    assert sum(seen) == np.count_nonzero(mask)
+    np.testing.assert_array_equal(values, map_frames(compute_autocorr_f0_batch, framed, 8000) * mask)
+    assert not map_frames(kernel, framed, 8000, mask=np.zeros_like(mask)).any()
+
+
+def test_voiced_frames_match_per_frame_classification():
+    x = noisy_signal(20000)
+    expected = [
+        compute_volume(frame) > 0.02 and compute_zcr(frame) < 0.3 and compute_volume(frame) >= 0.001
+        for frame in (x[start:start + 512] for start in range(0, len(x), 200))
+    ]
+    np.testing.assert_array_equal(voiced_frames(x, 512, 200), expected)
+
+
+@pytest.mark.parametrize("fs", [16000, 44100])
+@pytest.mark.parametrize("f0", [80, 150, 300])
+def test_yin_tracks_low_pitch_with_short_frames(fs, f0):
+    x = tone(f0, fs)
+    values = compute_feature("f0_yin", x, fs, 256, 128, voiced=voiced_frames(x, 256, 128))
+    assert len(values) == len(voiced_frames(x, 256, 128))
+    # Ostatnie ramki obejmują dopełnienie zerami – sprawdzamy pełne
+    full = values[:len(values) - yin_frame_size(fs) // 128]
+    assert np.all(np.abs(full - f0) < 0.01 * f0)
+
+
+def yin_difference_loop(frame, max_lag):
+    # d(tau) sumowane wprost, okno W = N - max_lag
+    frame = frame.astype(np.float64)
+    window = len(frame) - max_lag
+    return np.array([np.sum((frame[:window] - frame[tau:tau + window]) ** 2) for tau in range(max_lag + 1)])
+
+
+def yin_loop(frame, fs, fmin=50, fmax=500, threshold=0.1):
+    # YIN krok po kroku dla jednej ramki – wzorzec dla compute_yin_f0_batch
+    min_lag = max(int(fs // fmax), 1)
+    max_lag = min(int(np.ceil(fs / fmin)) + 1, len(frame) // 2)
+    diff = yin_difference_loop(frame, max_lag)
+    cmndf = np.ones(max_lag + 1)
+    running = 0.0
+    for tau in range(1, max_lag + 1):
+        running += diff[tau]
+        cmndf[tau] = diff[tau] * tau / running if running > 0 else 1.0
+    for tau in range(min_lag, max_lag):
+        if cmndf[tau] < threshold:
+            while tau + 1 < max_lag and cmndf[tau + 1] < cmndf[tau]:
+                tau += 1
+            break
+    else:
+        return 0.0
+    a, b, c = cmndf[tau - 1:tau + 2]
+    shift = 0.5 * (a - c) / (a - 2 * b + c) if abs(a - 2 * b + c) > 1e-12 else 0.0
+    f0 = fs / (tau + np.clip(shift, -1.0, 1.0))
+    return f0 if fmin <= f0 <= fmax else 0.0
+
+
+def test_yin_difference_batch_matches_direct_sum():
+    frames = reference_frames(noisy_signal(4096), 1024, 1024)
+    expected = [yin_difference_loop(frame, 400) for frame in frames]
+    np.testing.assert_allclose(compute_yin_difference_batch(frames, 400), expected, rtol=1e-7, atol=1e-6)
+
+
+def test_yin_f0_batch_matches_loop(speech):
+    data, fs = speech
+    frames, _ = frame_signal(data[:2 * fs], 2048, hop_size=1024)
+    frames = frames[compute_volume_batch(frames) > 0.01]
+    expected = np.array([yin_loop(frame, fs) for frame in frames])
+    values = compute_yin_f0_batch(frames, fs)
+    assert np.count_nonzero(expected) >= 10
+    np.testing.assert_allclose(values, expected, rtol=1e-6)
+    np.testing.assert_array_equal([compute_yin_f0(frame, fs) for frame in frames[:20]], values[:20])
+
+
+def test_yin_frame_size_covers_lowest_pitch():
+    fs = 44100
+    frames, _ = frame_signal(tone(55, fs), yin_frame_size(fs))
+    assert np.all(np.abs(compute_yin_f0_batch(frames, fs) - 55) < 0.5)
+    short, _ = frame_signal(tone(55, fs), 256)
+    assert not np.any(compute_yin_f0_batch(short, fs))
+
+
+def test_amdf_batch_matches_per_frame_amdf(speech):
+    data, fs = speech
+    frames, _ = frame_signal(data[:fs], 512)
+    min_lag, max_lag = amdf_lag_range(512, fs)
+    expected = np.array([compute_amdf(frame)[min_lag:max_lag] for frame in frames])
+    np.testing.assert_allclose(compute_amdf_batch(frames, min_lag, max_lag), expected, rtol=1e-5, atol=1e-7)
+
+
+@pytest.mark.parametrize("frame_size", [256, 512, 1024, 2048])
+def test_exact_amdf_f0_batch_is_identical_to_per_frame(recording, frame_size):
+    data, fs = recording
+    frames, tail = frame_signal(data[:fs], frame_size)
+    rows = np.concatenate([frames, tail]) if tail is not None else frames
+    expected = [compute_amdf_f0(frame, fs) for frame in rows]
+    np.testing.assert_array_equal(compute_amdf_f0_batch(rows, fs, exact=True), expected)
+
+
+@pytest.mark.parametrize("frame_size", [256, 512, 1024, 2048])
+def test_fft_amdf_f0_batch_agrees_on_voiced_frames(recording, frame_size):
+    # Wersja FFT szuka minimum średniej kwadratów różnic – zgodność jak w tabeli w docstringu (71–100%)
+    data, fs = recording
+    frames, _ = frame_signal(data[:2 * fs], frame_size)
+    frames = frames[compute_volume_batch(frames) > 0.02]
+    expected = np.array([compute_amdf_f0(frame, fs) for frame in frames])
+    close = np.isclose(compute_amdf_f0_batch(frames, fs), expected, rtol=0.05)
+    assert close.mean() >= 0.7
+
+
+def test_autocorr_batch_matches_numpy_correlate():
+    frames = reference_frames(noisy_signal(2048), 512, 512)
+    expected = [np.correlate(frame, frame, mode="full")[511:] for frame in frames.astype(np.float64)]
+    np.testing.assert_allclose(compute_autocorr_batch(frames), expected, atol=1e-9)
+
+
+@pytest.mark.parametrize("frame_size", [256, 512, 2048])
+def test_autocorr_f0_batch_matches_per_frame(speech, frame_size):
+    data, fs = speech
+    frames, tail = frame_signal(data[:3 * fs], frame_size)
+    rows = np.concatenate([frames, tail]) if tail is not None else frames
+    expected = [compute_autocorr_f0(frame, fs) for frame in rows]
+    np.testing.assert_allclose(compute_autocorr_f0_batch(rows, fs), expected)
@@ -0,0 +1,197 @@
+import itertools
+
+import numpy as np
+import pytest
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from analysis_worker import AnalysisExecutor
+import backends
+from audio_io import decimate
+from audio_processing import VoicedAudioProcessor
+from feature_cache import FeatureCache
+from features import FEATURE_NAMES, PITCH_FEATURES, analysis_frames, compute_feature, frame_starts
+from features_window import (
+    FEATURE_INFO, FeaturesWindow, LazyFeatures, calc_subplot_grid, downsample_minmax, draw_feature_axes
+)
+
+
+def speech_like(fs=16000, seconds=0.5):
+    t = np.arange(int(fs * seconds)) / fs
+    x = 0.5 * np.sin(2 * np.pi * 150 * t)
+    x[len(x) // 2:] = 0.05 * np.random.default_rng(0).standard_normal(len(x) - len(x) // 2)
+    return x.astype(np.float32), fs
+
+
+@pytest.mark.parametrize("n", range(1, 13))
+def test_subplot_grid_fits_all_plots(n):
+    rows, cols = calc_subplot_grid(n)
+    assert rows * cols >= n
+
+
+def test_every_feature_combination_renders():
+    data, fs = speech_like()
+    features = LazyFeatures(data, fs, 256, 0.001, hop_size=128)
+    for name in FEATURE_INFO.values():
+        features.store(name[0], features.compute(name[0]))
+    names = list(FEATURE_INFO)
+    fig = Figure(figsize=(12, 6), dpi=20)
+    canvas = FigureCanvasAgg(fig)
+    for count in range(1, len(names) + 1):
+        for selected in itertools.combinations(names, count):
+            fig.clear()
+            draw_feature_axes(fig, list(selected), features, features.times)
+            assert len(fig.axes) == count
+        canvas.draw()
+
+
+def test_missing_feature_is_drawn_as_placeholder():
+    data, fs = speech_like()
+    features = LazyFeatures(data, fs, 256, 0.001, hop_size=128)
+    fig = Figure()
+    draw_feature_axes(fig, list(FEATURE_INFO), features, features.times)
+    FigureCanvasAgg(fig).draw()
+    assert all(ax.texts and not ax.lines for ax in fig.axes)
+
+
+def test_downsample_minmax_keeps_every_bucket_extremum():
+    rng = np.random.default_rng(4)
+    y = rng.standard_normal(10_001)
+    y[1234] = 50.0
+    y[8765] = -50.0
+    x = np.arange(len(y)) / 100
+    x_plot, y_plot = downsample_minmax(x, y, max_points=200)
+    assert len(x_plot) <= 200 + 2
+    assert np.all(np.diff(x_plot) >= 0)
+    np.testing.assert_array_equal(y_plot, y[np.round(x_plot * 100).astype(int)])
+    block = int(np.ceil(len(y) / 100))
+    for start in range(0, len(y), block):
+        chunk = y[start:start + block]
+        assert chunk.min() in y_plot and chunk.max() in y_plot
+
+
+def test_downsample_minmax_leaves_short_series_untouched():
+    x = np.arange(10.0)
+    y = np.sin(x)
+    x_plot, y_plot = downsample_minmax(x, y, max_points=10)
+    assert x_plot is x and y_plot is y
+
+
+@pytest.mark.parametrize("name", FEATURE_NAMES)
+def test_lazy_features_match_compute_feature(name):
+    data, fs = speech_like()
+    features = LazyFeatures(data, fs, 256, 0.001, hop_size=128)
+    voiced = features.voiced_mask() if name in PITCH_FEATURES else None
+    expected = compute_feature(name, data, fs, 256, 128, voiced=voiced)
+    np.testing.assert_array_equal(features.compute(name), expected)
+    np.testing.assert_allclose(features.times, frame_starts(len(data), 128) / fs)
+
+
+def test_lazy_features_compute_only_missing_and_reuse_cache(tmp_path, monkeypatch):
+    data, fs = speech_like()
+    cache = FeatureCache(str(tmp_path))
+    features = LazyFeatures(data, fs, 256, 0.001, cache=cache, hop_size=128)
+    assert features.missing(["volume", "zcr"]) == ["volume", "zcr"]
+    volume = features.compute("volume")
+    # compute() nie zapisuje wyniku – robi to store() w wątku GUI
+    assert features.get("volume") is None
+    features.store("volume", volume)
+    assert features.missing(["volume", "zcr"]) == ["zcr"]
+
+    # Nowy rejestr dla tych samych danych czyta cechę z dysku bez liczenia
+    again = LazyFeatures(data, fs, 256, 0.001, cache=cache, hop_size=128)
+    monkeypatch.setattr(again, "compute_values", lambda *args: pytest.fail("cecha liczona mimo cache"))
+    np.testing.assert_array_equal(again.compute("volume"), volume)
+
+
+def test_cache_key_depends_on_backend(tmp_path, restore_backends):
+    data, fs = speech_like(seconds=1.0)
+    cache = FeatureCache(str(tmp_path))
+    for backend in ["numpy", "python", "numpy"]:
+        backends.select("f0_amdf", backend)
+        features = LazyFeatures(data, fs, 256, 0.001, cache=cache, hop_size=128)
+        uncached = LazyFeatures(data, fs, 256, 0.001, hop_size=128).compute("f0_amdf")
+        values = features.compute("f0_amdf")
+        np.testing.assert_array_equal(values, uncached)
+    assert len(list(tmp_path.glob("*.npz"))) == 2
+
+
+def test_voicing_gate_uses_given_thresholds(tmp_path):
+    data, fs = speech_like()
+    cache = FeatureCache(str(tmp_path))
+    default = LazyFeatures(data, fs, 256, 0.001, cache=cache, hop_size=128).compute("f0_yin")
+    strict = LazyFeatures(data, fs, 256, 0.001, cache=cache, hop_size=128, vol_threshold=0.9).compute("f0_yin")
+    assert np.count_nonzero(default) > 0
+    assert np.count_nonzero(strict) == 0
+
+
+def test_voicing_gate_reuses_frame_stats():
+    data, fs = speech_like()
+    processor = VoicedAudioProcessor()
+    stats = processor.frame_stats(data, 256, 128)
+    own = LazyFeatures(data, fs, 256, 0.001, hop_size=128).compute("f0_yin")
+    reused = LazyFeatures(data, fs, 256, 0.001, hop_size=128, frame_stats=stats).compute("f0_yin")
+    np.testing.assert_array_equal(own, reused)
+    # Maska powstaje z podanych statystyk – ramki "ciche" nie mają F0
+    silent = (np.zeros_like(stats[0]), stats[1])
+    gated = LazyFeatures(data, fs, 256, 0.001, hop_size=128, frame_stats=silent).compute("f0_yin")
+    assert np.count_nonzero(gated) == 0
+
+
+def test_voicing_gate_on_decimated_signal_reuses_frame_stats():
+    data, fs = speech_like(fs=48000)
+    low = decimate(data, 3)
+    frame_low, hop_low = analysis_frames(256, 128, 3)
+    stats = VoicedAudioProcessor().frame_stats(low, frame_low, hop_low)
+    own = LazyFeatures(data, fs, 256, 0.001, hop_size=128, analysis_data=low, analysis_fs=16000)
+    reused = LazyFeatures(data, fs, 256, 0.001, hop_size=128, analysis_data=low, analysis_fs=16000,
+                          frame_stats=stats)
+    np.testing.assert_array_equal(own.compute("f0_autocorr"), reused.compute("f0_autocorr"))
+    assert len(reused.compute("f0_autocorr")) == len(reused.times)
+
+
+class Widget:
+    # Zastępuje widżety Tk okna cech (pack, config, wartość paska postępu)
+    def pack(self, **kwargs):
+        self.visible = True
+
+    def pack_forget(self):
+        self.visible = False
+
+    def config(self, **kwargs):
+        pass
+
+    def __setitem__(self, key, value):
+        pass
+
+
+def headless_window(master, data, fs):
+    window = FeaturesWindow.__new__(FeaturesWindow)
+    window.features = LazyFeatures(data, fs, 256, 0.001, hop_size=128)
+    window.times = window.features.times
+    window.executor = AnalysisExecutor(master)
+    window.job = None
+    window.pending = []
+    window.progress_frame = Widget()
+    window.progress_label = Widget()
+    window.progress = Widget()
+    window.plot_frame = Widget()
+    window.render_features = lambda: None
+    return window
+
+
+def test_features_recomputed_after_external_cancel(master):
+    data, fs = speech_like()
+    window = headless_window(master, data, fs)
+    window.request_features(["f0_yin"])
+    first = window.job
+    # Np. wczytanie nowego pliku – callbacki anulowanego zadania nie zostaną wywołane
+    window.executor.cancel_all()
+    master.run()
+    window.request_features(["f0_yin"])
+    assert window.job is not first and not window.job.cancelled
+    master.run()
+    assert window.job is None and window.pending == []
+    assert window.features.get("f0_yin") is not None
+    assert not window.progress_frame.visible
+    window.executor.shutdown()
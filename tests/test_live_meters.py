@@ -0,0 +1,54 @@
+import numpy as np
+
+from features import compute_autocorr_f0, compute_volume, compute_zcr
+from live_meters import LiveFeatureExtractor, RingBuffer
+
+
+def test_ring_buffer_returns_latest_samples_across_wraparound():
+    ring = RingBuffer(100)
+    out = np.empty(30, dtype=np.float32)
+    assert not ring.read_latest(out)
+    stream = np.arange(1000, dtype=np.float32)
+    for start in range(0, len(stream), 37):
+        ring.write(stream[start:start + 37])
+        end = min(start + 37, len(stream))
+        if end >= len(out):
+            assert ring.read_latest(out)
+            np.testing.assert_array_equal(out, stream[end - len(out):end])
+
+
+def test_ring_buffer_keeps_tail_of_oversized_block():
+    ring = RingBuffer(16)
+    ring.write(np.arange(40, dtype=np.float32))
+    out = np.empty(4, dtype=np.float32)
+    assert ring.read_latest(out)
+    np.testing.assert_array_equal(out, [36, 37, 38, 39])
+
+
+def test_live_features_match_offline_features_of_last_block():
+    fs = 16000
+    t = np.arange(fs) / fs
+    signal = (0.4 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+    live = LiveFeatureExtractor(fs, block_size=1024, smoothing=0.0)
+    assert not live.update()
+    for start in range(0, 5000, 512):
+        live.ring.write(signal[start:start + 512])
+    assert live.update()
+    last = signal[5120 - 1024:5120]
+    np.testing.assert_allclose(live.rms, compute_volume(last), rtol=1e-5)
+    np.testing.assert_allclose(live.zcr, compute_zcr(last), rtol=1e-5)
+    np.testing.assert_allclose(live.f0, compute_autocorr_f0(last, fs), rtol=1e-3)
+    # Bez nowych próbek cechy nie są przeliczane
+    assert not live.update()
+
+
+def test_live_rms_is_exponentially_smoothed():
+    live = LiveFeatureExtractor(8000, block_size=256, smoothing=0.5)
+    live.ring.write(np.ones(256, dtype=np.float32))
+    live.update()
+    assert live.rms == 0.5
+    live.ring.write(np.ones(256, dtype=np.float32))
+    live.update()
+    assert live.rms == 0.75
+    live.reset()
+    assert live.rms == 0.0 and not live.update()
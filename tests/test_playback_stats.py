@@ -0,0 +1,65 @@
+import json
+import types
+
+import pytest
+
+import playback_stats
+from playback_stats import DURATION_BINS, PlaybackStats
+
+
+def status(underflow=False, overflow=False, priming=False):
+    # Jak sounddevice.CallbackFlags
+    return types.SimpleNamespace(output_underflow=underflow, output_overflow=overflow, priming_output=priming)
+
+
+def record(stats, monkeypatch, duration, time_info=None):
+    monkeypatch.setattr(playback_stats.time, "perf_counter", lambda: 100.0 + duration)
+    stats.record_callback(100.0, time_info)
+
+
+def test_status_flags_are_counted():
+    stats = PlaybackStats()
+    for flags in [status(underflow=True), status(), status(overflow=True, priming=True), status(underflow=True)]:
+        stats.record_status(flags)
+    assert (stats.output_underflows, stats.output_overflows, stats.priming_outputs) == (2, 1, 1)
+    assert stats.xruns == 3
+
+
+def test_callback_durations_fill_histogram_and_overruns(monkeypatch):
+    stats = PlaybackStats(fs=48000, blocksize=480)  # budżet 10 ms
+    durations = [30e-6, 150e-6, 150e-6, 4e-3, 15e-3, 0.2]
+    for duration in durations:
+        record(stats, monkeypatch, duration)
+    snapshot = stats.snapshot()
+    assert snapshot["callbacks"] == len(durations)
+    assert snapshot["budget_ms"] == pytest.approx(10.0)
+    assert snapshot["overruns"] == 2
+    assert snapshot["max_duration_ms"] == pytest.approx(200.0)
+    assert snapshot["mean_duration_ms"] == pytest.approx(sum(durations) / len(durations) * 1e3)
+    histogram = snapshot["duration_histogram"]
+    assert len(histogram) == len(DURATION_BINS) + 1
+    assert sum(histogram.values()) == len(durations)
+    assert histogram["<=0.05ms"] == 1 and histogram["<=0.2ms"] == 2 and histogram[">50ms"] == 1
+
+
+def test_output_latency_is_tracked(monkeypatch):
+    stats = PlaybackStats(fs=44100, blocksize=512)
+    assert stats.snapshot()["min_output_latency_ms"] == 0.0
+    for latency in [0.02, 0.01, 0.03]:
+        record(stats, monkeypatch, 1e-4, types.SimpleNamespace(currentTime=5.0, outputBufferDacTime=5.0 + latency))
+    snapshot = stats.snapshot()
+    assert snapshot["output_latency_ms"] == pytest.approx(30.0)
+    assert snapshot["min_output_latency_ms"] == pytest.approx(10.0)
+    assert snapshot["max_output_latency_ms"] == pytest.approx(30.0)
+    assert "xruny 0" in stats.summary()
+
+
+def test_dump_round_trip_and_reset(tmp_path, monkeypatch):
+    stats = PlaybackStats(fs=44100, blocksize=512)
+    stats.record_status(status(underflow=True))
+    record(stats, monkeypatch, 1e-3)
+    path = tmp_path / "stats.json"
+    stats.dump(str(path))
+    assert json.loads(path.read_text()) == stats.snapshot()
+    stats.reset()
+    assert stats.callbacks == 0 and stats.xruns == 0 and sum(stats.histogram) == 0
@@ -0,0 +1,71 @@
+import json
+import time
+import tracemalloc
+
+import numpy as np
+import pytest
+
+import profiling
+
+
+@pytest.fixture
+def profiler(monkeypatch):
+    was_tracing = tracemalloc.is_tracing()
+    monkeypatch.setattr(profiling, "ENABLED", False)
+    monkeypatch.setattr(profiling, "OUTPUT", None)
+    profiling.reset()
+    yield profiling
+    profiling.reset()
+    if not was_tracing:
+        tracemalloc.stop()
+
+
+def test_disabled_profiler_records_nothing(profiler):
+    with profiler.stage("load"):
+        pass
+    assert profiler.timed("analyse")(lambda x: x + 1)(1) == 2
+    assert profiler.snapshot() == {}
+
+
+def test_stages_record_calls_time_and_memory(profiler):
+    profiler.enable()
+    for _ in range(3):
+        with profiler.stage("load"):
+            time.sleep(0.01)
+    with profiler.stage("analyse"):
+        with profiler.stage("analyse.frames"):
+            frames = np.ones(1_000_000)  # 8 MB
+        del frames
+
+    stats = profiler.snapshot()
+    assert stats["load"]["calls"] == 3
+    assert 0.01 <= stats["load"]["min_s"] <= stats["load"]["mean_s"] <= stats["load"]["max_s"]
+    assert stats["load"]["total_s"] == pytest.approx(3 * stats["load"]["mean_s"])
+    # Szczyt etapu zagnieżdżonego wlicza się też do etapu nadrzędnego
+    assert stats["analyse.frames"]["peak_mem_bytes"] >= 8_000_000
+    assert stats["analyse"]["peak_mem_bytes"] >= stats["analyse.frames"]["peak_mem_bytes"]
+
+
+def test_timed_decorator_is_a_stage(profiler):
+    profiler.enable()
+
+    @profiler.timed("render")
+    def render(x):
+        return x * 2
+
+    assert render(3) == 6 and render.__name__ == "render"
+    assert profiler.snapshot()["render"]["calls"] == 1
+
+
+def test_dump_writes_json_or_text_report(profiler, tmp_path, capsys):
+    path = tmp_path / "profil.json"
+    profiler.enable(str(path))
+    with profiler.stage("load"):
+        pass
+    profiler.dump()
+    assert json.loads(path.read_text()) == profiler.snapshot()
+
+    profiler.enable()
+    profiler.dump()
+    report = capsys.readouterr().err
+    assert report.splitlines()[0].startswith("Etap") and "load" in report
@@ -0,0 +1,137 @@
+import os
+import struct
+
+import numpy as np
+import pytest
+from scipy.io import wavfile
+
+import segment_export
+from audio_io import WavSource, mixdown
+from audio_processing import VoicedAudioProcessor, silence_regions, voiced_unvoiced_regions
+from segment_export import export_segments, export_trimmed, keep_regions, stream_frame_stats
+
+
+@pytest.fixture
+def recording(tmp_path):
+    # Ton, cisza, szum, cisza, ton – stereo int16
+    fs = 8000
+    t = np.arange(fs) / fs
+    rng = np.random.default_rng(11)
+    parts = [0.5 * np.sin(2 * np.pi * 150 * t), np.zeros(fs // 2), 0.1 * rng.standard_normal(fs),
+             np.zeros(fs // 2), 0.4 * np.sin(2 * np.pi * 200 * t)]
+    mono = np.concatenate(parts)
+    samples = (np.column_stack((mono, 0.5 * mono)) * 20000).astype(np.int16)
+    path = str(tmp_path / "nagranie.wav")
+    wavfile.write(path, fs, samples)
+    return WavSource(path, channel=None), samples
+
+
+def write_pcm24(path, fs, samples):
+    # scipy nie zapisuje PCM 24 bit – nagłówek i próbki (3 młodsze bajty int32) składamy ręcznie
+    channels = samples.shape[1]
+    data = samples.astype("<i4").view(np.uint8).reshape(-1, 4)[:, :3].tobytes()
+    fmt = struct.pack("<HHIIHH", 1, channels, fs, fs * 3 * channels, 3 * channels, 24)
+    with open(path, "wb") as f:
+        f.write(b"RIFF" + struct.pack("<I", 4 + 8 + len(fmt) + 8 + len(data)) + b"WAVE")
+        f.write(b"fmt " + struct.pack("<I", len(fmt)) + fmt + b"data" + struct.pack("<I", len(data)) + data)
+
+
+@pytest.mark.parametrize("hop_size", [None, 256])
+def test_stream_frame_stats_match_frame_stats(recording, monkeypatch, hop_size):
+    source, _ = recording
+    # Małe porcje – wynik nie może zależeć od podziału pliku
+    monkeypatch.setattr(segment_export, "CHUNK_SAMPLES", 3000)
+    rms, zcr = stream_frame_stats(source, 1024, hop_size)
+    expected_rms, expected_zcr = VoicedAudioProcessor().frame_stats(mixdown(source.to_float32()), 1024, hop_size)
+    np.testing.assert_allclose(rms, expected_rms, rtol=1e-5, atol=1e-7)
+    np.testing.assert_array_equal(zcr, expected_zcr)
+
+
+def test_stream_segmentation_matches_detection(recording):
+    source, _ = recording
+    data = mixdown(source.to_float32())
+    rms, zcr = stream_frame_stats(source, 512)
+    processor = VoicedAudioProcessor()
+    for threshold in [0.001, 0.01]:
+        assert silence_regions(rms, 512, len(source), threshold) == processor.detect_silence(data, source.fs, 512,
+                                                                                          threshold)
+    assert voiced_unvoiced_regions(rms, zcr, 512, len(source)) == processor.detect_voiced_unvoiced(data, source.fs,
+                                                                                               512)
+
+
+def test_keep_regions_complement_silence():
+    assert keep_regions([(0, 10), (30, 40)], 100) == [(10, 30), (40, 100)]
+    assert keep_regions([], 50) == [(0, 50)]
+    assert keep_regions([(20, 50)], 50) == [(0, 20)]
+
+
+def test_export_trimmed_without_crossfade_is_exact_copy(recording, tmp_path):
+    source, samples = recording
+    regions = [(0, 8000), (12000, 20000), (24000, 32000)]
+    path = str(tmp_path / "bez_ciszy.wav")
+    stats = export_trimmed(source, regions, path, chunk_size=1000)
+    _, written = wavfile.read(path)
+    np.testing.assert_array_equal(written, np.concatenate([samples[a:b] for a, b in regions]))
+    assert stats.frames_read == stats.frames_written == 24000
+    assert stats.files == [path]
+
+
+def test_export_trimmed_crossfade_overlaps_cuts(recording, tmp_path):
+    source, samples = recording
+    regions = [(0, 8000), (12000, 20000), (24000, 24100)]
+    path = str(tmp_path / "przenikanie.wav")
+    export_trimmed(source, regions, path, crossfade=200)
+    _, written = wavfile.read(path)
+    # Druga fuga przycięta do połowy krótkiego fragmentu (50 próbek)
+    assert len(written) == 8000 + 8000 + 100 - 200 - 50
+    np.testing.assert_array_equal(written[:7800], samples[:7800])
+    fade_in = (np.arange(200) + 0.5) / 200
+    expected = samples[7800:8000] * fade_in[::-1, np.newaxis] + samples[12000:12200] * fade_in[:, np.newaxis]
+    np.testing.assert_allclose(written[7800:8000], np.rint(expected), atol=1)
+    np.testing.assert_array_equal(written[8000:15750], samples[12200:19950])
+
+
+def test_export_segments_writes_each_segment(recording, tmp_path):
+    source, samples = recording
+    segments = [(0, 8000, True), (12000, 20000, False)]
+    out_dir = str(tmp_path / "segmenty")
+    stats = export_segments(source, segments, out_dir, "nagranie", chunk_size=1000)
+    assert sorted(os.listdir(out_dir)) == ["nagranie_0001_dzwieczny.wav", "nagranie_0002_bezdzwieczny.wav"]
+    for path, (start, stop, _) in zip(stats.files, segments):
+        np.testing.assert_array_equal(wavfile.read(path)[1], samples[start:stop])
+
+    faded = export_segments(source, [(0, 8000)], str(tmp_path / "wyciszone"), "n", crossfade=100)
+    written = wavfile.read(faded.files[0])[1]
+    assert os.path.basename(faded.files[0]) == "n_0001.wav"
+    np.testing.assert_array_equal(written[100:7900], samples[100:7900])
+    assert np.all(np.abs(written[:100].astype(int)) <= np.abs(samples[:100].astype(int)))
+
+
+def test_main_trims_silence(recording, tmp_path, capsys):
+    source, samples = recording
+    output = str(tmp_path / "wynik.wav")
+    assert segment_export.main([source.path, "-o", output, "--frame-size", "500"]) == 0
+    _, written = wavfile.read(output)
+    mono = mixdown(source.to_float32())
+    rms, _ = VoicedAudioProcessor().frame_stats(mono, 500)
+    keep = keep_regions(silence_regions(rms, 500, len(mono), 0.001), len(mono))
+    np.testing.assert_array_equal(written, np.concatenate([samples[a:b] for a, b in keep]))
+    assert len(written) == len(samples) - 8000
+    assert "Zapisano 1 plików" in capsys.readouterr().out
+
+
+def test_pcm24_is_rejected_instead_of_written_as_32_bit(recording, tmp_path, capsys):
+    _, samples = recording
+    path = str(tmp_path / "nagranie24.wav")
+    write_pcm24(path, 8000, samples.astype(np.int32) * 256)
+    source = WavSource(path, channel=None)
+    # Analiza nadal działa (odczyt w całości), eksport odmawia zamiast zmieniać format
+    assert not source.mapped
+    np.testing.assert_allclose(source.to_float32(), WavSource(recording[0].path, channel=None).to_float32())
+    with pytest.raises(ValueError, match="24 bit"):
+        export_trimmed(source, [(0, 100)], str(tmp_path / "wynik.wav"))
+    with pytest.raises(ValueError, match="24 bit"):
+        export_segments(source, [(0, 100, True)], str(tmp_path / "segmenty"), "nagranie24")
+    assert segment_export.main([path, "-o", str(tmp_path / "wynik.wav")]) == 1
+    assert "24 bit" in capsys.readouterr().err
+    assert sorted(os.listdir(tmp_path)) == ["nagranie.wav", "nagranie24.wav"]
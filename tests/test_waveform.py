@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import PolyCollection
+from matplotlib.figure import Figure
+
+from waveform import WaveformPyramid, block_min_max, region_classes, span_vertices, visible_spans
+
+
+def draw_classes(mode, regions, fs=1000):
+    # Ta sama droga co AudioApp.add_region_artists + update_regions
+    fig = Figure()
+    ax = fig.add_subplot()
+    ax.set_xlim(0, 10)
+    for name, rows in region_classes(mode, regions).items():
+        collection = PolyCollection([], transform=ax.get_xaxis_transform())
+        ax.add_collection(collection, autolim=False)
+        starts, ends = visible_spans(rows[:, 0] / fs, rows[:, 1] / fs, 0, 10, 0.01)
+        collection.set_verts(span_vertices(starts, ends))
+    FigureCanvasAgg(fig).draw()
+    return ax.collections
+
+
+@pytest.mark.parametrize("mode, names", [("silence", {"silence"}), ("voiced_unvoiced", {"voiced", "unvoiced"})])
+def test_empty_regions_give_empty_classes(mode, names):
+    classes = region_classes(mode, [])
+    assert set(classes) == names
+    assert all(len(rows) == 0 for rows in classes.values())
+    assert len(draw_classes(mode, [])) == len(names)
+
+
+def test_region_classes_split_voiced_and_unvoiced():
+    regions = [(0, 100, True), (100, 250, False), (300, 400, True)]
+    classes = region_classes("voiced_unvoiced", regions)
+    assert classes["voiced"][:, :2].tolist() == [[0, 100], [300, 400]]
+    assert classes["unvoiced"][:, :2].tolist() == [[100, 250]]
+    assert region_classes("silence", [(5, 10)])["silence"].tolist() == [[5, 10]]
+    assert len(draw_classes("voiced_unvoiced", regions)) == 2
+
+
+def test_block_min_max_matches_per_block_loop():
+    data = np.random.default_rng(1).standard_normal(1000).astype(np.float32)
+    mins, maxs = block_min_max(data, 64)
+    blocks = [data[i:i + 64] for i in range(0, len(data), 64)]
+    np.testing.assert_array_equal(mins, [b.min() for b in blocks])
+    np.testing.assert_array_equal(maxs, [b.max() for b in blocks])
+
+
+def test_pyramid_levels_match_direct_min_max():
+    data = np.random.default_rng(2).standard_normal(100_000).astype(np.float32)
+    pyramid = WaveformPyramid(data, 1000, base_block=64, factor=4, min_buckets=100)
+    assert len(pyramid.levels) > 2
+    for block, mins, maxs in pyramid.levels:
+        direct_mins, direct_maxs = block_min_max(data, block)
+        np.testing.assert_array_equal(mins, direct_mins)
+        np.testing.assert_array_equal(maxs, direct_maxs)
+    assert pyramid.amplitude_range == (data.min(), data.max())
+
+
+@pytest.mark.parametrize("t_start, t_end, width_px", [(0, 100, 500), (12.3, 47.9, 300), (10, 10.5, 100), (10, 10.1, 800)])
+def test_envelope_keeps_extrema_and_bounds_point_count(t_start, t_end, width_px):
+    fs = 1000
+    data = np.random.default_rng(3).standard_normal(100_000).astype(np.float32)
+    pyramid = WaveformPyramid(data, fs)
+    x, y = pyramid.envelope(t_start, t_end, width_px)
+    view = data[int(t_start * fs):int(np.ceil(t_end * fs)) + 1]
+    # Kubełki mogą wystawać poza widok, ale skrajne wartości widoku zawsze są narysowane
+    assert y.min() <= view.min() and y.max() >= view.max()
+    # Najwyżej factor kubełków na piksel, chyba że już najrzadszy poziom jest gęstszy
+    max_buckets = max(4 * width_px, len(pyramid.levels[-1][1])) + 2
+    assert len(x) == len(y) <= 2 * max_buckets
+    assert np.all(np.diff(x) >= 0)
+
+
+def test_short_signal_is_drawn_sample_by_sample():
+    data = np.arange(50, dtype=np.float32)
+    x, y = WaveformPyramid(data, 10).envelope(0, 10, 100)
+    np.testing.assert_array_equal(y, data)
+    np.testing.assert_allclose(x, np.arange(50) / 10)
+
+
+def visible_spans_loop(starts, ends, t_start, t_end, min_gap):
+    # Przegląd wszystkich przedziałów i łączenie po kolei – wzorzec dla visible_spans
+    spans = []
+    for start, end in zip(starts, ends):
+        if end <= t_start or start >= t_end:
+            continue
+        if spans and start - spans[-1][1] < min_gap:
+            spans[-1][1] = end
+        else:
+            spans.append([start, end])
+    return spans
+
+
+@pytest.mark.parametrize("t_start, t_end, min_gap", [(0, 1000, 0.0), (0, 1000, 0.5), (123.4, 456.7, 0.2), (990, 2000, 1.0)])
+def test_visible_spans_match_loop(t_start, t_end, min_gap):
+    rng = np.random.default_rng(9)
+    edges = np.cumsum(rng.exponential(0.5, 4000))
+    starts, ends = edges[0::2], edges[1::2]
+    got_starts, got_ends = visible_spans(starts, ends, t_start, t_end, min_gap)
+    assert np.column_stack((got_starts, got_ends)).tolist() == visible_spans_loop(starts, ends, t_start, t_end, min_gap)
+
+
+def test_span_vertices_are_axvspan_rectangles():
+    verts = span_vertices(np.array([1.0, 5.0]), np.array([2.0, 7.5]), bottom=0.1, top=0.9)
+    assert verts.shape == (2, 4, 2)
+    assert verts[1].tolist() == [[5.0, 0.1], [5.0, 0.9], [7.5, 0.9], [7.5, 0.1]]
+    assert span_vertices(np.array([]), np.array([])).shape == (0, 4, 2)